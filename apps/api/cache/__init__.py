@@ -1 +1 @@
-from apps.api.cache.optimization import router as cache_router
+from .optimization import router as cache_router
@@ -2,11 +2,18 @@
 Redis Cache Optimization - TTL tuning, cache warming, and monitoring
 """
 
-from fastapi import APIRouter
-from typing import Optional, Dict, Any, List
+from fastapi import APIRouter, Query
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Tuple
 from pydantic import BaseModel
+from collections import deque
 from datetime import datetime, timedelta
+import asyncio
+import os
 import random
+import time
+
+from .redis_cache import cache_manager, key_namespace, ttl_overrides
+from .response_cache import response_cache
 
 router = APIRouter(prefix="/api/v1/cache", tags=["cache"])
 
@@ -21,15 +28,19 @@ class CacheStats(BaseModel):
     keys_count: int
     expired_keys: int
     avg_ttl_seconds: float
+    evictions: int = 0
+    backend: str = "memory"
+    since: Optional[str] = None
+    namespaces: Dict[str, Dict[str, Any]] = {}
 
 
 class CacheKeyInfo(BaseModel):
     key: str
     pattern: str
-    ttl_seconds: int
-    size_bytes: int
-    access_count: int
-    last_access: str
+    ttl_seconds: Optional[int] = None
+    size_bytes: Optional[int] = None
+    idle_seconds: Optional[int] = None
+    last_access: Optional[str] = None
 
 
 class CacheRecommendation(BaseModel):
@@ -59,6 +70,156 @@ TTL_CONFIG = {
     "coping_strategies": 604800,
 }
 
+# ============ Adaptive TTL ============
+
+ADAPTIVE_TTL_ENABLED = os.getenv("CACHE_ADAPTIVE_TTL", "false").lower() == "true"
+ADAPTIVE_TTL_INTERVAL = int(os.getenv("CACHE_ADAPTIVE_TTL_INTERVAL", "300"))
+ADAPTIVE_TTL_MIN_READS = int(os.getenv("CACHE_ADAPTIVE_TTL_MIN_READS", "20"))
+ADAPTIVE_TTL_MAX_STEP = float(os.getenv("CACHE_ADAPTIVE_TTL_MAX_STEP", "2.0"))
+# Recompute milliseconds a cached KB must save before its TTL is lengthened
+ADAPTIVE_TTL_MIN_MS_PER_KB = float(os.getenv("CACHE_ADAPTIVE_TTL_MIN_MS_PER_KB", "1.0"))
+
+# (min, max) seconds each TTL_CONFIG entry may be tuned within
+TTL_BOUNDS = {
+    "user_session": (60, 900),
+    "rate_limit": (300, 300),  # a window length, not a freshness trade-off
+    "user_profile": (300, 14400),
+    "user_preferences": (300, 14400),
+    "module_data": (3600, 604800),
+    "wellness_tips": (3600, 172800),
+    "emotion_taxonomy": (86400, 2592000),
+    "coping_strategies": (86400, 2592000),
+}
+
+# Telemetry counters compared between tuning passes
+_RATE_FIELDS = ("hits", "misses", "sets", "invalidations")
+
+
+class TTLTuner:
+    """Adjusts TTL_CONFIG entries from observed cache behaviour
+    
+    Each pass compares the per-namespace telemetry with the previous pass
+    and, for every TTL_CONFIG namespace:
+    - invalidated more often than it expires: shorten the TTL towards the
+      observed change interval
+    - written but hardly ever read back: shorten it to free memory
+    - missing often on values that are expensive per cached byte:
+      lengthen it, since that buys the most hits per byte
+    Changes are at most max_step per pass and clamped to TTL_BOUNDS.
+    Counters are per worker, so each worker tunes from its own traffic.
+    """
+    
+    def __init__(
+        self,
+        config: Dict[str, int] = TTL_CONFIG,
+        bounds: Dict[str, tuple] = TTL_BOUNDS,
+        min_reads: int = ADAPTIVE_TTL_MIN_READS,
+        max_step: float = ADAPTIVE_TTL_MAX_STEP,
+        min_ms_per_kb: float = ADAPTIVE_TTL_MIN_MS_PER_KB
+    ):
+        self.config = config
+        self.bounds = bounds
+        self.min_reads = min_reads
+        self.max_step = max_step
+        self.min_ms_per_kb = min_ms_per_kb
+        self.live: Dict[str, int] = dict(config)
+        self.decisions: deque = deque(maxlen=200)
+        self.last_run: Optional[str] = None
+        self._previous: Dict[str, Dict[str, Any]] = {}
+        self._previous_at = time.monotonic()
+    
+    def decide(
+        self,
+        ttl: int,
+        window: float,
+        delta: Dict[str, int],
+        stats: Dict[str, Any]
+    ) -> Tuple[float, Optional[str]]:
+        """Proposed TTL and the reason for it (None: keep the current TTL)"""
+        if delta["invalidations"]:
+            change_interval = window / delta["invalidations"]
+            if change_interval < ttl:
+                return max(change_interval, ttl / self.max_step), f"invalidated every {change_interval:.0f}s"
+        
+        reads = delta["hits"] + delta["misses"]
+        if reads < self.min_reads:
+            return ttl, None
+        
+        if delta["sets"] and delta["hits"] / delta["sets"] < 0.1:
+            return ttl / self.max_step, f"{delta['hits']} hits for {delta['sets']} writes"
+        
+        miss_ratio = delta["misses"] / reads
+        ms_per_kb = stats["avg_compute_ms"] / max(stats["avg_value_bytes"], 1) * 1024
+        if miss_ratio >= 0.2 and ms_per_kb >= self.min_ms_per_kb:
+            return ttl * self.max_step, f"{miss_ratio:.0%} misses costing {ms_per_kb:.1f}ms per KB"
+        return ttl, None
+    
+    def tune(self, telemetry) -> List[Dict[str, Any]]:
+        """Run one pass over the telemetry; returns the decisions made"""
+        now = time.monotonic()
+        window = max(now - self._previous_at, 1e-3)
+        snapshot = telemetry.snapshot()
+        made = []
+        
+        for name, ttl in list(self.live.items()):
+            stats = snapshot.get(name)
+            if stats is None:
+                continue
+            previous = self._previous.get(name, {})
+            if stats["hits"] < previous.get("hits", 0):
+                previous = {}  # telemetry was reset
+            delta = {field: stats[field] - previous.get(field, 0) for field in _RATE_FIELDS}
+            
+            proposed, reason = self.decide(ttl, window, delta, stats)
+            if reason is None:
+                continue
+            low, high = self.bounds.get(name, (ttl, ttl))
+            new_ttl = int(min(max(proposed, low), high))
+            if new_ttl == ttl:
+                continue
+            
+            self.live[name] = ttl_overrides[name] = new_ttl
+            decision = {
+                "at": datetime.now().isoformat(),
+                "namespace": name,
+                "old_ttl": ttl,
+                "new_ttl": new_ttl,
+                "reason": reason,
+                "reads": delta["hits"] + delta["misses"],
+                "hit_rate": stats["hit_rate"],
+                "invalidations": delta["invalidations"],
+                "avg_compute_ms": stats["avg_compute_ms"],
+                "avg_value_bytes": stats["avg_value_bytes"],
+            }
+            self.decisions.append(decision)
+            made.append(decision)
+        
+        self._previous = snapshot
+        self._previous_at = now
+        self.last_run = datetime.now().isoformat()
+        return made
+    
+    def reset(self):
+        """Back to TTL_CONFIG"""
+        for name in self.live:
+            ttl_overrides.pop(name, None)
+        self.live = dict(self.config)
+        self.decisions.clear()
+
+
+ttl_tuner = TTLTuner()
+
+
+async def _run_ttl_tuner(interval: float = ADAPTIVE_TTL_INTERVAL):
+    """Tune TTLs every interval from the manager's telemetry"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            for decision in ttl_tuner.tune(cache_manager.telemetry):
+                print(f"Cache TTL {decision['namespace']}: {decision['old_ttl']}s -> {decision['new_ttl']}s ({decision['reason']})")
+        except Exception as e:
+            print(f"Adaptive TTL pass failed: {e}")
+
 # ============ Cache Warming ============
 
 WARMING_SCHEDULE = {
@@ -68,7 +229,6 @@ WARMING_SCHEDULE = {
         ("holiday", 86400),
     ],
     "hourly": [
-        ("trending_habits", 3600),
         ("productivity_technique", 3600),
     ],
     "on_startup": [
@@ -78,92 +238,232 @@ WARMING_SCHEDULE = {
 }
 
 
+# Seconds between runs for each recurring schedule group
+SCHEDULE_INTERVALS = {
+    "daily": 86400,
+    "hourly": 3600,
+}
+
+WARM_CONCURRENCY = int(os.getenv("CACHE_WARM_CONCURRENCY", "4"))
+WARM_JITTER = float(os.getenv("CACHE_WARM_JITTER", "0.1"))  # fraction of TTL / interval
+WARM_STARTUP_TIMEOUT = float(os.getenv("CACHE_WARM_STARTUP_TIMEOUT", "10"))
+
+# Producers by WARMING_SCHEDULE key; registered by the modules that own the data
+WARMERS: Dict[str, Callable[..., Awaitable[Any]]] = {}
+
+# Last outcome per key, reported by /warm/status
+_warm_results: Dict[str, Dict[str, Any]] = {}
+_warm_semaphore: Optional[asyncio.Semaphore] = None
+_scheduler_tasks: List[asyncio.Task] = []
+
+
+def register_warmer(key: str, producer: Callable[..., Awaitable[Any]]):
+    """Register the producer that warms a WARMING_SCHEDULE key
+    
+    Producers are @cached coroutine functions; warming calls their
+    .refresh(cache_ttl=...) so values land under the same keys the
+    request path reads.
+    """
+    WARMERS[key] = producer
+    return producer
+
+
+def _jittered(seconds: float, spread: float = WARM_JITTER) -> float:
+    """seconds stretched by up to +spread, so keys warmed together expire apart"""
+    return seconds * (1 + random.uniform(0, spread))
+
+
 async def warm_cache(key: str, ttl: int):
     """Warm a specific cache key"""
-    # In production, this would populate the cache
-    return {"key": key, "warmed": True, "ttl": ttl}
+    global _warm_semaphore
+    producer = WARMERS.get(key)
+    if producer is None:
+        return {"key": key, "warmed": False, "ttl": ttl, "error": "no producer registered"}
+    
+    if _warm_semaphore is None:
+        _warm_semaphore = asyncio.Semaphore(WARM_CONCURRENCY)
+    
+    ttl = ttl_overrides.get(getattr(producer, "namespace", None), ttl)
+    effective_ttl = int(_jittered(ttl))
+    async with _warm_semaphore:
+        start = time.perf_counter()
+        try:
+            refresh = getattr(producer, "refresh", None)
+            if refresh is not None:
+                await refresh(cache_ttl=effective_ttl)
+            else:
+                await producer()
+            result = {"key": key, "warmed": True, "ttl": effective_ttl}
+        except Exception as e:
+            result = {"key": key, "warmed": False, "ttl": effective_ttl, "error": str(e)}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    
+    previous = _warm_results.get(key, {})
+    _warm_results[key] = {
+        **result,
+        "last_run": datetime.now().isoformat(),
+        "runs": previous.get("runs", 0) + 1,
+        "failures": previous.get("failures", 0) + (0 if result["warmed"] else 1),
+    }
+    return result
+
+
+async def warm_group(group: str):
+    """Warm every key of a WARMING_SCHEDULE group concurrently (bounded)"""
+    results = await asyncio.gather(*[
+        warm_cache(key, ttl) for key, ttl in WARMING_SCHEDULE[group]
+    ])
+    return {
+        "warmed": sum(1 for r in results if r["warmed"]),
+        "entries": list(results)
+    }
 
 
 async def warm_all_daily():
     """Warm all daily cache entries"""
-    results = []
-    for key, ttl in WARMING_SCHEDULE["daily"]:
-        result = await warm_cache(key, ttl)
-        results.append(result)
-    return {"warmed": len(results), "entries": results}
+    return await warm_group("daily")
 
 
 async def warm_all_hourly():
     """Warm all hourly cache entries"""
-    results = []
-    for key, ttl in WARMING_SCHEDULE["hourly"]:
-        result = await warm_cache(key, ttl)
-        results.append(result)
-    return {"warmed": len(results), "entries": results}
+    return await warm_group("hourly")
+
+
+async def _run_periodically(group: str, interval: float):
+    """Warm a group now and then every interval, always slightly early"""
+    while True:
+        try:
+            await warm_group(group)
+        except Exception as e:
+            print(f"Cache warming ({group}) failed: {e}")
+        await asyncio.sleep(interval * (1 - random.uniform(0, WARM_JITTER)))
+
+
+async def start_warming():
+    """Warm on_startup keys, then schedule the recurring groups and TTL tuner (app lifespan)
+    
+    Startup waits at most WARM_STARTUP_TIMEOUT for the on_startup group;
+    a group still running then keeps going as a background task.
+    """
+    loop = asyncio.get_running_loop()
+    startup = loop.create_task(warm_group("on_startup"))
+    _scheduler_tasks.append(startup)
+    _, pending = await asyncio.wait([startup], timeout=WARM_STARTUP_TIMEOUT)
+    if pending:
+        print("Startup cache warming timed out; continuing in the background")
+    
+    for group, interval in SCHEDULE_INTERVALS.items():
+        _scheduler_tasks.append(loop.create_task(_run_periodically(group, interval)))
+    if ADAPTIVE_TTL_ENABLED:
+        _scheduler_tasks.append(loop.create_task(_run_ttl_tuner()))
+
+
+async def stop_warming():
+    """Cancel the recurring warming and tuning tasks"""
+    global _warm_semaphore
+    for task in _scheduler_tasks:
+        task.cancel()
+    await asyncio.gather(*_scheduler_tasks, return_exceptions=True)
+    _scheduler_tasks.clear()
+    _warm_semaphore = None
 
 
 # ============ Cache Stats ============
 
 async def get_cache_stats() -> CacheStats:
-    """Get cache statistics"""
-    # In production, these would come from Redis
+    """Get cache statistics
+    
+    Hit/miss/eviction counters come from the manager's own telemetry
+    (every tier, per namespace); memory, key count and expirations come
+    from Redis when it is connected, else from the in-process fallback.
+    """
+    stats = await cache_manager.stats()
+    totals = stats["totals"]
+    redis = stats["redis"]
+    memory = stats["memory"]
+    
+    if redis.get("connected") and "keys" in redis:
+        backend = "redis"
+        memory_bytes = redis.get("used_memory_bytes", 0)
+        keys_count = redis["keys"]
+        expired_keys = redis.get("expired_keys", 0)
+        evictions = totals["evictions"] + redis.get("evicted_keys", 0)
+    else:
+        backend = "memory"
+        memory_bytes = memory["bytes"]
+        keys_count = memory["keys"]
+        expired_keys = memory["expirations"]
+        evictions = totals["evictions"]
+    
     return CacheStats(
-        hits=12500,
-        misses=3200,
-        hit_rate=12500 / (12500 + 3200) * 100,
-        memory_used_mb=45.2,
-        keys_count=450,
-        expired_keys=120,
-        avg_ttl_seconds=43200
+        hits=totals["hits"],
+        misses=totals["misses"],
+        hit_rate=totals["hit_rate"],
+        memory_used_mb=round(memory_bytes / (1024 * 1024), 2),
+        keys_count=keys_count,
+        expired_keys=expired_keys,
+        avg_ttl_seconds=totals["avg_ttl_seconds"],
+        evictions=evictions,
+        backend=backend,
+        since=totals["since"],
+        namespaces=stats["namespaces"]
     )
 
 
-async def get_cache_keys(limit: int = 50) -> List[CacheKeyInfo]:
-    """Get cache key information"""
-    # In production, this would scan Redis keys
+async def get_cache_keys(limit: int = 50, budget_ms: float = 50) -> List[CacheKeyInfo]:
+    """Get cache key information from a time-boxed sample of the keyspace"""
+    now = time.time()
     keys = []
-    patterns = list(TTL_CONFIG.keys())[:5]
-    for pattern in patterns:
+    for entry in await cache_manager.sample_keys(limit, budget_ms):
+        idle = entry["idle_seconds"]
         keys.append(CacheKeyInfo(
-            key=pattern,
-            pattern=pattern,
-            ttl_seconds=TTL_CONFIG.get(pattern, 3600),
-            size_bytes=random.randint(100, 10000),
-            access_count=random.randint(10, 1000),
-            last_access=datetime.now().isoformat()
+            key=entry["key"],
+            pattern=key_namespace(entry["key"]),
+            ttl_seconds=entry["ttl_seconds"],
+            size_bytes=entry["size_bytes"],
+            idle_seconds=idle,
+            last_access=datetime.fromtimestamp(now - idle).isoformat() if idle is not None else None
         ))
     return keys
 
 
 async def get_recommendations() -> List[CacheRecommendation]:
-    """Get cache optimization recommendations"""
+    """Get cache optimization recommendations from live telemetry"""
     recommendations = []
     
     # Get current stats
     stats = await get_cache_stats()
     
-    if stats.hit_rate < 80:
-        recommendations.append(CacheRecommendation(
-            area="hit_rate",
-            recommendation="Consider increasing TTL for frequently accessed keys",
-            impact="Could improve hit rate by 15-25%",
-            priority="high"
-        ))
+    for name, ns in stats.namespaces.items():
+        lookups = ns["hits"] + ns["misses"]
+        if lookups >= ADAPTIVE_TTL_MIN_READS and ns["hit_rate"] < 50:
+            recommendations.append(CacheRecommendation(
+                area="hit_rate",
+                recommendation=(
+                    f"'{name}' hits {ns['hit_rate']}% of {lookups} lookups; "
+                    + ("the adaptive tuner is adjusting its TTL" if ADAPTIVE_TTL_ENABLED
+                       else "set CACHE_ADAPTIVE_TTL=true or lengthen its TTL")
+                ),
+                impact=f"~{ns['avg_compute_ms']}ms recompute per miss",
+                priority="high" if ns["avg_compute_ms"] >= 100 else "medium"
+            ))
     
-    if stats.avg_ttl_seconds > 86400:
+    if stats.evictions:
         recommendations.append(CacheRecommendation(
-            area="ttl",
-            recommendation="Some keys have TTL > 24h. Consider refreshing daily.",
-            impact="Reduce stale data risk",
+            area="memory",
+            recommendation=f"{stats.evictions} entries evicted for space; raise Redis maxmemory or MEMORY_CACHE_MAX_BYTES",
+            impact="Evicted entries are recomputed on their next read",
             priority="medium"
         ))
     
-    recommendations.append(CacheRecommendation(
-        area="warming",
-        recommendation="Implement cache warming on startup",
-        impact="Reduce cold-start latency by 30-50%",
-        priority="medium"
-    ))
+    unregistered = [key for group in WARMING_SCHEDULE.values() for key, _ in group if key not in WARMERS]
+    if unregistered:
+        recommendations.append(CacheRecommendation(
+            area="warming",
+            recommendation=f"No warmer registered for: {', '.join(unregistered)}",
+            impact="These keys are computed on the first request after expiry",
+            priority="low"
+        ))
     
     return recommendations
 
@@ -177,21 +477,45 @@ async def get_cache_statistics():
 
 
 @router.get("/keys")
-async def list_cache_keys(limit: int = 50):
-    """List cache keys with metadata"""
-    keys = await get_cache_keys(limit)
+async def list_cache_keys(limit: int = Query(50, ge=1, le=1000), budget_ms: float = Query(50, gt=0, le=1000)):
+    """List a sample of cache keys with size, idle time and TTL"""
+    keys = await get_cache_keys(limit, budget_ms)
     return {"keys": keys, "total": len(keys)}
 
 
+@router.get("/responses")
+async def response_cache_stats():
+    """HTTP response cache statistics (static module content)"""
+    return response_cache.stats()
+
+
+@router.delete("/responses")
+async def clear_response_cache(tag: Optional[str] = None):
+    """Drop cached HTTP responses for a content tag, or all of them"""
+    return {"success": True, "invalidated": response_cache.invalidate(tag)}
+
+
 @router.get("/ttl")
-async def get_ttl_config():
-    """Get TTL configuration"""
+async def get_ttl_config(decisions: int = Query(50, ge=0, le=200)):
+    """Live TTL table, its bounds and the adaptive tuner's decision log"""
     return {
+        "adaptive": ADAPTIVE_TTL_ENABLED,
+        "interval_seconds": ADAPTIVE_TTL_INTERVAL,
         "config": TTL_CONFIG,
+        "live": ttl_tuner.live,
+        "bounds": TTL_BOUNDS,
+        "decisions": list(ttl_tuner.decisions)[-decisions:] if decisions else [],
+        "last_run": ttl_tuner.last_run,
         "updated": datetime.now().isoformat()
     }
 
 
+@router.post("/ttl/tune")
+async def tune_ttl_now():
+    """Run one adaptive TTL pass immediately"""
+    return {"decisions": ttl_tuner.tune(cache_manager.telemetry)}
+
+
 @router.post("/warm/daily")
 async def warm_daily_cache():
     """Warm daily cache entries"""
@@ -207,12 +531,25 @@ async def warm_hourly_cache():
 @router.post("/warm/all")
 async def warm_all_cache():
     """Warm all cache entries"""
+    startup = await warm_group("on_startup")
     daily = await warm_all_daily()
     hourly = await warm_all_hourly()
     return {
+        "on_startup": startup["warmed"],
         "daily": daily["warmed"],
         "hourly": hourly["warmed"],
-        "total": daily["warmed"] + hourly["warmed"]
+        "total": startup["warmed"] + daily["warmed"] + hourly["warmed"]
+    }
+
+
+@router.get("/warm/status")
+async def warm_status():
+    """Last warm outcome and latency per scheduled key"""
+    return {
+        "schedule": WARMING_SCHEDULE,
+        "registered": sorted(WARMERS),
+        "scheduler_running": any(not t.done() for t in _scheduler_tasks),
+        "results": _warm_results
     }
 
 
@@ -2,25 +2,43 @@
 Redis Cache Layer
 
 Production-ready caching with Redis:
-- Connection management
+- Connection management (pooled, asyncio-native)
 - Cache patterns
 - TTL management
 - Cache invalidation
 """
 from fastapi import FastAPI
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Callable
+from collections import OrderedDict
 from datetime import datetime
+import asyncio
+import fnmatch
+import functools
+import heapq
+import itertools
 import json
 import hashlib
+import math
 import os
+import random
+import socket
+import sys
+import threading
+import time
+import typing
+import uuid
+
+from .serialization import Serializer, default_serializer
 
 # Try to import Redis (optional dependency)
 try:
     import redis
+    import redis.asyncio as aioredis
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
     redis = None
+    aioredis = None
 
 # ============ Configuration ============
 
@@ -28,21 +46,118 @@ REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 REDIS_DB = int(os.getenv("REDIS_DB", "0"))
 DEFAULT_TTL = int(os.getenv("CACHE_TTL", "300"))  # 5 minutes
 
+# Connection pool settings (shared by every request on a worker)
+REDIS_POOL_SIZE = int(os.getenv("REDIS_POOL_SIZE", "50"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "1.0"))  # wait for a free connection
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "1.0"))
+REDIS_RETRY_INTERVAL = float(os.getenv("REDIS_RETRY_INTERVAL", "5"))  # seconds between reconnects
+
+# Near cache (L1): hot keys served from process memory in front of Redis
+NEAR_CACHE_ENABLED = os.getenv("NEAR_CACHE_ENABLED", "true").lower() == "true"
+NEAR_CACHE_TTL = int(os.getenv("NEAR_CACHE_TTL", "30"))  # upper bound on cross-worker staleness
+NEAR_CACHE_MAX_ENTRIES = int(os.getenv("NEAR_CACHE_MAX_ENTRIES", "2000"))
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "organic_os:cache:invalidate")
+
+# Keyspace iteration: SCAN instead of KEYS, bulk operations in batches
+REDIS_SCAN_COUNT = int(os.getenv("REDIS_SCAN_COUNT", "500"))
+REDIS_BATCH_SIZE = int(os.getenv("REDIS_BATCH_SIZE", "500"))
+
+# Every key is indexed in a sorted set named after its namespace (text
+# before the first ":"), scored by expiry time, so prefix invalidation only
+# touches that namespace's live keys. Writes trim members that have expired
+# and deletes remove theirs, so an index never outgrows its live keys.
+# Namespaces in use are listed in CACHE_NAMESPACES for prefixes without ":"
+CACHE_TAG_PREFIX = "__tagidx__:"
+CACHE_NAMESPACES = CACHE_TAG_PREFIX + "__namespaces__"
+CACHE_TAG_TTL = int(os.getenv("CACHE_TAG_TTL", "604800"))  # longest TTL in use
+# Plain sets used before the sorted-set index; swept by delete_prefix until
+# they expire (CACHE_TAG_TTL after the last write that used them)
+LEGACY_TAG_PREFIX = "__tag__:"
+INDEX_KEY_PREFIXES = (CACHE_TAG_PREFIX.encode(), LEGACY_TAG_PREFIX.encode())
+
+
+def cache_tag(key: str) -> str:
+    """Name of the index that tracks key's namespace"""
+    return CACHE_TAG_PREFIX + key_namespace(key)
+
+
+def _group_by_tag(keys) -> Dict[str, List[str]]:
+    tags: Dict[str, List[str]] = {}
+    for key in keys:
+        tags.setdefault(cache_tag(key), []).append(key)
+    return tags
+
+
+def _queue_index(pipe, keys: List[str], ttl: int):
+    """Queue index updates for keys written with ttl on a pipeline"""
+    now = time.time()
+    for tag, members in _group_by_tag(keys).items():
+        pipe.zadd(tag, {key: now + ttl for key in members})
+        pipe.zremrangebyscore(tag, "-inf", now)
+        pipe.expire(tag, max(ttl, CACHE_TAG_TTL))
+        pipe.sadd(CACHE_NAMESPACES, tag[len(CACHE_TAG_PREFIX):])
+    pipe.expire(CACHE_NAMESPACES, CACHE_TAG_TTL)
+
+
+def _queue_unindex(pipe, keys):
+    """Queue removal of deleted keys from their indexes"""
+    for tag, members in _group_by_tag(keys).items():
+        pipe.zrem(tag, *members)
+
+
+def _prefix_tags(prefix: str, namespaces) -> List[str]:
+    """Indexes that can hold keys starting with prefix
+    
+    With a ":" the prefix names its namespace; without one it may be part
+    of any namespace name, so every namespace in use that starts with it.
+    """
+    if ":" in prefix:
+        return [cache_tag(prefix)]
+    names = (name.decode() if isinstance(name, bytes) else name for name in namespaces)
+    return [CACHE_TAG_PREFIX + name for name in names if name.startswith(prefix)]
+
+
+def _batches(items, size: int = REDIS_BATCH_SIZE):
+    """Yield lists of at most size items from any iterable"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _abatches(items, size: int = REDIS_BATCH_SIZE):
+    """Async version of _batches for scan_iter/sscan_iter"""
+    batch = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 # ============ Cache Client ============
 
 class RedisCache:
-    """Redis cache client with patterns"""
+    """Blocking Redis cache client, kept for sync callers and scripts"""
     
     def __init__(
         self,
         url: str = REDIS_URL,
         db: int = REDIS_DB,
-        decode_responses: bool = True
+        serializer: Serializer = default_serializer
     ):
         self.url = url
         self.db = db
+        self.serializer = serializer
         self._client = None
         self._connected = False
+        self._next_retry = 0.0
     
     def connect(self):
         """Establish Redis connection"""
@@ -51,18 +166,23 @@ class RedisCache:
             return False
         
         try:
-            self._client = redis.Redis(
-                host=self.url.split("://")[1].split(":")[0],
-                port=int(self.url.split(":")[-1]),
-                db=self.db,
-                decode_responses=decode_responses
-            )
+            if self._client is None:
+                pool = redis.BlockingConnectionPool.from_url(
+                    self.url,
+                    db=self.db,
+                    max_connections=REDIS_POOL_SIZE,
+                    timeout=REDIS_POOL_TIMEOUT,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=REDIS_CONNECT_TIMEOUT
+                )
+                self._client = redis.Redis(connection_pool=pool)
             self._client.ping()
             self._connected = True
             return True
         except Exception as e:
             print(f"Redis connection failed: {e}")
             self._connected = False
+            self._next_retry = time.monotonic() + REDIS_RETRY_INTERVAL
             return False
     
     def is_connected(self) -> bool:
@@ -71,7 +191,7 @@ class RedisCache:
     
     def _ensure_connected(self):
         """Ensure connection, try to reconnect if needed"""
-        if not self._connected:
+        if not self._connected and time.monotonic() >= self._next_retry:
             self.connect()
     
     def get(self, key: str) -> Optional[Any]:
@@ -83,7 +203,7 @@ class RedisCache:
         try:
             value = self._client.get(key)
             if value:
-                return json.loads(value)
+                return self.serializer.loads(value)
             return None
         except Exception:
             return None
@@ -100,8 +220,11 @@ class RedisCache:
             return False
         
         try:
-            serialized = json.dumps(value)
-            self._client.setex(key, ttl, serialized)
+            serialized = self.serializer.dumps(value)
+            pipe = self._client.pipeline(transaction=False)
+            pipe.setex(key, ttl, serialized)
+            _queue_index(pipe, [key], ttl)
+            pipe.execute()
             return True
         except Exception:
             return False
@@ -113,7 +236,10 @@ class RedisCache:
             return False
         
         try:
-            self._client.delete(key)
+            pipe = self._client.pipeline(transaction=False)
+            pipe.delete(key)
+            _queue_unindex(pipe, [key])
+            pipe.execute()
             return True
         except Exception:
             return False
@@ -130,39 +256,72 @@ class RedisCache:
             return False
     
     def get_pattern(self, pattern: str) -> Dict[str, Any]:
-        """Get all values matching pattern"""
+        """Get all values matching pattern (SCAN + batched MGET)"""
         self._ensure_connected()
         if not self.is_connected():
             return {}
         
         try:
-            keys = self._client.keys(pattern)
             result = {}
-            for key in keys:
-                value = self._client.get(key)
-                if value:
-                    result[key] = json.loads(value)
+            keys = self._client.scan_iter(match=pattern, count=REDIS_SCAN_COUNT)
+            for batch in _batches(keys):
+                for key, value in zip(batch, self._client.mget(batch)):
+                    if value:
+                        result[key.decode()] = self.serializer.loads(value)
             return result
         except Exception:
             return {}
     
+    def _unlink(self, keys) -> int:
+        """UNLINK keys in pipelined batches; returns how many existed"""
+        deleted = 0
+        for batch in _batches(keys):
+            pipe = self._client.pipeline(transaction=False)
+            pipe.unlink(*batch)
+            deleted += sum(pipe.execute())
+        return deleted
+    
     def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern"""
+        """Delete all keys matching pattern (SCAN, never KEYS)"""
         self._ensure_connected()
         if not self.is_connected():
             return 0
         
         try:
-            keys = self._client.keys(pattern)
-            if keys:
-                return self._client.delete(*keys)
-            return 0
+            return self._unlink(self._client.scan_iter(match=pattern, count=REDIS_SCAN_COUNT))
         except Exception:
             return 0
     
     def delete_prefix(self, prefix: str) -> int:
-        """Delete all keys with prefix"""
-        return self.delete_pattern(f"{prefix}*")
+        """Delete all keys with prefix, through the namespace indexes (never SCAN)"""
+        self._ensure_connected()
+        if not self.is_connected():
+            return 0
+        
+        try:
+            raw_prefix = prefix.encode()
+            deleted = 0
+            for tag in _prefix_tags(prefix, self._client.smembers(CACHE_NAMESPACES)):
+                self._client.zremrangebyscore(tag, "-inf", time.time())
+                members = [
+                    key for key, _ in self._client.zscan_iter(tag, count=REDIS_SCAN_COUNT)
+                    if key.startswith(raw_prefix)
+                ]
+                deleted += self._unlink(members)
+                for batch in _batches(members):
+                    self._client.zrem(tag, *batch)
+            
+            legacy = LEGACY_TAG_PREFIX + key_namespace(prefix)
+            members = [
+                key for key in self._client.sscan_iter(legacy, count=REDIS_SCAN_COUNT)
+                if key.startswith(raw_prefix)
+            ]
+            deleted += self._unlink(members)
+            for batch in _batches(members):
+                self._client.srem(legacy, *batch)
+            return deleted
+        except Exception:
+            return 0
     
     def hget(self, key: str, field: str) -> Optional[Any]:
         """Get field from hash"""
@@ -173,7 +332,7 @@ class RedisCache:
         try:
             value = self._client.hget(key, field)
             if value:
-                return json.loads(value)
+                return self.serializer.loads(value)
             return None
         except Exception:
             return None
@@ -191,7 +350,7 @@ class RedisCache:
             return False
         
         try:
-            serialized = json.dumps(value)
+            serialized = self.serializer.dumps(value)
             self._client.hset(key, field, serialized)
             self._client.expire(key, ttl)
             return True
@@ -236,15 +395,433 @@ class RedisCache:
             return False
 
 
+class AsyncRedisCache:
+    """Asyncio Redis client backed by a shared, bounded connection pool"""
+    
+    def __init__(
+        self,
+        url: str = REDIS_URL,
+        db: int = REDIS_DB,
+        max_connections: int = REDIS_POOL_SIZE,
+        serializer: Serializer = default_serializer
+    ):
+        self.url = url
+        self.db = db
+        self.max_connections = max_connections
+        self.serializer = serializer
+        # Called as on_write(key, encoded_size, ttl) after each successful write
+        self.on_write: Optional[Callable[[str, int, int], None]] = None
+        self._pool = None
+        self._client = None
+        self._connected = False
+        self._next_retry = 0.0
+    
+    async def connect(self) -> bool:
+        """Create the pool (once) and verify the server answers"""
+        if not REDIS_AVAILABLE:
+            self._connected = False
+            return False
+        
+        try:
+            if self._client is None:
+                self._pool = aioredis.BlockingConnectionPool.from_url(
+                    self.url,
+                    db=self.db,
+                    max_connections=self.max_connections,
+                    timeout=REDIS_POOL_TIMEOUT,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=REDIS_CONNECT_TIMEOUT
+                )
+                self._client = aioredis.Redis(connection_pool=self._pool)
+            await self._client.ping()
+            self._connected = True
+            return True
+        except Exception as e:
+            print(f"Redis connection failed: {e}")
+            self._mark_down()
+            return False
+    
+    async def close(self):
+        """Release pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+        if self._pool is not None:
+            await self._pool.disconnect()
+        self._client = None
+        self._pool = None
+        self._connected = False
+    
+    def is_connected(self) -> bool:
+        """Check if Redis is connected"""
+        return self._connected and self._client is not None
+    
+    def _mark_down(self):
+        """Stop using Redis until the retry interval has passed"""
+        self._connected = False
+        self._next_retry = time.monotonic() + REDIS_RETRY_INTERVAL
+    
+    async def _ensure_connected(self) -> bool:
+        """Reconnect lazily, at most once per retry interval"""
+        if self._connected:
+            return True
+        if time.monotonic() < self._next_retry:
+            return False
+        return await self.connect()
+    
+    def _handle_error(self, error: Exception):
+        """Connection-level failures take Redis out of rotation"""
+        if isinstance(error, (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)):
+            self._mark_down()
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from cache"""
+        if not await self._ensure_connected():
+            return None
+        
+        try:
+            value = await self._client.get(key)
+            if value:
+                return self.serializer.loads(value)
+            return None
+        except Exception as e:
+            self._handle_error(e)
+            return None
+    
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """Value and seconds left before it expires (None: no expiry), in one round trip"""
+        found = await self.mget_with_ttl([key])
+        return found.get(key, (None, None))
+    
+    async def mget_with_ttl(self, keys: List[str]) -> Dict[str, Tuple[Any, Optional[float]]]:
+        """Like mget, with each value's remaining TTL in seconds (GET + PTTL pipelined)"""
+        if not keys or not await self._ensure_connected():
+            return {}
+        
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.get(key)
+                    pipe.pttl(key)
+                replies = await pipe.execute()
+            found = {}
+            for key, value, pttl in zip(keys, replies[::2], replies[1::2]):
+                # PTTL is -1 without an expiry, -2 once the key is gone
+                if value and pttl != -2:
+                    found[key] = (self.serializer.loads(value), pttl / 1000 if pttl >= 0 else None)
+            return found
+        except Exception as e:
+            self._handle_error(e)
+            return {}
+    
+    async def set(self, key: str, value: Any, ttl: int = DEFAULT_TTL) -> bool:
+        """Set value in cache"""
+        if not await self._ensure_connected():
+            return False
+        
+        try:
+            payload = self.serializer.dumps(value)
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, payload)
+                _queue_index(pipe, [key], ttl)
+                await pipe.execute()
+            if self.on_write is not None:
+                self.on_write(key, len(payload), ttl)
+            return True
+        except Exception as e:
+            self._handle_error(e)
+            return False
+    
+    async def delete(self, *keys: str) -> int:
+        """Delete keys from cache"""
+        if not keys or not await self._ensure_connected():
+            return 0
+        
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                _queue_unindex(pipe, keys)
+                return (await pipe.execute())[0]
+        except Exception as e:
+            self._handle_error(e)
+            return 0
+    
+    async def exists(self, key: str) -> bool:
+        """Check if key exists"""
+        if not await self._ensure_connected():
+            return False
+        
+        try:
+            return bool(await self._client.exists(key))
+        except Exception as e:
+            self._handle_error(e)
+            return False
+    
+    async def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values in one round trip (missing keys are omitted)"""
+        if not keys or not await self._ensure_connected():
+            return {}
+        
+        try:
+            values = await self._client.mget(keys)
+            return {
+                key: self.serializer.loads(value)
+                for key, value in zip(keys, values)
+                if value
+            }
+        except Exception as e:
+            self._handle_error(e)
+            return {}
+    
+    async def mset(self, mapping: Dict[str, Any], ttl: int = DEFAULT_TTL) -> bool:
+        """Set several values with a TTL in one pipelined round trip"""
+        if not mapping or not await self._ensure_connected():
+            return False
+        
+        try:
+            payloads = {key: self.serializer.dumps(value) for key, value in mapping.items()}
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key, payload in payloads.items():
+                    pipe.setex(key, ttl, payload)
+                _queue_index(pipe, list(payloads), ttl)
+                await pipe.execute()
+            if self.on_write is not None:
+                for key, payload in payloads.items():
+                    self.on_write(key, len(payload), ttl)
+            return True
+        except Exception as e:
+            self._handle_error(e)
+            return False
+    
+    async def _unlink(self, batches) -> int:
+        """UNLINK keys batch by batch; returns how many existed"""
+        deleted = 0
+        async for batch in batches:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.unlink(*batch)
+                deleted += sum(await pipe.execute())
+        return deleted
+    
+    async def get_pattern(self, pattern: str) -> Dict[str, Any]:
+        """Get all values matching pattern (SCAN + batched MGET)"""
+        if not await self._ensure_connected():
+            return {}
+        
+        try:
+            result = {}
+            keys = self._client.scan_iter(match=pattern, count=REDIS_SCAN_COUNT)
+            async for batch in _abatches(keys):
+                for key, value in zip(batch, await self._client.mget(batch)):
+                    if value:
+                        result[key.decode()] = self.serializer.loads(value)
+            return result
+        except Exception as e:
+            self._handle_error(e)
+            return {}
+    
+    async def delete_pattern(self, pattern: str) -> int:
+        """Delete all keys matching pattern (SCAN, never KEYS)"""
+        if not await self._ensure_connected():
+            return 0
+        
+        try:
+            keys = self._client.scan_iter(match=pattern, count=REDIS_SCAN_COUNT)
+            return await self._unlink(_abatches(keys))
+        except Exception as e:
+            self._handle_error(e)
+            return 0
+    
+    async def delete_prefix(self, prefix: str) -> int:
+        """Delete all keys with prefix
+        
+        Costs O(live keys in the matching namespaces) via their indexes;
+        the keyspace is never SCANned.
+        """
+        if not await self._ensure_connected():
+            return 0
+        
+        try:
+            raw_prefix = prefix.encode()
+            deleted = 0
+            for tag in _prefix_tags(prefix, await self._client.smembers(CACHE_NAMESPACES)):
+                await self._client.zremrangebyscore(tag, "-inf", time.time())
+                members = (key async for key, _ in self._client.zscan_iter(tag, count=REDIS_SCAN_COUNT))
+                deleted += await self._unlink_indexed(tag, members, raw_prefix, "zrem")
+            legacy = LEGACY_TAG_PREFIX + key_namespace(prefix)
+            members = self._client.sscan_iter(legacy, count=REDIS_SCAN_COUNT)
+            deleted += await self._unlink_indexed(legacy, members, raw_prefix, "srem")
+            return deleted
+        except Exception as e:
+            self._handle_error(e)
+            return 0
+    
+    async def _unlink_indexed(self, tag: str, members, raw_prefix: bytes, remove: str) -> int:
+        """UNLINK an index's members that start with raw_prefix and drop them from it"""
+        deleted = 0
+        async for batch in _abatches(members):
+            matching = [key for key in batch if key.startswith(raw_prefix)]
+            if not matching:
+                continue
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.unlink(*matching)
+                getattr(pipe, remove)(tag, *matching)
+                deleted += (await pipe.execute())[0]
+        return deleted
+    
+    async def sample_keys(
+        self,
+        limit: int = 50,
+        budget_ms: float = 50,
+        match: str = "*"
+    ) -> List[Dict[str, Any]]:
+        """Inspect up to limit keys (SCAN + MEMORY USAGE + OBJECT IDLETIME + TTL)
+        
+        Stops as soon as budget_ms has been spent, so calling this on a
+        large keyspace never holds a request (or Redis) for long.
+        """
+        if not await self._ensure_connected():
+            return []
+        
+        deadline = time.perf_counter() + budget_ms / 1000
+        sampled = []
+        cursor = 0
+        try:
+            while len(sampled) < limit and time.perf_counter() < deadline:
+                cursor, keys = await self._client.scan(cursor, match=match, count=REDIS_SCAN_COUNT)
+                keys = [k for k in keys if not k.startswith(INDEX_KEY_PREFIXES)][:limit - len(sampled)]
+                if keys:
+                    async with self._client.pipeline(transaction=False) as pipe:
+                        for key in keys:
+                            pipe.memory_usage(key)
+                            pipe.object("idletime", key)
+                            pipe.ttl(key)
+                        replies = await pipe.execute(raise_on_error=False)
+                    for i, key in enumerate(keys):
+                        size, idle, ttl = replies[i * 3:i * 3 + 3]
+                        sampled.append({
+                            "key": key.decode(),
+                            "size_bytes": size if isinstance(size, int) else None,
+                            "idle_seconds": idle if isinstance(idle, int) else None,
+                            "ttl_seconds": ttl if isinstance(ttl, int) else None
+                        })
+                if cursor == 0:
+                    break
+        except Exception as e:
+            self._handle_error(e)
+        return sampled
+    
+    async def publish(self, channel: str, message: Dict[str, Any]) -> bool:
+        """Publish a JSON message on a channel"""
+        if not await self._ensure_connected():
+            return False
+        
+        try:
+            await self._client.publish(channel, json.dumps(message))
+            return True
+        except Exception as e:
+            self._handle_error(e)
+            return False
+    
+    async def subscribe(self, channel: str):
+        """Return a PubSub subscribed to channel, or None if Redis is down"""
+        if not await self._ensure_connected():
+            return None
+        
+        try:
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(channel)
+            return pubsub
+        except Exception as e:
+            self._handle_error(e)
+            return None
+    
+    async def stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        if not await self._ensure_connected():
+            return {
+                "connected": False,
+                "message": "Redis not available"
+            }
+        
+        try:
+            info = await self._client.info("stats")
+            memory = await self._client.info("memory")
+            return {
+                "connected": True,
+                "keys": await self._client.dbsize(),
+                "hits": info.get("keyspace_hits", 0),
+                "misses": info.get("keyspace_misses", 0),
+                "expired_keys": info.get("expired_keys", 0),
+                "evicted_keys": info.get("evicted_keys", 0),
+                "used_memory_bytes": memory.get("used_memory", 0),
+                "uptime_seconds": info.get("uptime_in_seconds", 0),
+                "pool": {
+                    "max_connections": self.max_connections,
+                    "timeout_seconds": REDIS_POOL_TIMEOUT
+                }
+            }
+        except Exception as e:
+            self._handle_error(e)
+            return {
+                "connected": self._connected,
+                "error": str(e)
+            }
+    
+    async def clear_all(self) -> bool:
+        """Clear all cache"""
+        if not await self._ensure_connected():
+            return False
+        
+        try:
+            await self._client.flushdb()
+            return True
+        except Exception as e:
+            self._handle_error(e)
+            return False
+
+
 # ============ Fallback In-Memory Cache ============
 
+MEMORY_CACHE_MAX_ENTRIES = int(os.getenv("MEMORY_CACHE_MAX_ENTRIES", "10000"))
+MEMORY_CACHE_MAX_BYTES = int(os.getenv("MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64 MB
+MEMORY_CACHE_SWEEP_INTERVAL = float(os.getenv("MEMORY_CACHE_SWEEP_INTERVAL", "30"))
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate the memory footprint of a cached value"""
+    try:
+        return default_serializer.encoded_size(value)
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
 class MemoryCache:
-    """In-memory fallback when Redis is unavailable"""
+    """Bounded in-process LRU cache with per-entry expiry
     
-    def __init__(self):
-        self._store: Dict[str, Any] = {}
-        self._timestamps: Dict[str, float] = {}
+    Entries live in an OrderedDict (least recently used first) as
+    ``(value, deadline, size)`` tuples, so get/set/evict are O(1).
+    Expired entries are dropped lazily on access and by a periodic
+    sweeper that pops a deadline heap instead of scanning every key.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = MEMORY_CACHE_MAX_ENTRIES,
+        max_bytes: int = MEMORY_CACHE_MAX_BYTES
+    ):
+        self._store: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._deadlines: List[Tuple[float, str]] = []
         self._ttl: int = DEFAULT_TTL
+        self._lock = threading.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # Called as on_evict(key) for every LRU eviction
+        self.on_evict: Optional[Callable[[str], None]] = None
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
     
     def set_ttl(self, ttl: int):
         """Set default TTL"""
@@ -252,93 +829,318 @@ class MemoryCache:
     
     def get(self, key: str) -> Optional[Any]:
         """Get value"""
-        self._clean_expired()
-        return self._store.get(key)
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+            return entry[0]
     
     def set(self, key: str, value: Any, ttl: int = None) -> bool:
         """Set value"""
-        self._store[key] = value
-        self._timestamps[key] = self._ttl if ttl is None else ttl
+        ttl = self._ttl if ttl is None else ttl
+        if ttl <= 0:
+            self.delete(key)
+            return True
+        
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return False
+        
+        deadline = time.monotonic() + ttl
+        with self._lock:
+            if key in self._store:
+                self._remove(key)
+            self._store[key] = (value, deadline, size)
+            self.bytes_used += size
+            heapq.heappush(self._deadlines, (deadline, key))
+            self._evict()
         return True
     
     def delete(self, key: str) -> bool:
         """Delete key"""
-        self._store.pop(key, None)
-        self._timestamps.pop(key, None)
+        with self._lock:
+            self._remove(key)
+        return True
+    
+    def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values (missing keys are omitted)"""
+        result = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                result[key] = value
+        return result
+    
+    def mset(self, mapping: Dict[str, Any], ttl: int = None) -> bool:
+        """Set several values"""
+        for key, value in mapping.items():
+            self.set(key, value, ttl)
         return True
     
     def exists(self, key: str) -> bool:
         """Check if key exists"""
-        self._clean_expired()
-        return key in self._store
+        with self._lock:
+            entry = self._store.get(key)
+            return entry is not None and entry[1] > time.monotonic()
     
     def delete_pattern(self, pattern: str) -> int:
-        """Delete by pattern"""
-        self._clean_expired()
-        to_delete = [k for k in self._store.keys() if pattern.replace("*", "") in k]
-        for k in to_delete:
-            self.delete(k)
+        """Delete by glob pattern"""
+        with self._lock:
+            to_delete = [k for k in self._store if fnmatch.fnmatchcase(k, pattern)]
+            for k in to_delete:
+                self._remove(k)
         return len(to_delete)
     
     def delete_prefix(self, prefix: str) -> int:
         """Delete by prefix"""
         return self.delete_pattern(f"{prefix}*")
     
+    def entry_size(self, key: str) -> int:
+        """Estimated size of a stored entry (0 if absent)"""
+        entry = self._store.get(key)
+        return entry[2] if entry is not None else 0
+    
+    def sample_keys(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recently used entries with size and remaining TTL"""
+        now = time.monotonic()
+        with self._lock:
+            recent = list(itertools.islice(reversed(self._store.items()), limit))
+        return [
+            {
+                "key": key,
+                "size_bytes": size,
+                "idle_seconds": None,
+                "ttl_seconds": max(0, int(deadline - now))
+            }
+            for key, (_, deadline, size) in recent
+        ]
+    
     def stats(self) -> Dict[str, Any]:
         """Get statistics"""
-        self._clean_expired()
+        lookups = self.hits + self.misses
         return {
             "connected": True,
             "type": "memory",
             "keys": len(self._store),
+            "bytes": self.bytes_used,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
             "ttl_default": self._ttl
         }
     
     def clear_all(self) -> bool:
         """Clear all"""
-        self._store.clear()
-        self._timestamps.clear()
+        with self._lock:
+            self._store.clear()
+            self._deadlines.clear()
+            self.bytes_used = 0
         return True
     
-    def _clean_expired(self):
-        """Remove expired entries"""
-        now = datetime.utcnow().timestamp()
-        expired = [k for k, v in self._timestamps.items() if v <= 0 or now > v]
-        for k in expired:
-            self._store.pop(k, None)
-            self._timestamps.pop(k, None)
+    def sweep(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        removed = 0
+        now = time.monotonic()
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] <= now:
+                deadline, key = heapq.heappop(self._deadlines)
+                entry = self._store.get(key)
+                # Skip heap records left behind by overwrites and deletes
+                if entry is not None and entry[1] == deadline:
+                    self._remove(key)
+                    removed += 1
+            # Overwrites leave stale heap records behind; compact occasionally
+            if len(self._deadlines) > 2 * len(self._store) + 64:
+                self._deadlines = [(entry[1], k) for k, entry in self._store.items()]
+                heapq.heapify(self._deadlines)
+            self.expirations += removed
+        return removed
+    
+    def start_sweeper(self, interval: float = MEMORY_CACHE_SWEEP_INTERVAL):
+        """Run sweep() periodically on the running event loop"""
+        if self._sweeper is not None and not self._sweeper.done():
+            return
+        
+        async def _run():
+            while True:
+                await asyncio.sleep(interval)
+                self.sweep()
+        
+        self._sweeper = asyncio.get_running_loop().create_task(_run())
+    
+    async def stop_sweeper(self):
+        """Cancel the periodic sweeper"""
+        if self._sweeper is None:
+            return
+        self._sweeper.cancel()
+        try:
+            await self._sweeper
+        except asyncio.CancelledError:
+            pass
+        self._sweeper = None
+    
+    def _remove(self, key: str):
+        """Remove an entry (caller holds the lock)"""
+        entry = self._store.pop(key, None)
+        if entry is not None:
+            self.bytes_used -= entry[2]
+    
+    def _evict(self):
+        """Evict least recently used entries until within budget (caller holds the lock)"""
+        while self._store and (
+            len(self._store) > self.max_entries or self.bytes_used > self.max_bytes
+        ):
+            key, (_, _, size) = self._store.popitem(last=False)
+            self.bytes_used -= size
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(key)
 
 
-# ============ Cache Manager ============
+# ============ Telemetry ============
 
-class CacheManager:
-    """Unified cache interface with fallback"""
+CACHE_TELEMETRY_MAX_NAMESPACES = int(os.getenv("CACHE_TELEMETRY_MAX_NAMESPACES", "200"))
+OTHER_NAMESPACE = "_other"
+
+
+def key_namespace(key: str) -> str:
+    """Namespace of a key or prefix: the text before the first ':'"""
+    return key.split(":", 1)[0]
+
+
+class NamespaceStats:
+    """Counters for one key namespace"""
+    
+    __slots__ = ("hits", "near_hits", "misses", "sets", "bytes_written",
+                 "ttl_total", "evictions", "invalidations", "computes", "compute_seconds")
     
     def __init__(self):
-        self.redis = RedisCache()
-        self.memory = MemoryCache()
-        self._connected = False
-        self._connect()
+        for field in self.__slots__:
+            setattr(self, field, 0)
     
-    def _connect(self):
-        """Try to connect to Redis"""
-        self._connected = self.redis.connect()
-        if self._connected:
-            print("Redis connected")
-        else:
-            print("Using in-memory cache fallback")
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0.0,
+            "sets": self.sets,
+            "bytes_written": self.bytes_written,
+            "avg_value_bytes": round(self.bytes_written / self.sets) if self.sets else 0,
+            "avg_ttl_seconds": round(self.ttl_total / self.sets, 1) if self.sets else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "computes": self.computes,
+            "avg_compute_ms": round(self.compute_seconds / self.computes * 1000, 2) if self.computes else 0.0
+        }
+
+
+class CacheTelemetry:
+    """Per-namespace cache counters
+    
+    Counters are plain attribute increments made from the event loop
+    (and from the memory tier's eviction hook under its own lock), so
+    the hot path never takes a lock of its own. Namespace cardinality is
+    capped; overflow is folded into "_other".
+    """
+    
+    def __init__(self, max_namespaces: int = CACHE_TELEMETRY_MAX_NAMESPACES):
+        self.max_namespaces = max_namespaces
+        self.started_at = time.time()
+        self._namespaces: Dict[str, NamespaceStats] = {}
+    
+    def namespace(self, key: str) -> NamespaceStats:
+        """Counters for key's namespace, created on first use"""
+        name = key_namespace(key)
+        stats = self._namespaces.get(name)
+        if stats is None:
+            if len(self._namespaces) >= self.max_namespaces:
+                name = OTHER_NAMESPACE
+                stats = self._namespaces.get(name)
+            if stats is None:
+                stats = self._namespaces[name] = NamespaceStats()
+        return stats
+    
+    def hit(self, key: str, near: bool = False):
+        stats = self.namespace(key)
+        stats.hits += 1
+        if near:
+            stats.near_hits += 1
+    
+    def miss(self, key: str):
+        self.namespace(key).misses += 1
+    
+    def written(self, key: str, size: int, ttl: int):
+        stats = self.namespace(key)
+        stats.sets += 1
+        stats.bytes_written += size
+        stats.ttl_total += ttl
+    
+    def evicted(self, key: str):
+        self.namespace(key).evictions += 1
+    
+    def invalidated(self, key_or_prefix: str):
+        self.namespace(key_or_prefix).invalidations += 1
+    
+    def computed(self, key: str, seconds: float):
+        stats = self.namespace(key)
+        stats.computes += 1
+        stats.compute_seconds += seconds
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Counters per namespace"""
+        return {name: stats.to_dict() for name, stats in sorted(self._namespaces.items())}
+    
+    def totals(self) -> Dict[str, Any]:
+        """Counters summed over every namespace"""
+        total = NamespaceStats()
+        for stats in list(self._namespaces.values()):
+            for field in NamespaceStats.__slots__:
+                setattr(total, field, getattr(total, field) + getattr(stats, field))
+        return {**total.to_dict(), "since": datetime.fromtimestamp(self.started_at).isoformat()}
+    
+    def reset(self):
+        self._namespaces = {}
+        self.started_at = time.time()
+
+
+# ============ Cache Manager ============
+
+class SyncCacheManager:
+    """Blocking cache interface for sync callers (scripts, sync decorators)"""
+    
+    def __init__(
+        self,
+        memory: "MemoryCache",
+        url: str = REDIS_URL,
+        serializer: Serializer = default_serializer
+    ):
+        self.redis = RedisCache(url, serializer=serializer)
+        self.memory = memory
     
     @property
     def is_connected(self) -> bool:
         """Check if Redis is connected"""
-        return self._connected
+        return self.redis.is_connected()
     
     def get(self, key: str) -> Optional[Any]:
         """Get value"""
-        if self._connected:
-            value = self.redis.get(key)
-            if value is not None:
-                return value
+        value = self.redis.get(key)
+        if value is not None:
+            return value
         return self.memory.get(key)
     
     def set(
@@ -349,9 +1151,7 @@ class CacheManager:
         use_memory_fallback: bool = True
     ) -> bool:
         """Set value"""
-        success = False
-        if self._connected:
-            success = self.redis.set(key, value, ttl)
+        success = self.redis.set(key, value, ttl)
         if not success and use_memory_fallback:
             success = self.memory.set(key, value, ttl)
         return success
@@ -368,23 +1168,288 @@ class CacheManager:
     
     def invalidate_prefix(self, prefix: str) -> int:
         """Invalidate by prefix"""
-        return self.invalidate_pattern(f"{prefix}*")
+        return self.redis.delete_prefix(prefix) + self.memory.delete_prefix(prefix)
+
+
+class CacheManager:
+    """Unified async cache interface
     
-    def stats(self) -> Dict[str, Any]:
+    Reads go L1 (near cache, in-process) -> L2 (Redis) -> memory fallback.
+    The near cache holds Redis values for at most NEAR_CACHE_TTL seconds;
+    every write or invalidation is published on CACHE_INVALIDATION_CHANNEL
+    so the other workers drop their L1 copies straight away.
+    """
+    
+    def __init__(
+        self,
+        url: str = REDIS_URL,
+        near_cache: bool = NEAR_CACHE_ENABLED,
+        serializer: Serializer = default_serializer
+    ):
+        # One codec for both clients so sync and async callers share values
+        self.serializer = serializer
+        self.redis = AsyncRedisCache(url, serializer=serializer)
+        self.memory = MemoryCache()
+        self.near = MemoryCache(max_entries=NEAR_CACHE_MAX_ENTRIES) if near_cache else None
+        # Blocking shim sharing the same memory tier, for existing sync callers
+        self.sync = SyncCacheManager(self.memory, url, serializer)
+        
+        self.telemetry = CacheTelemetry()
+        self.redis.on_write = self.telemetry.written
+        self.memory.on_evict = self.telemetry.evicted
+        
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._listener: Optional[asyncio.Task] = None
+    
+    async def connect(self) -> bool:
+        """Try to connect to Redis (called from the app lifespan)"""
+        self.memory.start_sweeper()
+        if self.near is not None:
+            self.near.start_sweeper()
+        connected = await self.redis.connect()
+        if connected:
+            print("Redis connected")
+        else:
+            print("Using in-memory cache fallback")
+        if self.near is not None and self._listener is None:
+            self._listener = asyncio.get_running_loop().create_task(self._listen_invalidations())
+        return connected
+    
+    async def close(self):
+        """Release Redis connections and stop background work"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self.memory.stop_sweeper()
+        if self.near is not None:
+            await self.near.stop_sweeper()
+        await self.redis.close()
+    
+    @property
+    def is_connected(self) -> bool:
+        """Check if Redis is connected"""
+        return self.redis.is_connected()
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value"""
+        if self.near is not None:
+            value = self.near.get(key)
+            if value is not None:
+                self.telemetry.hit(key, near=True)
+                return value
+        
+        value, ttl = await self.redis.get_with_ttl(key)
+        if value is not None:
+            self._fill_near(key, value, ttl)
+            self.telemetry.hit(key)
+            return value
+        
+        value = self.memory.get(key)
+        if value is not None:
+            self.telemetry.hit(key)
+        else:
+            self.telemetry.miss(key)
+        return value
+    
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = DEFAULT_TTL,
+        use_memory_fallback: bool = True
+    ) -> bool:
+        """Set value"""
+        success = await self.redis.set(key, value, ttl)
+        if success:
+            self._fill_near(key, value, ttl)
+            await self._publish_invalidation("keys", [key])
+        else:
+            if self.near is not None:
+                self.near.delete(key)
+            if use_memory_fallback:
+                success = self.memory.set(key, value, ttl)
+                if success:
+                    self.telemetry.written(key, self.memory.entry_size(key), ttl)
+        return success
+    
+    async def delete(self, key: str) -> bool:
+        """Delete from every tier"""
+        self.telemetry.invalidated(key)
+        await self.redis.delete(key)
+        self.memory.delete(key)
+        if self.near is not None:
+            self.near.delete(key)
+        await self._publish_invalidation("keys", [key])
+        return True
+    
+    async def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values, filling Redis misses from memory"""
+        found = {}
+        if self.near is not None:
+            found = self.near.mget(keys)
+        from_near = set(found)
+        
+        missing = [k for k in keys if k not in found]
+        if missing:
+            from_redis = await self.redis.mget_with_ttl(missing)
+            for key, (value, ttl) in from_redis.items():
+                self._fill_near(key, value, ttl)
+                found[key] = value
+            missing = [k for k in missing if k not in from_redis]
+        if missing:
+            found.update(self.memory.mget(missing))
+        
+        for key in keys:
+            if key in found:
+                self.telemetry.hit(key, near=key in from_near)
+            else:
+                self.telemetry.miss(key)
+        return found
+    
+    async def mset(
+        self,
+        mapping: Dict[str, Any],
+        ttl: int = DEFAULT_TTL,
+        use_memory_fallback: bool = True
+    ) -> bool:
+        """Set several values"""
+        success = await self.redis.mset(mapping, ttl)
+        if success:
+            for key, value in mapping.items():
+                self._fill_near(key, value, ttl)
+            await self._publish_invalidation("keys", list(mapping))
+        else:
+            if self.near is not None:
+                for key in mapping:
+                    self.near.delete(key)
+            if use_memory_fallback:
+                success = self.memory.mset(mapping, ttl)
+                for key in mapping:
+                    self.telemetry.written(key, self.memory.entry_size(key), ttl)
+        return success
+    
+    async def exists(self, key: str) -> bool:
+        """Check if key exists in either tier"""
+        return await self.redis.exists(key) or self.memory.exists(key)
+    
+    async def invalidate_pattern(self, pattern: str) -> int:
+        """Invalidate by pattern"""
+        self.telemetry.invalidated(pattern)
+        count = await self.redis.delete_pattern(pattern) + self.memory.delete_pattern(pattern)
+        if self.near is not None:
+            self.near.delete_pattern(pattern)
+        await self._publish_invalidation("pattern", [pattern])
+        return count
+    
+    async def invalidate_prefix(self, prefix: str) -> int:
+        """Invalidate by prefix"""
+        self.telemetry.invalidated(prefix)
+        count = await self.redis.delete_prefix(prefix) + self.memory.delete_prefix(prefix)
+        if self.near is not None:
+            self.near.delete_prefix(prefix)
+        await self._publish_invalidation("pattern", [f"{prefix}*"])
+        return count
+    
+    async def stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        return {
-            "redis": self.redis.stats(),
-            "memory": self.memory.stats()
+        stats = {
+            "redis": await self.redis.stats(),
+            "memory": self.memory.stats(),
+            "serialization": self.serializer.describe(),
+            "totals": self.telemetry.totals(),
+            "namespaces": self.telemetry.snapshot()
         }
+        if self.near is not None:
+            stats["near"] = {
+                **self.near.stats(),
+                "ttl_max": NEAR_CACHE_TTL,
+                "subscribed": self._listener is not None and not self._listener.done()
+            }
+        return stats
     
-    def clear_all(self) -> bool:
+    async def sample_keys(self, limit: int = 50, budget_ms: float = 50) -> List[Dict[str, Any]]:
+        """Sampled key metadata from Redis, or from the memory tier when Redis is down"""
+        if await self.redis._ensure_connected():
+            return await self.redis.sample_keys(limit, budget_ms)
+        return self.memory.sample_keys(limit)
+    
+    async def clear_all(self) -> bool:
         """Clear all cache"""
-        self.redis.clear_all()
+        await self.redis.clear_all()
         self.memory.clear_all()
+        if self.near is not None:
+            self.near.clear_all()
+        await self._publish_invalidation("clear", [])
         return True
+    
+    # ---- Near cache coherence ----
+    
+    def _fill_near(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Copy a Redis value into L1, never outliving the L2 entry
+        
+        ttl is the L2 entry's remaining lifetime (None: it has no expiry).
+        """
+        if self.near is not None:
+            self.near.set(key, value, NEAR_CACHE_TTL if ttl is None else min(ttl, NEAR_CACHE_TTL))
+    
+    async def _publish_invalidation(self, op: str, targets: List[str]):
+        """Tell the other workers to drop their L1 copies"""
+        if self.near is None or not self.redis.is_connected():
+            return
+        await self.redis.publish(CACHE_INVALIDATION_CHANNEL, {
+            "origin": self.worker_id,
+            "op": op,
+            "targets": targets
+        })
+    
+    def apply_invalidation(self, message: Dict[str, Any]):
+        """Apply an invalidation message published by another worker"""
+        if self.near is None or message.get("origin") == self.worker_id:
+            return
+        op = message.get("op")
+        if op == "keys":
+            for key in message.get("targets", []):
+                self.near.delete(key)
+        elif op == "pattern":
+            for pattern in message.get("targets", []):
+                self.near.delete_pattern(pattern)
+        elif op == "clear":
+            self.near.clear_all()
+    
+    async def _listen_invalidations(self):
+        """Subscriber loop; resubscribes after Redis outages"""
+        while True:
+            pubsub = await self.redis.subscribe(CACHE_INVALIDATION_CHANNEL)
+            if pubsub is None:
+                await asyncio.sleep(REDIS_RETRY_INTERVAL)
+                continue
+            try:
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        try:
+                            self.apply_invalidation(json.loads(message["data"]))
+                        except (TypeError, ValueError):
+                            continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Cache invalidation listener error: {e}")
+                # Messages may have been missed while disconnected
+                self.near.clear_all()
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(REDIS_RETRY_INTERVAL)
 
 
-# Global cache manager
+# Global cache manager (connected from the app lifespan, or lazily on first use)
 cache_manager = CacheManager()
 
 
@@ -398,7 +1463,7 @@ def cache_key(*args) -> str:
 
 def cache_key_hash(data: Dict[str, Any]) -> str:
     """Generate hash-based cache key"""
-    content = json.dumps(data, sort_keys=True)
+    content = json.dumps(data, sort_keys=True, default=repr)
     return hashlib.sha256(content.encode()).hexdigest()[:16]
 
 
@@ -407,41 +1472,174 @@ def cache_key_hash(data: Dict[str, Any]) -> str:
 def setup_cache(app: FastAPI):
     """Setup cache for FastAPI app"""
     
-    @app.get("/api/v1/cache/stats")
-    async def get_cache_stats():
-        """Get cache statistics"""
-        return cache_manager.stats()
-    
     @app.post("/api/v1/cache/clear")
     async def clear_cache():
         """Clear all cache"""
-        cache_manager.clear_all()
+        await cache_manager.clear_all()
         return {"success": True, "message": "Cache cleared"}
     
     @app.post("/api/v1/cache/invalidate/{prefix}")
     async def invalidate_prefix(prefix: str):
         """Invalidate cache by prefix"""
-        count = cache_manager.invalidate_prefix(prefix)
+        count = await cache_manager.invalidate_prefix(prefix)
         return {"success": True, "invalidated": count}
 
 
 # ============ Decorators ============
 
-def cached(ttl: int = DEFAULT_TTL, key_prefix: str = ""):
-    """Decorator for caching function results"""
+# Keys currently being recomputed in this worker, so concurrent callers
+# share one computation instead of stampeding the backing service. Each
+# computation is a task no caller owns: cancelling one caller leaves it
+# running for the others
+_inflight: Dict[str, "asyncio.Task"] = {}
+
+# Live TTLs by key namespace, set by the adaptive TTL tuner; when present
+# they replace the ttl given to @cached for newly computed entries
+ttl_overrides: Dict[str, int] = {}
+
+
+def _return_model(func):
+    """Pydantic model named in func's return annotation, if any"""
+    try:
+        hint = typing.get_type_hints(func).get("return")
+    except Exception:
+        return None
+    if typing.get_origin(hint) is typing.Union:
+        # Optional[Model]: None results are never cached
+        hint = next((arg for arg in typing.get_args(hint) if arg is not type(None)), None)
+    if isinstance(hint, type) and hasattr(hint, "model_validate"):
+        return hint
+    return None
+
+
+def _envelope(value: Any, ttl: int, duration: float) -> Dict[str, Any]:
+    """Wrap a result with the metadata needed for SWR and early refresh"""
+    if hasattr(value, "model_dump"):
+        value = value.model_dump(mode="json")
+    return {"v": value, "exp": time.time() + ttl, "cost": duration}
+
+
+def _should_refresh(entry: Dict[str, Any], early_refresh: float) -> bool:
+    """True when the entry is stale, or randomly shortly before it expires
+    
+    Early refresh follows the XFetch rule: recompute when
+    now - cost * beta * ln(rand) >= expiry, so expensive values are
+    refreshed earlier and only a few callers ever trigger it.
+    """
+    now = time.time()
+    if now >= entry["exp"]:
+        return True
+    if early_refresh > 0:
+        gap = -entry.get("cost", 0.0) * early_refresh * math.log(random.random() or 1e-12)
+        return now + gap >= entry["exp"]
+    return False
+
+
+def cached(
+    ttl: int = DEFAULT_TTL,
+    key_prefix: str = "",
+    stale_ttl: int = 0,
+    early_refresh: float = 0.0
+):
+    """Decorator for caching function results
+    
+    Works on both sync and async functions. For async functions:
+    - concurrent misses on the same key share one computation
+    - stale_ttl keeps serving the previous value for that many seconds
+      after expiry while a single background task recomputes it
+    - early_refresh (XFetch beta, 1.0 is a good default) recomputes
+      probabilistically just before expiry so hot keys never go cold
+    Results annotated as pydantic models are stored as JSON and revived.
+    The key namespace (key_prefix up to the first ':') can have its TTL
+    replaced at runtime through ttl_overrides.
+    Async wrappers expose .refresh(*args, cache_ttl=None) for warming.
+    """
     def decorator(func):
         cache_key_prefix = key_prefix or func.__module__ + "." + func.__name__
+        namespace = key_namespace(cache_key_prefix)
+        model = _return_model(func)
         
-        def wrapper(*args, **kwargs):
-            key = cache_key(cache_key_prefix, args, kwargs)
-            cached_value = cache_manager.get(key)
-            
-            if cached_value is not None:
-                return cached_value
+        def current_ttl() -> int:
+            return ttl_overrides.get(namespace, ttl)
+        
+        def make_key(args, kwargs) -> str:
+            return cache_key(cache_key_prefix, cache_key_hash({"args": args, "kwargs": kwargs}))
+        
+        def revive(value):
+            return model.model_validate(value) if model is not None else value
+        
+        if not asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                entry = cache_manager.sync.get(key)
+                if entry is not None and time.time() < entry["exp"]:
+                    return revive(entry["v"])
+                
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                duration = time.perf_counter() - start
+                cache_manager.telemetry.computed(key, duration)
+                if result is not None:
+                    fresh_ttl = current_ttl()
+                    cache_manager.sync.set(key, _envelope(result, fresh_ttl, duration), fresh_ttl + stale_ttl)
+                return result
             
-            result = func(*args, **kwargs)
-            cache_manager.set(key, result, ttl)
+            return wrapper
+        
+        async def produce(key, args, kwargs, fresh_ttl):
+            start = time.perf_counter()
+            result = await func(*args, **kwargs)
+            duration = time.perf_counter() - start
+            cache_manager.telemetry.computed(key, duration)
+            if result is not None:
+                fresh_ttl = fresh_ttl or current_ttl()
+                entry = _envelope(result, fresh_ttl, duration)
+                await cache_manager.set(key, entry, fresh_ttl + stale_ttl)
             return result
         
-        return wrapper
+        def finished(key, task):
+            if _inflight.get(key) is task:
+                del _inflight[key]
+            if not task.cancelled():
+                # Callers get any exception; a run nobody waits for anymore
+                # must not be reported as unretrieved
+                task.exception()
+        
+        def start(key, args, kwargs, fresh_ttl=None) -> "asyncio.Task":
+            """The running computation for key, started if there is none"""
+            task = _inflight.get(key)
+            if task is None:
+                task = asyncio.get_running_loop().create_task(produce(key, args, kwargs, fresh_ttl))
+                _inflight[key] = task
+                task.add_done_callback(functools.partial(finished, key))
+            return task
+        
+        async def compute(key, args, kwargs, fresh_ttl=None):
+            """Run func once per key; every concurrent caller awaits the same task"""
+            return await asyncio.shield(start(key, args, kwargs, fresh_ttl))
+        
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            entry = await cache_manager.get(key)
+            
+            if entry is not None:
+                if _should_refresh(entry, early_refresh):
+                    if time.time() < entry["exp"] + stale_ttl:
+                        start(key, args, kwargs)
+                        return revive(entry["v"])
+                else:
+                    return revive(entry["v"])
+            
+            return await compute(key, args, kwargs)
+        
+        async def refresh(*args, cache_ttl: Optional[int] = None, **kwargs):
+            """Recompute and store now, optionally with a different TTL (cache warming)"""
+            key = make_key(args, kwargs)
+            return await compute(key, args, kwargs, cache_ttl)
+        
+        async_wrapper.refresh = refresh
+        async_wrapper.namespace = namespace
+        return async_wrapper
     return decorator
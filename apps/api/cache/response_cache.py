@@ -0,0 +1,301 @@
+"""
+HTTP Response Cache
+
+Caches whole responses for routes whose output only changes with a deploy
+or a content_versioning update:
+- Body stored pre-serialized and pre-gzipped, keyed by path + query
+- Strong ETag from the body hash, 304 Not Modified on If-None-Match
+- Cache-Control on every cached response
+- Tag-based invalidation (module names), driven by content_versioning
+
+Routes opt in with @cache_response(); everything else passes straight
+through. Entries are per worker: the content is identical everywhere, so
+ETags match across workers without sharing state.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
+import gzip
+import hashlib
+import os
+import time
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# ============ Configuration ============
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "500"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+RESPONSE_CACHE_MAX_AGE = int(os.getenv("RESPONSE_CACHE_MAX_AGE", "300"))
+RESPONSE_CACHE_GZIP_MIN_BYTES = int(os.getenv("RESPONSE_CACHE_GZIP_MIN_BYTES", "1000"))
+RESPONSE_CACHE_GZIP_LEVEL = int(os.getenv("RESPONSE_CACHE_GZIP_LEVEL", "9"))
+
+# Tag on routes that depend on every module (e.g. /all)
+ALL_CONTENT = "*"
+
+# Response headers recomputed for every cached representation
+_REPLACED_HEADERS = {b"content-length", b"content-encoding", b"etag", b"cache-control", b"vary"}
+
+
+# ============ Route Marker ============
+
+class ResponsePolicy:
+    """How a route's responses are cached"""
+
+    __slots__ = ("max_age", "ttl", "tags")
+
+    def __init__(self, max_age: int, ttl: int, tags: Tuple[str, ...]):
+        self.max_age = max_age
+        self.ttl = ttl
+        self.tags = tags
+
+
+def cache_response(
+    max_age: int = RESPONSE_CACHE_MAX_AGE,
+    ttl: int = RESPONSE_CACHE_TTL,
+    tags: Iterable[str] = ()
+):
+    """Mark a route for the response cache
+
+    Place it below @router.get(...). max_age goes to Cache-Control (clients
+    revalidate with If-None-Match after that); ttl bounds how long this
+    worker keeps the bytes. Path parameter values are added to tags, so
+    /prompts/{module_name} is invalidated by a change to that module.
+    """
+    def decorator(func):
+        func.__response_cache__ = ResponsePolicy(max_age, ttl, tuple(tags))
+        return func
+    return decorator
+
+
+# ============ Store ============
+
+class CachedResponse:
+    """One stored response, in identity and gzip form"""
+
+    __slots__ = ("body", "gzip_body", "headers", "etag", "cache_control", "tags", "expires")
+
+    def __init__(
+        self,
+        body: bytes,
+        gzip_body: Optional[bytes],
+        headers: List[Tuple[bytes, bytes]],
+        etag: str,
+        cache_control: str,
+        tags: frozenset,
+        expires: float
+    ):
+        self.body = body
+        self.gzip_body = gzip_body
+        self.headers = headers
+        self.etag = etag
+        self.cache_control = cache_control
+        self.tags = tags
+        self.expires = expires
+
+
+class ResponseCache:
+    """Bounded LRU of cached responses
+
+    Only touched from the event loop, so there is no locking.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        gzip_min_bytes: int = RESPONSE_CACHE_GZIP_MIN_BYTES,
+        gzip_level: int = RESPONSE_CACHE_GZIP_LEVEL
+    ):
+        self.max_entries = max_entries
+        self.gzip_min_bytes = gzip_min_bytes
+        self.gzip_level = gzip_level
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(scope: Scope) -> str:
+        """Path plus normalized query string"""
+        query = scope.get("query_string", b"").decode("latin-1")
+        if not query:
+            return scope["path"]
+        return f"{scope['path']}?{urlencode(sorted(parse_qsl(query, keep_blank_values=True)))}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Fresh entry for key, if any"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store(
+        self,
+        key: str,
+        raw_headers: List[Tuple[bytes, bytes]],
+        body: bytes,
+        policy: ResponsePolicy,
+        path_params: Dict[str, Any]
+    ) -> CachedResponse:
+        """Compress, hash and keep a response body (counted as a miss)"""
+        self.misses += 1
+        gzip_body = None
+        if len(body) >= self.gzip_min_bytes:
+            # mtime=0 keeps the gzip bytes identical across workers and deploys
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+            if len(compressed) < len(body):
+                gzip_body = compressed
+
+        entry = CachedResponse(
+            body=body,
+            gzip_body=gzip_body,
+            headers=[(k, v) for k, v in raw_headers if k.lower() not in _REPLACED_HEADERS],
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            cache_control=f"public, max-age={policy.max_age}",
+            tags=frozenset(policy.tags) | frozenset(str(v) for v in path_params.values()),
+            expires=time.monotonic() + policy.ttl
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, tag: Optional[str] = None) -> int:
+        """Drop entries carrying tag (and ALL_CONTENT entries); everything if tag is None"""
+        if tag is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+        else:
+            stale = [k for k, e in self._entries.items() if tag in e.tags or ALL_CONTENT in e.tags]
+            for key in stale:
+                del self._entries[key]
+            dropped = len(stale)
+        self.invalidations += dropped
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """Get statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": RESPONSE_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": sum(len(e.body) + len(e.gzip_body or b"") for e in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations
+        }
+
+
+response_cache = ResponseCache()
+
+
+def invalidate_responses(tag: Optional[str] = None) -> int:
+    """Drop cached responses for a content tag (all when None)"""
+    return response_cache.invalidate(tag)
+
+
+# ============ Middleware ============
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/"x" matches "x" """
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+class ResponseCacheMiddleware:
+    """Serve @cache_response routes from stored bytes
+
+    Pure ASGI: a hit never reaches routing, the handler, pydantic
+    serialization or GZipMiddleware (which skips bodies that already
+    carry Content-Encoding). Install it innermost so hits still pass
+    through rate limiting, security headers and audit logging.
+    """
+
+    def __init__(self, app: ASGIApp, cache: Optional[ResponseCache] = None):
+        self.app = app
+        self.cache = cache or response_cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not RESPONSE_CACHE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        key = self.cache.key(scope)
+        entry = self.cache.get(key)
+        if entry is not None:
+            await self._send_entry(entry, request_headers, send)
+            return
+
+        policy: Optional[ResponsePolicy] = None
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+
+        async def capture(message: Message):
+            nonlocal policy, start
+            if message["type"] == "http.response.start":
+                # Routing has run by now, so the endpoint is in the scope
+                policy = getattr(scope.get("endpoint"), "__response_cache__", None)
+                response_headers = Headers(raw=message["headers"])
+                if (
+                    policy is None
+                    or message["status"] != 200
+                    or "set-cookie" in response_headers
+                    or "content-encoding" in response_headers
+                ):
+                    policy = None
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if policy is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                stored = self.cache.store(
+                    key, start["headers"], b"".join(chunks), policy, scope.get("path_params", {})
+                )
+                await self._send_entry(stored, request_headers, send)
+
+        await self.app(scope, receive, capture)
+
+    async def _send_entry(self, entry: CachedResponse, request_headers: Headers, send: Send):
+        """Send a stored response as 304, gzip or identity"""
+        headers = [
+            (b"etag", entry.etag.encode()),
+            (b"cache-control", entry.cache_control.encode()),
+            (b"vary", b"Accept-Encoding"),
+        ]
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, entry.etag):
+            self.cache.not_modified += 1
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        body = entry.body
+        if entry.gzip_body is not None and "gzip" in request_headers.get("accept-encoding", ""):
+            body = entry.gzip_body
+            headers.append((b"content-encoding", b"gzip"))
+        headers.append((b"content-length", str(len(body)).encode()))
+
+        await send({"type": "http.response.start", "status": 200, "headers": entry.headers + headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,201 @@
+"""
+Cache Value Serialization
+
+Codec layer for values stored in Redis:
+- orjson (default), msgpack or stdlib json
+- Transparent compression above a size threshold (zstd or zlib)
+- One tag byte in front of every payload naming codec + compression,
+  so the configured format can change without flushing the cache
+"""
+from typing import Any, Callable, Dict, Tuple
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+import json
+import os
+import zlib
+
+# Optional fast codecs
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    msgpack = None
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
+# ============ Configuration ============
+
+CACHE_CODEC = os.getenv("CACHE_CODEC", "orjson" if ORJSON_AVAILABLE else "json")
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zstd" if ZSTD_AVAILABLE else "zlib")
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+CACHE_COMPRESS_LEVEL = int(os.getenv("CACHE_COMPRESS_LEVEL", "3"))
+
+# ============ Tag Byte ============
+#
+#   bit 7      always 1 (legacy values are plain ASCII JSON, so < 0x80)
+#   bits 4-6   compression id
+#   bits 0-3   codec id
+
+CODEC_IDS = {"json": 1, "orjson": 2, "msgpack": 3}
+COMPRESSION_IDS = {"none": 0, "zlib": 1, "zstd": 2}
+TAG_MARKER = 0x80
+
+
+def make_tag(codec: str, compression: str) -> int:
+    """Tag byte for a codec/compression pair"""
+    return TAG_MARKER | (COMPRESSION_IDS[compression] << 4) | CODEC_IDS[codec]
+
+
+def parse_tag(tag: int) -> Tuple[str, str]:
+    """Codec and compression names for a tag byte"""
+    codec_id = tag & 0x0F
+    compression_id = (tag >> 4) & 0x07
+    codec = next((name for name, i in CODEC_IDS.items() if i == codec_id), None)
+    compression = next((name for name, i in COMPRESSION_IDS.items() if i == compression_id), None)
+    if codec is None or compression is None:
+        raise ValueError(f"Unknown cache payload tag: {tag:#x}")
+    return codec, compression
+
+
+# ============ Codecs ============
+
+def _default(value: Any) -> Any:
+    """Fallback encoder for types JSON/msgpack do not know"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=_default, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {
+    "json": _json_dumps,
+    "orjson": _orjson_dumps,
+    "msgpack": _msgpack_dumps,
+}
+
+DECODERS: Dict[str, Callable[[bytes], Any]] = {
+    "json": json.loads,
+    "orjson": lambda data: orjson.loads(data),
+    "msgpack": _msgpack_loads,
+}
+
+# ============ Compression ============
+
+def _compressors(level: int) -> Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    """(compress, decompress) per compression name"""
+    pairs = {
+        "zlib": (lambda data: zlib.compress(data, level), zlib.decompress),
+    }
+    if ZSTD_AVAILABLE:
+        # zstd contexts are not thread-safe; they are cheap enough to make per call
+        pairs["zstd"] = (
+            lambda data: zstandard.ZstdCompressor(level=level).compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data),
+        )
+    return pairs
+
+
+# ============ Serializer ============
+
+class Serializer:
+    """Encode cache values to tagged bytes and back"""
+
+    def __init__(
+        self,
+        codec: str = CACHE_CODEC,
+        compression: str = CACHE_COMPRESSION,
+        min_compress_bytes: int = CACHE_COMPRESS_MIN_BYTES,
+        level: int = CACHE_COMPRESS_LEVEL
+    ):
+        if codec == "orjson" and not ORJSON_AVAILABLE:
+            codec = "json"
+        if codec == "msgpack" and not MSGPACK_AVAILABLE:
+            raise ValueError("CACHE_CODEC=msgpack requires the msgpack package")
+        if codec not in CODEC_IDS:
+            raise ValueError(f"Unknown cache codec: {codec}")
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            compression = "zlib"
+        if compression not in COMPRESSION_IDS:
+            raise ValueError(f"Unknown cache compression: {compression}")
+
+        self.codec = codec
+        self.compression = compression
+        self.min_compress_bytes = min_compress_bytes
+        self._encode = ENCODERS[codec]
+        self._compressors = _compressors(level)
+        self._plain_tag = bytes([make_tag(codec, "none")])
+        self._compressed_tag = bytes([make_tag(codec, compression)])
+
+    def dumps(self, value: Any) -> bytes:
+        """Serialize value, compressing it when it is large enough"""
+        payload = self._encode(value)
+        if self.compression != "none" and len(payload) >= self.min_compress_bytes:
+            compressed = self._compressors[self.compression][0](payload)
+            if len(compressed) < len(payload):
+                return self._compressed_tag + compressed
+        return self._plain_tag + payload
+
+    def loads(self, data: bytes) -> Any:
+        """Deserialize any tagged payload, or a legacy untagged JSON value"""
+        if isinstance(data, str):
+            data = data.encode()
+        if not data or data[0] < TAG_MARKER:
+            return json.loads(data)
+
+        codec, compression = parse_tag(data[0])
+        payload = data[1:]
+        if compression != "none":
+            if compression not in self._compressors:
+                raise ValueError(f"{compression} payload but the library is not installed")
+            payload = self._compressors[compression][1](payload)
+        return DECODERS[codec](payload)
+
+    def encoded_size(self, value: Any) -> int:
+        """Uncompressed encoded length, a cheap proxy for memory footprint"""
+        return len(self._encode(value))
+
+    def describe(self) -> Dict[str, Any]:
+        """Active configuration, for stats endpoints"""
+        return {
+            "codec": self.codec,
+            "compression": self.compression,
+            "min_compress_bytes": self.min_compress_bytes
+        }
+
+
+default_serializer = Serializer()
@@ -0,0 +1,220 @@
+"""
+ORM Models
+
+Declarative mappings for the per-user tables in
+supabase/migrations/001_initial_schema.sql that the API queries through
+SQLAlchemy. Column types degrade to portable equivalents (JSON for JSONB
+and TEXT[]) so the same models run on the SQLite dev database.
+
+Relationships default to lazy="select"; QueryBuilder states its loader
+strategy explicitly and closes everything else with raiseload("*").
+"""
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    Text,
+    UniqueConstraint,
+    Uuid,
+    and_,
+    func,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import DeclarativeBase, foreign, relationship, mapped_column
+import uuid
+
+# ============ Types ============
+
+JsonDocument = JSON().with_variant(JSONB(), "postgresql")
+TextList = JSON().with_variant(ARRAY(Text), "postgresql")
+
+
+def _uuid() -> str:
+    return str(uuid.uuid4())
+
+
+def _id_column():
+    return mapped_column(Uuid(as_uuid=False), primary_key=True, default=_uuid)
+
+
+def _user_fk():
+    return mapped_column(Uuid(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"))
+
+
+def _score(precision: int = 3):
+    return mapped_column(Numeric(precision, 2, asdecimal=False))
+
+
+def _total():
+    return mapped_column(Numeric(12, 2, asdecimal=False), nullable=False, default=0)
+
+
+def _count():
+    return mapped_column(Integer, nullable=False, default=0)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+# ============ Users ============
+
+class User(Base):
+    __tablename__ = "users"
+
+    id = _id_column()
+    email = mapped_column(Text, unique=True, nullable=False)
+    full_name = mapped_column(Text)
+    avatar_url = mapped_column(Text)
+    created_at = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    profile = relationship("UserProfile", uselist=False, back_populates="user")
+    module_progress = relationship("ModuleProgress", back_populates="user")
+    entries = relationship("UserEntry", back_populates="user")
+    wellness_entries = relationship(
+        "WellnessEntry", back_populates="user", order_by="WellnessEntry.date.desc()"
+    )
+    wellness_goals = relationship("WellnessGoal", back_populates="user")
+
+
+class UserProfile(Base):
+    __tablename__ = "user_profiles"
+
+    id = _id_column()
+    user_id = _user_fk()
+    bio = mapped_column(Text)
+    timezone = mapped_column(Text, default="UTC")
+    preferences = mapped_column(JsonDocument, default=dict)
+    created_at = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User", back_populates="profile")
+
+
+# ============ Module Progress ============
+
+class ModuleProgress(Base):
+    __tablename__ = "module_progress"
+    __table_args__ = (UniqueConstraint("user_id", "module_name"),)
+
+    id = _id_column()
+    user_id = _user_fk()
+    module_name = mapped_column(Text, nullable=False)
+    progress_percentage = mapped_column(Numeric(5, 2, asdecimal=False), default=0)
+    last_activity = mapped_column(DateTime(timezone=True), server_default=func.now())
+    completed_topics = mapped_column(TextList, default=list)
+    created_at = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User", back_populates="module_progress")
+    # user_entries has no FK to module_progress; they share (user_id, module_name)
+    entries = relationship(
+        "UserEntry",
+        primaryjoin=lambda: and_(
+            foreign(UserEntry.user_id) == ModuleProgress.user_id,
+            foreign(UserEntry.module_name) == ModuleProgress.module_name,
+        ),
+        viewonly=True,
+        order_by=lambda: UserEntry.created_at.desc(),
+    )
+
+
+class UserEntry(Base):
+    __tablename__ = "user_entries"
+
+    id = _id_column()
+    user_id = _user_fk()
+    module_name = mapped_column(Text, nullable=False)
+    topic_name = mapped_column(Text, nullable=False)
+    entry_type = mapped_column(Text, nullable=False)
+    content = mapped_column(JsonDocument, nullable=False)
+    ai_insights = mapped_column(JsonDocument)
+    is_favorite = mapped_column(Boolean, default=False)
+    created_at = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User", back_populates="entries")
+
+
+# ============ Wellness ============
+
+class WellnessEntry(Base):
+    __tablename__ = "wellness_tracker"
+    __table_args__ = (UniqueConstraint("user_id", "date"),)
+
+    id = _id_column()
+    user_id = _user_fk()
+    date = mapped_column(Date, nullable=False)
+    sleep_hours = _score(4)
+    water_intake_ml = mapped_column(Integer)
+    exercise_minutes = mapped_column(Integer)
+    meditation_minutes = mapped_column(Integer)
+    nutrition_notes = mapped_column(Text)
+    mood_score = _score()
+    energy_level = _score()
+    ai_insights = mapped_column(Text)
+    created_at = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User", back_populates="wellness_entries")
+
+
+class WellnessGoal(Base):
+    __tablename__ = "wellness_goals"
+
+    id = _id_column()
+    user_id = _user_fk()
+    goal_type = mapped_column(Text, nullable=False)
+    specific_goal = mapped_column(Text, nullable=False)
+    measurable_target = mapped_column(Text)
+    timeframe = mapped_column(Text)
+    progress_percentage = mapped_column(Numeric(5, 2, asdecimal=False), default=0)
+    is_completed = mapped_column(Boolean, default=False)
+    created_at = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User", back_populates="wellness_goals")
+
+
+# ============ Wellness Rollups ============
+
+class WellnessWeeklyRollup(Base):
+    """Per-user sums and non-null counts for each Monday-based week
+    
+    Maintained by optimized.refresh_wellness_rollups in the transaction
+    that writes wellness_tracker; averages are sum / count.
+    """
+    __tablename__ = "wellness_weekly_rollups"
+
+    user_id = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    week_start = mapped_column(Date, primary_key=True)
+    entries = _count()
+    sleep_hours_sum = _total()
+    sleep_hours_count = _count()
+    water_intake_ml_sum = _total()
+    water_intake_ml_count = _count()
+    exercise_minutes_sum = _total()
+    exercise_minutes_count = _count()
+    meditation_minutes_sum = _total()
+    meditation_minutes_count = _count()
+    mood_score_sum = _total()
+    mood_score_count = _count()
+    energy_level_sum = _total()
+    energy_level_count = _count()
+    updated_at = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class WellnessStreakRun(Base):
+    """A maximal run of consecutive check-in days"""
+    __tablename__ = "wellness_streak_runs"
+    __table_args__ = (Index("idx_wellness_streak_runs_user_end", "user_id", "end_date"),)
+
+    user_id = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    start_date = mapped_column(Date, primary_key=True)
+    end_date = mapped_column(Date, nullable=False)
+    days = mapped_column(Integer, nullable=False)
@@ -2,35 +2,223 @@
 SQLite Database Configuration for Local Development
 
 This module provides SQLite support for local development
-when PostgreSQL is not available.
+when PostgreSQL is not available, and for single-node edge deployments.
+
+Connections are pooled: one writer plus N read-only readers over the
+same WAL database, each opened and configured once. SQLite allows a
+single writer at a time, so writes queue on an asyncio lock instead of
+spinning on SQLITE_BUSY, while readers run concurrently against the
+last committed snapshot.
 """
 
 import aiosqlite
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
+import asyncio
 import os
+import sqlite3
+import time
 
 DATABASE_DIR = Path(__file__).parent
-SQLITE_DB_PATH = DATABASE_DIR / "organic_os.db"
+SQLITE_DB_PATH = Path(os.getenv("SQLITE_DB_PATH") or DATABASE_DIR / "organic_os.db")
 
 # Connection configuration
 DB_TIMEOUT = 30  # seconds
 JOURNAL_MODE = "WAL"  # Write-Ahead Logging for better concurrency
 SYNCHRONOUS = "NORMAL"  # Balance between performance and safety
 
+# Pool configuration
+SQLITE_READERS = int(os.getenv("SQLITE_READERS", "4"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # 256 MB
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negative = KiB, so 64 MB
+SQLITE_STATEMENT_CACHE = int(os.getenv("SQLITE_STATEMENT_CACHE", "256"))  # prepared statements kept per connection
 
-async def get_sqlite_connection() -> aiosqlite.Connection:
-    """Get an async SQLite connection."""
+PRAGMAS = {
+    "journal_mode": JOURNAL_MODE,
+    "synchronous": SYNCHRONOUS,
+    "mmap_size": SQLITE_MMAP_SIZE,
+    "cache_size": SQLITE_CACHE_SIZE,
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+    "busy_timeout": DB_TIMEOUT * 1000,
+}
+
+
+async def _connect(path: Path, read_only: bool = False) -> aiosqlite.Connection:
+    """Open one connection and apply the PRAGMAs"""
     conn = await aiosqlite.connect(
-        SQLITE_DB_PATH,
-        timeout=DB_TIMEOUT
+        path,
+        timeout=DB_TIMEOUT,
+        cached_statements=SQLITE_STATEMENT_CACHE
     )
-    # Enable WAL mode for better concurrency
-    await conn.execute(f"PRAGMA journal_mode={JOURNAL_MODE}")
-    await conn.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+    conn.row_factory = sqlite3.Row
+    for name, value in PRAGMAS.items():
+        if read_only and name == "journal_mode":
+            continue  # set once by the writer; persistent in the file
+        await conn.execute(f"PRAGMA {name}={value}")
+    if read_only:
+        await conn.execute("PRAGMA query_only=ON")
     return conn
 
 
+async def get_sqlite_connection() -> aiosqlite.Connection:
+    """Get a standalone async SQLite connection (scripts; request paths use the pool)."""
+    return await _connect(SQLITE_DB_PATH)
+
+
+# ============ Connection Pool ============
+
+class SQLitePool:
+    """One writer and N reader connections over a WAL database"""
+    
+    def __init__(self, path: Path = SQLITE_DB_PATH, readers: int = SQLITE_READERS):
+        self.path = Path(path)
+        self.size = max(1, readers)
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._all_readers = []
+        self._closed = True
+        self.reads = 0
+        self.writes = 0
+        self.read_wait_seconds = 0.0
+        self.write_wait_seconds = 0.0
+        self.max_read_wait = 0.0
+        self.max_write_wait = 0.0
+        self.write_errors = 0
+    
+    async def open(self) -> "SQLitePool":
+        """Open the writer first (it sets WAL mode), then the readers"""
+        self._writer = await _connect(self.path)
+        self._all_readers = [await _connect(self.path, read_only=True) for _ in range(self.size)]
+        for conn in self._all_readers:
+            self._readers.put_nowait(conn)
+        self._closed = False
+        return self
+    
+    async def close(self):
+        """Close every connection"""
+        self._closed = True
+        for conn in self._all_readers:
+            await conn.close()
+        self._all_readers = []
+        self._readers = asyncio.Queue()
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
+    
+    async def __aenter__(self) -> "SQLitePool":
+        return await self.open()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+    
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection"""
+        if self._closed:
+            raise RuntimeError("SQLite pool is closed")
+        start = time.perf_counter()
+        conn = await self._readers.get()
+        waited = time.perf_counter() - start
+        self.reads += 1
+        self.read_wait_seconds += waited
+        self.max_read_wait = max(self.max_read_wait, waited)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                await conn.rollback()
+            self._readers.put_nowait(conn)
+    
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Hold the writer; commits on exit, rolls back on error"""
+        if self._closed:
+            raise RuntimeError("SQLite pool is closed")
+        start = time.perf_counter()
+        async with self._write_lock:
+            waited = time.perf_counter() - start
+            self.writes += 1
+            self.write_wait_seconds += waited
+            self.max_write_wait = max(self.max_write_wait, waited)
+            try:
+                yield self._writer
+            except BaseException:
+                self.write_errors += 1
+                await self._writer.rollback()
+                raise
+            else:
+                await self._writer.commit()
+    
+    async def fetch_all(self, sql: str, params: tuple = ()) -> list:
+        """Run a read and return all rows"""
+        async with self.reader() as conn:
+            async with conn.execute(sql, params) as cursor:
+                return await cursor.fetchall()
+    
+    async def fetch_one(self, sql: str, params: tuple = ()) -> Optional[sqlite3.Row]:
+        """Run a read and return the first row"""
+        async with self.reader() as conn:
+            async with conn.execute(sql, params) as cursor:
+                return await cursor.fetchone()
+    
+    async def execute(self, sql: str, params: tuple = ()) -> int:
+        """Run a write in its own transaction; returns the affected row count"""
+        async with self.writer() as conn:
+            cursor = await conn.execute(sql, params)
+            return cursor.rowcount
+    
+    async def execute_many(self, sql: str, rows: list) -> int:
+        """Run one prepared write for many parameter sets in a single transaction"""
+        async with self.writer() as conn:
+            cursor = await conn.executemany(sql, rows)
+            return cursor.rowcount
+    
+    def stats(self) -> dict:
+        """Pool statistics"""
+        return {
+            "path": str(self.path),
+            "open": not self._closed,
+            "readers": self.size,
+            "readers_idle": self._readers.qsize(),
+            "writer_busy": self._write_lock.locked(),
+            "reads": self.reads,
+            "writes": self.writes,
+            "write_errors": self.write_errors,
+            "avg_read_wait_ms": round(self.read_wait_seconds / self.reads * 1000, 3) if self.reads else 0.0,
+            "avg_write_wait_ms": round(self.write_wait_seconds / self.writes * 1000, 3) if self.writes else 0.0,
+            "max_read_wait_ms": round(self.max_read_wait * 1000, 3),
+            "max_write_wait_ms": round(self.max_write_wait * 1000, 3),
+            "statement_cache_size": SQLITE_STATEMENT_CACHE,
+            "pragmas": {name: PRAGMAS[name] for name in ("mmap_size", "cache_size", "temp_store")}
+        }
+
+
+_pool: Optional[SQLitePool] = None
+_pool_lock = asyncio.Lock()
+
+
+async def get_sqlite_pool() -> SQLitePool:
+    """Get or open the process-wide pool"""
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await SQLitePool(SQLITE_DB_PATH).open()
+    return _pool
+
+
+async def close_sqlite_pool():
+    """Close the process-wide pool, if it was opened"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
 async def init_sqlite_schema():
     """Initialize the SQLite database schema."""
     conn = await get_sqlite_connection()
@@ -114,24 +302,25 @@ async def init_sqlite_schema():
 async def check_sqlite_health() -> dict:
     """Check SQLite database health."""
     try:
-        conn = await get_sqlite_connection()
-        cursor = await conn.cursor()
+        pool = await get_sqlite_pool()
         
         # Check database file exists and is writable
-        db_exists = SQLITE_DB_PATH.exists()
-        db_size = SQLITE_DB_PATH.stat().st_size if db_exists else 0
+        db_exists = pool.path.exists()
+        db_size = pool.path.stat().st_size if db_exists else 0
         
         # Test a simple query
-        await cursor.execute("SELECT 1")
-        
-        await conn.close()
+        start = time.perf_counter()
+        await pool.fetch_one("SELECT 1")
+        latency_ms = (time.perf_counter() - start) * 1000
         
         return {
             "status": "healthy",
             "database": "sqlite",
-            "path": str(SQLITE_DB_PATH),
+            "path": str(pool.path),
             "exists": db_exists,
-            "size_bytes": db_size
+            "size_bytes": db_size,
+            "latency_ms": round(latency_ms, 3),
+            "pool": pool.stats()
         }
     except Exception as e:
         return {
@@ -139,7 +328,6 @@ async def check_sqlite_health() -> dict:
             "error": str(e)
         }
 
-
 if __name__ == "__main__":
     import asyncio
     asyncio.run(init_sqlite_schema())
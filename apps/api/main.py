@@ -9,7 +9,7 @@ from typing import Dict, Any
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 # Add routes and middleware directories to path
 sys.path.insert(0, os.path.dirname(__file__))
@@ -19,10 +19,19 @@ from routes import auth, wellness, progress, modules, ai, openclaw, modules_data
 # Import middleware
 from middleware.error_handler import setup_error_handlers, ErrorHandlingMiddleware, OrganicOSException, ValidationError, NotFoundError
 from middleware.validation import setup_validation
-from middleware.rate_limiter import setup_rate_limiting
+from middleware.rate_limiter import setup_rate_limiting, start_rate_limit_cleanup, stop_rate_limit_cleanup
 from middleware.security import setup_security_headers
 from middleware.audit import setup_audit_logging, log_auth_event, AuditEventType
 from middleware.performance_middleware import PerformanceMiddleware, get_metrics, get_health_status
+from middleware.openmetrics import (
+    OPENMETRICS_CONTENT_TYPE,
+    PROMETHEUS_CONTENT_TYPE,
+    render_metrics,
+    start_metrics_flusher,
+    stop_metrics_flusher,
+    wants_openmetrics,
+)
+from cache.response_cache import ResponseCacheMiddleware
 
 # Get allowed origins from environment (comma-separated)
 ALLOWED_ORIGINS = os.getenv(
@@ -39,8 +48,29 @@ async def lifespan(app: FastAPI):
     print(f"📍 Environment: {os.getenv('ENVIRONMENT', 'development')}")
     print(f"🔒 Security: Rate limiting enabled, Audit logging enabled")
     print(f"🔗 API Docs: /docs")
+    if CACHE_AVAILABLE:
+        await cache_manager.connect()
+        await start_warming()
+    await start_rate_limit_cleanup()
+    if DB_ENGINE_AVAILABLE:
+        await start_replica_monitor()
+    await start_metrics_flusher()
+    if METRICS_DASHBOARD_AVAILABLE:
+        await start_metrics_sampler()
     yield
     # Shutdown
+    if METRICS_DASHBOARD_AVAILABLE:
+        await stop_metrics_sampler()
+    await stop_metrics_flusher()
+    await stop_rate_limit_cleanup()
+    if CACHE_AVAILABLE:
+        await stop_warming()
+        await cache_manager.close()
+    if DB_ENGINE_AVAILABLE:
+        await stop_replica_monitor()
+        await reset_connection_pool_async()
+    if SQLITE_POOL_AVAILABLE:
+        await close_sqlite_pool()
     print("👋 Organic OS API shutting down...")
 
 
@@ -79,7 +109,11 @@ app = FastAPI(
 
 # ============ Middleware Setup (Order Matters!) ============
 
-# 1. Error handling (innermost)
+# 0. Response cache for static module content (innermost, so cached
+#    responses still pass rate limiting, security headers and audit)
+app.add_middleware(ResponseCacheMiddleware)
+
+# 1. Error handling
 setup_error_handlers(app)
 
 # 2. Validation middleware
@@ -118,11 +152,26 @@ app.add_middleware(
     max_age=86400,
 )
 
+# ============ Database Setup ============
+
+try:
+    from database.optimized import reset_connection_pool_async, start_replica_monitor, stop_replica_monitor
+    DB_ENGINE_AVAILABLE = True
+except ImportError:
+    DB_ENGINE_AVAILABLE = False
+
+try:
+    from database.sqlite import close_sqlite_pool
+    SQLITE_POOL_AVAILABLE = True
+except ImportError:
+    SQLITE_POOL_AVAILABLE = False
+
 # ============ Cache Setup ============
 
 # Import and setup caching
 try:
     from cache.redis_cache import setup_cache, cache_manager
+    from cache.optimization import start_warming, stop_warming
     setup_cache(app)
     CACHE_AVAILABLE = True
 except ImportError:
@@ -169,11 +218,11 @@ app.include_router(additional_integrations.router, prefix="/api/v1/additional",
 app.include_router(resilience.router, prefix="/api/v1/resilience", tags=["Resilience"])
 # app.include_router(websocket.router, prefix="/api/v1/ws", tags=["WebSocket"])  # Not implemented
 app.include_router(batch.router, prefix="/api/v1/batch", tags=["Batch"])
-# Cache Optimization
+# Cache Optimization (router already carries the /api/v1/cache prefix)
 try:
-    from routes import cache
-    app.include_router(cache.router, prefix="/api/v1/cache", tags=["Cache"])
-except: pass
+    from cache.optimization import router as cache_optimization_router
+    app.include_router(cache_optimization_router, tags=["Cache"])
+except ImportError: pass
 
 # Resilience Dashboard
 try:
@@ -190,11 +239,14 @@ try:
     app.include_router(error_messages.router, prefix="/api/v1/errors", tags=["Error Messages"])
 except: pass
 
-# Metrics Dashboard
+# Metrics Dashboard (router already carries the /api/v1/metrics prefix)
 try:
     from performance import metrics_dashboard
-    app.include_router(metrics_dashboard.router, prefix="/api/v1/metrics", tags=["Metrics"])
-except: pass
+    from performance.timeseries import start_metrics_sampler, stop_metrics_sampler
+    app.include_router(metrics_dashboard.router, tags=["Metrics"])
+    METRICS_DASHBOARD_AVAILABLE = True
+except ImportError:
+    METRICS_DASHBOARD_AVAILABLE = False
 
 
 # ============ Health Endpoints ============
@@ -253,6 +305,14 @@ async def get_all_metrics():
     return get_metrics()
 
 
+@app.get("/metrics", tags=["Performance"], include_in_schema=False)
+async def openmetrics(request: Request):
+    """Prometheus / OpenMetrics exposition, aggregated across workers"""
+    if wants_openmetrics(request.headers.get("accept")):
+        return Response(render_metrics(openmetrics=True), media_type=OPENMETRICS_CONTENT_TYPE)
+    return Response(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # ============ Security Status ============
 
 @app.get("/api/v1/security/status", tags=["Security"])
@@ -4,7 +4,7 @@ Audit Logging Middleware
 Comprehensive audit trail for all sensitive operations.
 """
 from fastapi import FastAPI, Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from typing import Dict, Any, Optional
 from datetime import datetime
 from enum import Enum
@@ -214,8 +214,12 @@ _audit_log = AuditLogStore()
 
 # ============ Audit Middleware ============
 
-class AuditMiddleware(BaseHTTPMiddleware):
-    """Audit logging middleware for all requests"""
+class AuditMiddleware:
+    """Audit logging middleware for all requests
+    
+    Pure ASGI: unaudited paths pass straight through; audited ones record
+    the response status from the start message.
+    """
     
     # Events that trigger detailed logging
     AUDITED_PATHS = {
@@ -230,22 +234,29 @@ class AuditMiddleware(BaseHTTPMiddleware):
         "/api/v1/openclaw/chat": AuditEventType.AI_CHAT,
     }
     
-    def __init__(self, app: FastAPI):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Skip non-audited endpoints
-        path = request.url.path
-        if not any(path.startswith(skip) for skip in ["/api/v1/"]):
-            return await call_next(request)
+        if scope["type"] != "http" or not scope["path"].startswith("/api/v1/"):
+            await self.app(scope, receive, send)
+            return
         
         # Check if this path should be audited
+        path = scope["path"]
         event_type = None
         for audited_path, audit_event in self.AUDITED_PATHS.items():
             if path.startswith(audited_path):
                 event_type = audit_event
                 break
         
+        if event_type is None:
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope)
+        
         # Get user ID if available
         user_id = None
         auth_header = request.headers.get("Authorization")
@@ -253,27 +264,32 @@ class AuditMiddleware(BaseHTTPMiddleware):
             # Extract user ID from token (simplified)
             user_id = f"user:{auth_header[7:20]}..."
         
+        status_code = 500
+        
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
         # Process request
         try:
-            response = await call_next(request)
-            outcome = "success" if response.status_code < 400 else "failure"
-        except Exception as e:
+            await self.app(scope, receive, send_with_status)
+            outcome = "success" if status_code < 400 else "failure"
+        except Exception:
             outcome = "error"
             raise
         finally:
-            # Log event if audited
-            if event_type:
-                event = AuditEvent(
-                    event_type=event_type,
-                    user_id=user_id,
-                    severity=AuditSeverity.INFO if outcome == "success" else AuditSeverity.ERROR,
-                    description=f"{request.method} {path}",
-                    request=request,
-                    outcome=outcome
-                )
-                _audit_log.add_event(event)
-        
-        return response
+            # Log audited event
+            event = AuditEvent(
+                event_type=event_type,
+                user_id=user_id,
+                severity=AuditSeverity.INFO if outcome == "success" else AuditSeverity.ERROR,
+                description=f"{request.method} {path}",
+                request=request,
+                outcome=outcome
+            )
+            _audit_log.add_event(event)
 
 # ============ Logging Functions ============
 
@@ -5,8 +5,8 @@ Centralized error handling for Organic OS API.
 """
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-# ExceptionMiddleware removed in newer starlette versions
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from typing import Dict, Any, Optional
 import traceback
 import logging
@@ -166,31 +166,54 @@ def build_error_response(
 
 # ============ Error Handler Middleware ============
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
-    """Centralized error handling middleware"""
+class ErrorHandlingMiddleware:
+    """Centralized error handling middleware
     
-    def __init__(self, app: FastAPI):
-        super().__init__(app)
+    Pure ASGI: exceptions raised before the response starts become JSON
+    error responses. Once headers are sent the exception propagates, as
+    there is no way to replace a response mid-stream.
+    """
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        response_started = False
+        
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            if response_started:
+                raise
+            response = self.handle_exception(e, scope)
+            await response(scope, receive, send)
+    
+    def handle_exception(self, e: Exception, scope: Scope) -> JSONResponse:
         """Handle errors and log them"""
         
         # Generate request ID
-        request_id = request.headers.get("x-request-id", str(time.time()))
+        request_id = Headers(scope=scope).get("x-request-id", str(time.time()))
+        path = scope["path"]
         
-        try:
-            response = await call_next(request)
-            return response
-            
-        except OrganicOSException as e:
+        if isinstance(e, OrganicOSException):
             # Log organic OS exceptions
             logger.warning(
                 f"OrganicOSException: {e.code} - {e.message}",
                 extra={
                     "code": e.code,
                     "message": e.message,
-                    "path": request.url.path,
-                    "method": request.method
+                    "path": path,
+                    "method": scope["method"]
                 }
             )
             
@@ -202,11 +225,11 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
                     status_code=e.status_code,
                     details=e.details,
                     request_id=request_id,
-                    path=request.url.path
+                    path=path
                 )
             )
-            
-        except HTTPException as e:
+        
+        if isinstance(e, HTTPException):
             # Handle FastAPI HTTP exceptions
             return JSONResponse(
                 status_code=e.status_code,
@@ -215,38 +238,37 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
                     message=e.detail,
                     status_code=e.status_code,
                     request_id=request_id,
-                    path=request.url.path
+                    path=path
                 )
             )
-            
-        except Exception as e:
-            # Log unexpected exceptions
-            error_id = str(time.time())
-            logger.error(
-                f"Unhandled exception: {str(e)}",
-                extra={
-                    "error_id": error_id,
-                    "path": request.url.path,
-                    "method": request.method,
-                    "traceback": traceback.format_exc()
-                }
-            )
-            
-            # Return user-friendly error
-            return JSONResponse(
+        
+        # Log unexpected exceptions
+        error_id = str(time.time())
+        logger.error(
+            f"Unhandled exception: {str(e)}",
+            extra={
+                "error_id": error_id,
+                "path": path,
+                "method": scope["method"],
+                "traceback": traceback.format_exc()
+            }
+        )
+        
+        # Return user-friendly error
+        return JSONResponse(
+            status_code=500,
+            content=build_error_response(
+                code=ErrorCode.INTERNAL_ERROR,
+                message="An unexpected error occurred",
                 status_code=500,
-                content=build_error_response(
-                    code=ErrorCode.INTERNAL_ERROR,
-                    message="An unexpected error occurred",
-                    status_code=500,
-                    details={
-                        "error_id": error_id,
-                        "suggestion": "Please try again later or contact support if the problem persists"
-                    },
-                    request_id=request_id,
-                    path=request.url.path
-                )
+                details={
+                    "error_id": error_id,
+                    "suggestion": "Please try again later or contact support if the problem persists"
+                },
+                request_id=request_id,
+                path=path
             )
+        )
 
 # ============ Error Handlers ============
 
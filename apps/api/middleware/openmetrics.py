@@ -0,0 +1,432 @@
+"""
+OpenMetrics Exposition
+
+/metrics in the Prometheus text or OpenMetrics format, aggregated across
+worker processes.
+
+Producers keep counting in-process exactly as before (plain attribute
+increments), so the hot path never touches shared state. Collectors turn
+those counters into metric families; a background task writes this
+worker's snapshot into its own mmap'd file under METRICS_MULTIPROC_DIR
+every METRICS_FLUSH_INTERVAL seconds, and /metrics merges every worker's
+file: counters and histograms are summed over all files (including
+workers that have exited, so totals never go backwards), gauges are
+summed over live workers only. Without METRICS_MULTIPROC_DIR the
+process reports itself alone.
+
+Clear METRICS_MULTIPROC_DIR when the server (not a worker) starts, e.g.
+in gunicorn's on_starting hook.
+"""
+
+import asyncio
+import glob
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ============ Configuration ============
+
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Request latency bucket bounds (seconds) for the exposed histogram
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ============ Metric Families ============
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricFamily:
+    """One metric: name, type, help and its samples"""
+    
+    __slots__ = ("name", "type", "help", "samples")
+    
+    def __init__(self, name: str, type: str, help: str):
+        self.name = name
+        self.type = type  # counter, gauge or histogram
+        self.help = help
+        self.samples: Dict[Tuple[str, Labels], float] = {}
+    
+    def add(self, value: float, suffix: str = "", **labels):
+        """Add to a sample (suffix: _total, _bucket, _sum, _count or none)"""
+        key = (suffix, tuple((name, str(label)) for name, label in labels.items()))
+        self.samples[key] = self.samples.get(key, 0) + value
+    
+    def add_histogram(self, bounds: List[float], cumulative: List[int], total: float, count: int, **labels):
+        """Add _bucket/_sum/_count samples from cumulative counts at each bound"""
+        for bound, seen in zip(bounds, cumulative):
+            self.add(seen, "_bucket", **labels, le=format_value(bound))
+        self.add(count, "_bucket", **labels, le="+Inf")
+        self.add(total, "_sum", **labels)
+        self.add(count, "_count", **labels)
+    
+    def to_list(self) -> list:
+        return [self.name, self.type, self.help,
+                [[suffix, list(labels), value] for (suffix, labels), value in self.samples.items()]]
+    
+    @classmethod
+    def from_list(cls, data: list) -> "MetricFamily":
+        name, type, help, samples = data
+        family = cls(name, type, help)
+        for suffix, labels, value in samples:
+            family.samples[(suffix, tuple(map(tuple, labels)))] = value
+        return family
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+# ============ Collectors ============
+
+_collectors: List[Callable[[], List[MetricFamily]]] = []
+
+
+def register_collector(collector: Callable[[], List[MetricFamily]]):
+    """Add a function returning this process's metric families"""
+    _collectors.append(collector)
+    return collector
+
+
+@register_collector
+def collect_requests() -> List[MetricFamily]:
+    from middleware import performance_middleware
+    
+    requests = MetricFamily("organic_http_requests", "counter", "HTTP requests by method")
+    for method, count in list(performance_middleware.metrics["requests_by_method"].items()):
+        requests.add(count, "_total", method=method)
+    
+    errors = MetricFamily("organic_http_errors", "counter", "HTTP responses with status >= 400 by route")
+    for route, count in list(performance_middleware.metrics["errors"].items()):
+        errors.add(count, "_total", route=route)
+    
+    latency = MetricFamily("organic_http_request_duration_seconds", "histogram", "HTTP request latency by route template")
+    for route, histogram in list(performance_middleware.metrics["latency"].items()):
+        latency.add_histogram(
+            LATENCY_BUCKETS, histogram.cumulative(LATENCY_BUCKETS), histogram.total, histogram.count, route=route
+        )
+    return [requests, errors, latency]
+
+
+@register_collector
+def collect_rate_limits() -> List[MetricFamily]:
+    from middleware.rate_limiter import get_rejection_counts
+    
+    rejections = MetricFamily("organic_rate_limit_rejections", "counter", "Requests rejected with 429 by endpoint pattern")
+    for endpoint, count in get_rejection_counts().items():
+        rejections.add(count, "_total", endpoint=endpoint)
+    return [rejections]
+
+
+@register_collector
+def collect_caches() -> List[MetricFamily]:
+    hits = MetricFamily("organic_cache_hits", "counter", "Cache hits by cache and namespace")
+    misses = MetricFamily("organic_cache_misses", "counter", "Cache misses by cache and namespace")
+    
+    try:
+        from cache.redis_cache import cache_manager
+        for namespace, stats in cache_manager.telemetry.snapshot().items():
+            hits.add(stats["hits"], "_total", cache="app", namespace=namespace)
+            misses.add(stats["misses"], "_total", cache="app", namespace=namespace)
+    except ImportError:
+        pass
+    
+    try:
+        from cache.response_cache import response_cache
+        hits.add(response_cache.hits, "_total", cache="response", namespace="")
+        misses.add(response_cache.misses, "_total", cache="response", namespace="")
+    except ImportError:
+        pass
+    
+    try:
+        from database.optimized import query_cache
+        hits.add(query_cache.hits, "_total", cache="query", namespace="")
+        misses.add(query_cache.misses, "_total", cache="query", namespace="")
+    except ImportError:
+        pass
+    
+    return [hits, misses]
+
+
+@register_collector
+def collect_database() -> List[MetricFamily]:
+    try:
+        from database import optimized
+    except ImportError:
+        return []
+    
+    pool = MetricFamily("organic_db_pool_connections", "gauge", "Pooled database connections by engine and state")
+    # Only engines that exist already; a scrape never opens a pool
+    for name, engine in (("sync", optimized._engine), ("async", optimized._async_engine)):
+        status = optimized._pool_status(engine.pool) if engine is not None else {}
+        for state in ("in_use", "idle", "overflow"):
+            if state in status:
+                # QueuePool.overflow() counts up from -pool_size
+                pool.add(max(status[state], 0), engine=name, state=state)
+    
+    queries = MetricFamily("organic_db_query_duration_seconds", "histogram", "Database statement latency")
+    histogram = optimized.query_metrics.histogram
+    cumulative, seen = [], 0
+    for count in histogram.counts[:-1]:
+        seen += count
+        cumulative.append(seen)
+    queries.add_histogram(
+        [ms / 1000 for ms in optimized.LATENCY_BUCKETS_MS], cumulative, histogram.total_ms / 1000, histogram.count
+    )
+    
+    prepared = MetricFamily("organic_db_prepared_statement_lookups", "counter", "Prepared statement cache lookups by result")
+    stats = optimized.prepared_statement_stats
+    prepared.add(stats.lookups - stats.prepares, "_total", result="hit")
+    prepared.add(stats.prepares, "_total", result="prepare")
+    return [pool, queries, prepared]
+
+
+@register_collector
+def collect_circuit_breakers() -> List[MetricFamily]:
+    from resilience.circuit_breaker import CircuitState, registry
+    
+    states = MetricFamily("organic_circuit_breaker_state", "gauge", "Workers with each circuit breaker in each state")
+    failures = MetricFamily("organic_circuit_breaker_failures", "counter", "Calls failed through each circuit breaker")
+    for name, breaker in list(registry._breakers.items()):
+        for state in CircuitState:
+            states.add(1 if breaker.state == state else 0, name=name, state=state.value)
+        failures.add(breaker.stats.total_failures, "_total", name=name)
+    return [states, failures]
+
+
+@register_collector
+def collect_websockets() -> List[MetricFamily]:
+    # Only if the websocket routes were loaded; never imported for a scrape
+    module = sys.modules.get("websocket.manager") or sys.modules.get("apps.api.websocket.manager")
+    if module is None:
+        return []
+    
+    connections = MetricFamily("organic_websocket_connections", "gauge", "Open websocket connections by channel type")
+    for channel, sockets in list(module.manager.active_connections.items()):
+        # "progress:<user_id>" -> "progress", keeping label cardinality fixed
+        connections.add(len(sockets), channel=channel.split(":", 1)[0])
+    return [connections]
+
+
+def collect() -> List[MetricFamily]:
+    """Metric families for this process"""
+    families = []
+    for collector in _collectors:
+        try:
+            families.extend(collector())
+        except Exception as e:
+            logger.warning(f"Metrics collector {collector.__name__} failed: {e}")
+    return families
+
+# ============ Multi-Process Store ============
+
+class MultiProcessStore:
+    """One mmap'd snapshot file per worker process
+    
+    Each file holds a sequence number, a length and a JSON snapshot. The
+    owning worker is the only writer; it bumps the sequence to odd before
+    writing and to even after, so a reader that sees the same even number
+    before and after its copy has a consistent snapshot.
+    """
+    
+    HEADER = struct.Struct("<QQ")  # sequence, body length
+    INITIAL_SIZE = 64 * 1024
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._pid: Optional[int] = None
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._sequence = 0
+        self._lock = threading.Lock()
+    
+    def path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"metrics_{pid}.mmap")
+    
+    def _open(self):
+        # After a fork the inherited mapping belongs to the parent
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._file = open(self.path(pid), "w+b")
+        self._file.truncate(self.INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), self.INITIAL_SIZE)
+        self._pid = pid
+        self._sequence = 0
+    
+    def _grow(self, needed: int):
+        size = len(self._map)
+        while size < needed:
+            size *= 2
+        self._map.close()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+    
+    def write(self, families: List[MetricFamily]):
+        """Replace this worker's snapshot"""
+        body = json.dumps([family.to_list() for family in families], separators=(",", ":")).encode()
+        with self._lock:
+            self._open()
+            end = self.HEADER.size + len(body)
+            if end > len(self._map):
+                self._grow(end)
+            self.HEADER.pack_into(self._map, 0, self._sequence + 1, len(body))
+            self._map[self.HEADER.size:end] = body
+            self._sequence += 2
+            self.HEADER.pack_into(self._map, 0, self._sequence, len(body))
+    
+    def read_all(self) -> List[Tuple[int, List[MetricFamily]]]:
+        """(pid, families) for every worker file"""
+        snapshots = []
+        for path in sorted(glob.glob(os.path.join(self.directory, "metrics_*.mmap"))):
+            pid = int(os.path.basename(path)[len("metrics_"):-len(".mmap")])
+            data = self._read(path)
+            if data is not None:
+                snapshots.append((pid, [MetricFamily.from_list(family) for family in json.loads(data)]))
+        return snapshots
+    
+    def _read(self, path: str, attempts: int = 10) -> Optional[bytes]:
+        for _ in range(attempts):
+            try:
+                with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    sequence, length = self.HEADER.unpack_from(view, 0)
+                    if sequence % 2 or self.HEADER.size + length > len(view):
+                        time.sleep(0.001)
+                        continue
+                    body = view[self.HEADER.size:self.HEADER.size + length]
+                    if self.HEADER.unpack_from(view, 0)[0] == sequence:
+                        return body if sequence else None
+            except (OSError, ValueError):
+                return None
+        logger.warning(f"Metrics snapshot {path} kept changing; skipped")
+        return None
+
+
+def _alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+store = MultiProcessStore(METRICS_MULTIPROC_DIR) if METRICS_MULTIPROC_DIR else None
+
+
+def flush():
+    """Write this worker's snapshot to the shared store, if there is one"""
+    if store is not None:
+        store.write(collect())
+
+
+def gather() -> Dict[str, MetricFamily]:
+    """Metric families merged over every worker"""
+    if store is None:
+        snapshots = [(os.getpid(), collect())]
+    else:
+        flush()
+        snapshots = store.read_all()
+    
+    merged: Dict[str, MetricFamily] = {}
+    for pid, families in snapshots:
+        alive = _alive(pid)
+        for family in families:
+            if family.type == "gauge" and not alive:
+                continue
+            target = merged.setdefault(family.name, MetricFamily(family.name, family.type, family.help))
+            for key, value in family.samples.items():
+                target.samples[key] = target.samples.get(key, 0) + value
+    
+    # Ratios are derived after summing, never averaged across workers
+    hits, misses = merged.get("organic_cache_hits"), merged.get("organic_cache_misses")
+    if hits is not None and misses is not None:
+        ratio = MetricFamily("organic_cache_hit_ratio", "gauge", "Cache hits / lookups by cache, all workers")
+        totals: Dict[str, List[float]] = {}
+        for family, index in ((hits, 0), (misses, 1)):
+            for (_, labels), value in family.samples.items():
+                totals.setdefault(dict(labels)["cache"], [0, 0])[index] += value
+        for cache, (hit, miss) in totals.items():
+            ratio.add(hit / (hit + miss) if hit + miss else 0.0, cache=cache)
+        merged[ratio.name] = ratio
+    return merged
+
+# ============ Exposition ============
+
+def render_metrics(openmetrics: bool = False) -> str:
+    """Text exposition of every worker's metrics"""
+    lines = []
+    for family in gather().values():
+        # The Prometheus text format names counters with their _total suffix
+        name = family.name if openmetrics or family.type != "counter" else family.name + "_total"
+        lines.append(f"# HELP {name} {family.help}")
+        lines.append(f"# TYPE {name} {family.type}")
+        for (suffix, labels), value in family.samples.items():
+            label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels)
+            lines.append(f"{family.name}{suffix}{{{label_text}}} {format_value(value)}" if labels
+                         else f"{family.name}{suffix} {format_value(value)}")
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def wants_openmetrics(accept: str) -> bool:
+    return "application/openmetrics-text" in (accept or "")
+
+# ============ Background Flush ============
+
+_flush_task: Optional[asyncio.Task] = None
+
+
+async def _flush_loop():
+    while True:
+        await asyncio.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            flush()
+        except Exception as e:
+            logger.warning(f"Metrics flush failed: {e}")
+
+
+async def start_metrics_flusher():
+    """Start publishing this worker's snapshot (multi-process mode only)"""
+    global _flush_task
+    if store is not None and _flush_task is None:
+        flush()
+        _flush_task = asyncio.create_task(_flush_loop())
+
+
+async def stop_metrics_flusher():
+    """Stop the background task, publishing a final snapshot"""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+        flush()
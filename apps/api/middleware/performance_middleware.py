@@ -2,102 +2,304 @@
 Performance Monitoring Middleware
 
 Track request metrics, response times, and identify bottlenecks.
+
+Latencies go into fixed-size log-bucketed histograms per route template
+(``/api/v1/pis/habits/{habit_id}``, never the raw path), each with a
+lifetime total and sliding 1m/5m/1h windows. Recording is O(1) and
+memory does not grow with traffic.
 """
-from fastapi import Request, FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import math
 import time
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from collections import defaultdict
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# ============ Latency Histograms ============
+
+# Each power of two is split into SUB_BUCKETS linear buckets, so a
+# percentile read at a bucket midpoint is within 1/(2*SUB_BUCKETS) of
+# the true value (~1.6%) anywhere between ~1µs and 256s
+SUB_BUCKETS = 32
+MIN_EXPONENT = -19
+MAX_EXPONENT = 8
+BUCKET_COUNT = (MAX_EXPONENT - MIN_EXPONENT + 1) * SUB_BUCKETS
+
+QUANTILES = {"p50": 0.50, "p90": 0.90, "p99": 0.99, "p999": 0.999}
+
+# Slot rings kept per histogram: slot seconds -> slots
+RINGS = {10: 30, 60: 60}
+# Sliding windows: name -> (slot seconds, slots read)
+WINDOWS = {"1m": (10, 6), "5m": (10, 30), "1h": (60, 60)}
+
+# Safety net on label cardinality; route templates normally stay far below
+MAX_ROUTES = 500
+UNMATCHED_ROUTE = "<unmatched>"
+OTHER_ROUTE = "<other>"
+
+
+def bucket_index(seconds: float) -> int:
+    """Histogram bucket for a duration"""
+    if seconds <= 0:
+        return 0
+    mantissa, exponent = math.frexp(seconds)
+    if exponent < MIN_EXPONENT:
+        return 0
+    if exponent > MAX_EXPONENT:
+        return BUCKET_COUNT - 1
+    return (exponent - MIN_EXPONENT) * SUB_BUCKETS + int((mantissa - 0.5) * 2 * SUB_BUCKETS)
+
+
+def bucket_bounds(index: int) -> tuple:
+    """(lower, upper) seconds covered by a bucket"""
+    exponent, sub = divmod(index, SUB_BUCKETS)
+    exponent += MIN_EXPONENT
+    return (
+        math.ldexp(0.5 + sub / (2 * SUB_BUCKETS), exponent),
+        math.ldexp(0.5 + (sub + 1) / (2 * SUB_BUCKETS), exponent),
+    )
+
+
+def summarize(buckets: List[int], lo: int, hi: int, count: int, total: float, maximum: float) -> Dict[str, Any]:
+    """Average, percentiles and max from bucket counts in [lo, hi]"""
+    if not count:
+        return {"count": 0}
+    summary = {"count": count, "avg": total / count}
+    targets = [(name, max(1, math.ceil(q * count))) for name, q in QUANTILES.items()]
+    seen = 0
+    position = 0
+    for index in range(lo, hi + 1):
+        seen += buckets[index]
+        while position < len(targets) and seen >= targets[position][1]:
+            lower, upper = bucket_bounds(index)
+            summary[targets[position][0]] = min((lower + upper) / 2, maximum)
+            position += 1
+        if position == len(targets):
+            break
+    summary["max"] = maximum
+    return summary
+
+
+class _Slot:
+    """One time slice of a sliding window"""
+    
+    __slots__ = ("epoch", "count", "total", "max", "buckets")
+    
+    def __init__(self):
+        self.epoch = -1
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets: Dict[int, int] = {}
+    
+    def reset(self, epoch: int):
+        self.epoch = epoch
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+
+
+class LatencyHistogram:
+    """Fixed-memory latency histogram with sliding windows"""
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * BUCKET_COUNT
+        self._lo = BUCKET_COUNT
+        self._hi = -1
+        self._rings = {width: [_Slot() for _ in range(slots)] for width, slots in RINGS.items()}
+    
+    def record(self, seconds: float, now: Optional[float] = None):
+        """Add one duration; O(1)"""
+        now = time.monotonic() if now is None else now
+        index = bucket_index(seconds)
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[index] += 1
+        if index < self._lo:
+            self._lo = index
+        if index > self._hi:
+            self._hi = index
+        
+        for width, ring in self._rings.items():
+            epoch = int(now // width)
+            slot = ring[epoch % len(ring)]
+            if slot.epoch != epoch:
+                slot.reset(epoch)
+            slot.count += 1
+            slot.total += seconds
+            if seconds > slot.max:
+                slot.max = seconds
+            slot.buckets[index] = slot.buckets.get(index, 0) + 1
+    
+    def snapshot(self, window: Optional[str] = None, now: Optional[float] = None) -> Dict[str, Any]:
+        """Summary over the lifetime, or over one of WINDOWS"""
+        if window is None:
+            return summarize(self.buckets, self._lo, self._hi, self.count, self.total, self.max)
+        
+        width, slots = WINDOWS[window]
+        current = int((time.monotonic() if now is None else now) // width)
+        merged = [0] * BUCKET_COUNT
+        lo, hi = BUCKET_COUNT, -1
+        count, total, maximum = 0, 0.0, 0.0
+        for slot in self._rings[width]:
+            if current - slots < slot.epoch <= current:
+                count += slot.count
+                total += slot.total
+                maximum = max(maximum, slot.max)
+                for index, n in slot.buckets.items():
+                    merged[index] += n
+                    lo = min(lo, index)
+                    hi = max(hi, index)
+        return summarize(merged, lo, hi, count, total, maximum)
+    
+    def cumulative(self, bounds: List[float]) -> List[int]:
+        """Lifetime counts at or below each ascending bound, to bucket resolution
+        
+        Only buckets that end at or below a bound count towards it: the one
+        straddling the bound is left to the next, so a count may be a little
+        low but never includes an observation above its bound.
+        """
+        counts = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            last = min(bucket_index(bound) - 1, self._hi)
+            while index <= last:
+                seen += self.buckets[index]
+                index += 1
+            counts.append(seen)
+        return counts
+
+
+def route_template(scope: Scope) -> str:
+    """Route path template the request matched, never the raw path"""
+    route = scope.get("route")
+    if route is None:
+        # Answered before routing (e.g. a response cache hit): match here
+        router = getattr(scope.get("app"), "router", None)
+        for candidate in getattr(router, "routes", ()):
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+# ============ Metrics Store ============
+
 # In-memory metrics store
 metrics: Dict[str, Any] = {
     "requests_total": 0,
-    "requests_by_endpoint": defaultdict(int),
     "requests_by_method": defaultdict(int),
-    "response_times": defaultdict(list),
+    "latency": {},
     "errors": defaultdict(int),
+    "errors_total": 0,
     "start_time": time.time(),
 }
 
-class PerformanceMiddleware(BaseHTTPMiddleware):
-    """Track performance metrics for all requests"""
+
+def histogram_for(route: str) -> LatencyHistogram:
+    """Histogram for a route template, capped at MAX_ROUTES"""
+    histograms = metrics["latency"]
+    histogram = histograms.get(route)
+    if histogram is None:
+        if len(histograms) >= MAX_ROUTES:
+            route = OTHER_ROUTE
+            histogram = histograms.get(route)
+        if histogram is None:
+            histogram = histograms[route] = LatencyHistogram()
+    return histogram
+
+# ============ Performance Middleware ============
+
+class PerformanceMiddleware:
+    """Track performance metrics for all requests
+    
+    Pure ASGI: the duration covers the whole response, body included,
+    and the status comes from the response start message.
+    """
     
-    def __init__(self, app: FastAPI):
-        super().__init__(app)
+    # Health checks and scrapes are not measured
+    SKIP_PATHS = {"/", "/api/v1/health", "/api/v1/ready", "/metrics"}
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Skip health checks for metrics
-        if request.url.path in ["/", "/api/v1/health", "/api/v1/ready"]:
-            return await call_next(request)
+        if scope["type"] != "http" or scope["path"] in self.SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
         
         # Track start time
-        start_time = time.time()
-        method = request.method
-        endpoint = request.url.path
+        start_time = time.perf_counter()
+        method = scope["method"]
+        status_code = 500
+        
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
         
         # Process request
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-            error = None
-        except Exception as e:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
             status_code = 500
-            error = str(e)
             raise
         finally:
             # Calculate duration
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
+            endpoint = route_template(scope)
             
             # Update metrics
             metrics["requests_total"] += 1
-            metrics["requests_by_endpoint"][endpoint] += 1
             metrics["requests_by_method"][method] += 1
-            metrics["response_times"][endpoint].append(duration)
+            histogram_for(endpoint).record(duration)
             
             if status_code >= 400:
                 metrics["errors"][endpoint] += 1
+                metrics["errors_total"] += 1
             
             # Log slow requests
             if duration > 1.0:
                 logger.warning(
                     f"Slow request: {method} {endpoint} took {duration:.2f}s"
                 )
-        
-        return response
 
 def get_metrics() -> Dict[str, Any]:
     """Get all metrics"""
     uptime = time.time() - metrics["start_time"]
+    now = time.monotonic()
     
-    # Calculate percentiles for response times
+    # Percentiles per route: lifetime plus sliding windows
     percentiles = {}
-    for endpoint, times in metrics["response_times"].items():
-        if times:
-            sorted_times = sorted(times)
-            n = len(sorted_times)
-            percentiles[endpoint] = {
-                "avg": sum(times) / len(times),
-                "p50": sorted_times[int(n * 0.50)],
-                "p90": sorted_times[int(n * 0.90)],
-                "p99": sorted_times[int(n * 0.99)] if n > 1 else sorted_times[0],
-                "max": max(times)
-            }
+    for endpoint, histogram in metrics["latency"].items():
+        percentiles[endpoint] = histogram.snapshot()
+        percentiles[endpoint]["windows"] = {
+            window: histogram.snapshot(window, now) for window in WINDOWS
+        }
     
     return {
         "uptime_seconds": uptime,
         "total_requests": metrics["requests_total"],
         "requests_per_second": metrics["requests_total"] / max(uptime, 1),
-        "by_endpoint": dict(metrics["requests_by_endpoint"]),
+        "by_endpoint": {endpoint: h.count for endpoint, h in metrics["latency"].items()},
         "by_method": dict(metrics["requests_by_method"]),
         "response_times": percentiles,
         "errors": dict(metrics["errors"]),
-        "error_rate": metrics["requests_total"] / max(metrics["errors_total"], 1) if "errors_total" in metrics else 0
+        "error_rate": metrics["errors_total"] / max(metrics["requests_total"], 1)
     }
 
 def get_health_status() -> Dict[str, Any]:
@@ -130,8 +332,8 @@ def get_health_status() -> Dict[str, Any]:
 def reset_metrics():
     """Reset all metrics"""
     metrics["requests_total"] = 0
-    metrics["requests_by_endpoint"].clear()
     metrics["requests_by_method"].clear()
-    metrics["response_times"].clear()
+    metrics["latency"].clear()
     metrics["errors"].clear()
+    metrics["errors_total"] = 0
     metrics["start_time"] = time.time()
@@ -5,13 +5,20 @@ Comprehensive rate limiting for API protection.
 """
 from fastapi import FastAPI, Request, Depends, HTTPException
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from typing import Dict, Optional
+import asyncio
+import logging
+import math
+import os
 import time
 import hashlib
 from collections import defaultdict
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
 # ============ Rate Limit Configuration ============
 
 class RateLimitConfig:
@@ -58,13 +65,28 @@ class RateLimitConfig:
 
 # ============ Rate Limit Storage ============
 
+# Seconds between sweeps of keys whose limit has fully replenished
+RATE_LIMIT_CLEANUP_INTERVAL = float(os.getenv("RATE_LIMIT_CLEANUP_INTERVAL", "60"))
+
 class RateLimitStore:
-    """In-memory rate limit storage (use Redis in production)"""
+    """In-memory GCRA rate limit storage (use Redis in production)
+    
+    Generic cell rate algorithm: a key's only state is its theoretical
+    arrival time (TAT). Each request moves the TAT one emission interval
+    (window / max_requests) forward and is rejected if that would put it
+    more than a window ahead of now. That allows bursts of max_requests
+    and max_requests per window sustained, in O(1) time and one float per
+    key.
+    
+    Keys whose TAT has passed carry no state and are dropped by cleanup(),
+    which start_rate_limit_cleanup() runs in the background. Without it
+    (scripts, tests) cleanup runs inline every cleanup_interval.
+    """
     
-    def __init__(self):
-        # Structure: {key: [(timestamp, count), ...]}
-        self._store: Dict[str, list] = defaultdict(list)
-        self.cleanup_interval = 300  # Clean up every 5 minutes
+    def __init__(self, cleanup_interval: float = RATE_LIMIT_CLEANUP_INTERVAL):
+        # Structure: {key: theoretical arrival time}
+        self._store: Dict[str, float] = {}
+        self.cleanup_interval = cleanup_interval
         self.last_cleanup = time.time()
     
     def _get_key(self, identifier: str, endpoint: str) -> str:
@@ -81,72 +103,82 @@ class RateLimitStore:
         """Check and update rate limit"""
         key = self._get_key(identifier, endpoint)
         now = time.time()
-        window_start = now - window_seconds
         
-        # Clean up old entries periodically
-        if now - self.last_cleanup > self.cleanup_interval:
-            self._cleanup(window_start)
-            self.last_cleanup = now
+        if _cleanup_task is None and now - self.last_cleanup > self.cleanup_interval:
+            self.cleanup(now)
         
-        # Get current requests in window
-        requests = self._store[key]
-        recent_requests = [t for t in requests if t >= window_start]
+        interval = window_seconds / max_requests
+        tat = self._store.get(key, now)
+        new_tat = (tat if tat > now else now) + interval
+        allow_at = new_tat - window_seconds
         
         # Check if over limit
-        if len(recent_requests) >= max_requests:
-            # Calculate retry-after
-            oldest = min(recent_requests)
-            retry_after = int(oldest - window_start) + 1
-            
+        if now < allow_at:
             return {
                 "allowed": False,
-                "retry_after": retry_after,
+                "retry_after": math.ceil(allow_at - now),
                 "limit": max_requests,
                 "remaining": 0,
-                "reset": int(now + window_seconds)
+                "reset": math.ceil(tat)
             }
         
         # Record this request
-        recent_requests.append(now)
-        self._store[key] = recent_requests
+        self._store[key] = new_tat
         
         return {
             "allowed": True,
             "limit": max_requests,
-            "remaining": max(0, max_requests - len(recent_requests)),
-            "reset": int(now + window_seconds)
+            # Requests that would still be allowed right now
+            "remaining": int((now - allow_at) / interval + 1e-9),
+            "reset": math.ceil(new_tat)
         }
     
-    def _cleanup(self, before_time: float):
-        """Remove old entries"""
-        for key in list(self._store.keys()):
-            self._store[key] = [t for t in self._store[key] if t >= before_time]
-            if not self._store[key]:
-                del self._store[key]
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """Drop keys whose limit has fully replenished"""
+        now = time.time() if now is None else now
+        expired = [key for key, tat in self._store.items() if tat <= now]
+        for key in expired:
+            del self._store[key]
+        self.last_cleanup = now
+        return len(expired)
+    
+    def __len__(self) -> int:
+        return len(self._store)
 
 # Global store
 _rate_limit_store = RateLimitStore()
+_cleanup_task: Optional[asyncio.Task] = None
 _config = RateLimitConfig()
 
+# Rejections per endpoint pattern (bounded by RateLimitConfig.LIMITS)
+_rejections: Dict[str, int] = defaultdict(int)
+
 # ============ Rate Limit Middleware ============
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware"""
+class RateLimitMiddleware:
+    """Rate limiting middleware
+    
+    Pure ASGI: rejected requests are answered before routing; allowed
+    ones get X-RateLimit-* headers added to the response start message.
+    """
     
-    def __init__(self, app: FastAPI):
-        super().__init__(app)
+    # Health, docs and metrics scrapes are never limited
+    SKIP_PREFIXES = ("/api/v1/health", "/api/v1/ready", "/docs", "/redoc", "/openapi", "/metrics")
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Skip health endpoints
-        path = request.url.path
-        if any(path.startswith(skip) for skip in ["/api/v1/health", "/api/v1/ready", "/docs", "/redoc", "/openapi"]):
-            return await call_next(request)
+        if scope["type"] != "http" or scope["path"].startswith(self.SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
         
         # Get identifier (IP or user ID)
-        identifier = self._get_identifier(request)
+        identifier = self._get_identifier(scope)
         
         # Get endpoint configuration
-        endpoint = self._get_endpoint_match(path)
+        endpoint = self._get_endpoint_match(scope["path"])
         config = _config.LIMITS.get(endpoint, _config.LIMITS["default"])
         
         # Check rate limit
@@ -157,10 +189,9 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             window_seconds=config["window"]
         )
         
-        # Add rate limit headers
-        headers = {}
         if not result["allowed"]:
-            return JSONResponse(
+            _rejections[endpoint] += 1
+            response = JSONResponse(
                 status_code=429,
                 headers={
                     "Retry-After": str(result["retry_after"]),
@@ -176,29 +207,37 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                     }
                 }
             )
+            await response(scope, receive, send)
+            return
         
         # Add headers for successful requests
-        response = await call_next(request)
-        response.headers["X-RateLimit-Limit"] = str(result["limit"])
-        response.headers["X-RateLimit-Remaining"] = str(result["remaining"])
-        response.headers["X-RateLimit-Reset"] = str(result["reset"])
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(result["limit"])
+                headers["X-RateLimit-Remaining"] = str(result["remaining"])
+                headers["X-RateLimit-Reset"] = str(result["reset"])
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_with_headers)
     
-    def _get_identifier(self, request: Request) -> str:
+    def _get_identifier(self, scope: Scope) -> str:
         """Get unique identifier for rate limiting"""
+        headers = Headers(scope=scope)
+        
         # Try to get user ID from header
-        auth_header = request.headers.get("Authorization")
+        auth_header = headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
             token = auth_header[7:37]
             return f"user:{token}"
         
         # Fall back to IP
-        forwarded = request.headers.get("X-Forwarded-For")
+        forwarded = headers.get("X-Forwarded-For")
         if forwarded:
             return f"ip:{forwarded.split(',')[0].strip()}"
         
-        return f"ip:{request.client.host}"
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
     
     def _get_endpoint_match(self, path: str) -> str:
         """Get the matching endpoint pattern"""
@@ -252,6 +291,7 @@ class RateLimiter:
         )
         
         if not result["allowed"]:
+            _rejections[self.endpoint] += 1
             raise HTTPException(
                 status_code=429,
                 detail={
@@ -268,6 +308,33 @@ def setup_rate_limiting(app: FastAPI):
     """Setup rate limiting for FastAPI app"""
     app.add_middleware(RateLimitMiddleware)
 
+# ============ Background Cleanup ============
+
+async def _cleanup_loop():
+    while True:
+        await asyncio.sleep(RATE_LIMIT_CLEANUP_INTERVAL)
+        try:
+            _rate_limit_store.cleanup()
+        except Exception as e:
+            logger.warning(f"Rate limit cleanup failed: {e}")
+
+async def start_rate_limit_cleanup():
+    """Sweep replenished keys off the request path"""
+    global _cleanup_task
+    if _cleanup_task is None:
+        _cleanup_task = asyncio.create_task(_cleanup_loop())
+
+async def stop_rate_limit_cleanup():
+    """Stop the background sweep"""
+    global _cleanup_task
+    if _cleanup_task is not None:
+        _cleanup_task.cancel()
+        try:
+            await _cleanup_task
+        except asyncio.CancelledError:
+            pass
+        _cleanup_task = None
+
 # ============ Utility Functions ============
 
 def get_rate_limit_status(endpoint: str) -> Dict:
@@ -290,12 +357,17 @@ def get_all_rate_limits() -> Dict:
         for endpoint, config in _config.LIMITS.items()
     }
 
+def get_rejection_counts() -> Dict[str, int]:
+    """Requests rejected with 429, per endpoint pattern"""
+    return dict(_rejections)
+
 # ============ Testing Utilities ============
 
 def reset_rate_limits():
     """Reset all rate limits (for testing)"""
     global _rate_limit_store
     _rate_limit_store = RateLimitStore()
+    _rejections.clear()
 
 def simulate_requests(
     identifier: str,
@@ -3,8 +3,8 @@ Security Headers Middleware
 
 Add comprehensive security headers to all responses.
 """
-from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from typing import Dict, List, Optional
 
 # ============ Security Headers ============
@@ -68,27 +68,41 @@ class SecurityHeadersConfig:
 
 # ============ Security Middleware ============
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to all responses"""
+class SecurityHeadersMiddleware:
+    """Add security headers to all responses
     
-    def __init__(self, app: FastAPI, config: SecurityHeadersConfig = None):
-        super().__init__(app)
+    Pure ASGI: the headers are encoded once and merged into each
+    response start message.
+    """
+    
+    def __init__(self, app: ASGIApp, config: SecurityHeadersConfig = None):
+        self.app = app
         self.config = config or SecurityHeadersConfig()
+        self.headers = [
+            (header.lower().encode("latin-1"), value.encode("latin-1"))
+            for header, value in self.config.HEADERS.items()
+        ]
+        self.remove_headers = {header.lower().encode("latin-1") for header in self.config.REMOVE_HEADERS}
     
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # Add security headers
-        for header, value in self.config.HEADERS.items():
-            if header not in response.headers:
-                response.headers[header] = value
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Remove information disclosure headers
-        for header in self.config.REMOVE_HEADERS:
-            if header in response.headers:
-                del response.headers[header]
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                # Remove information disclosure headers
+                raw = [
+                    (name, value) for name, value in message.get("headers", [])
+                    if name.lower() not in self.remove_headers
+                ]
+                # Add security headers the response did not set itself
+                present = {name.lower() for name, _ in raw}
+                raw.extend(header for header in self.headers if header[0] not in present)
+                message["headers"] = raw
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_with_headers)
 
 # ============ CORS Security ============
 
@@ -1 +1 @@
-from apps.api.performance.optimizer import router as optimizer_router
+from .optimizer import router as optimizer_router
@@ -1,22 +1,23 @@
 """
 Metrics Dashboard - Visual performance metrics API
+
+Served from the recorded time series in performance/timeseries.py.
 """
 
-from fastapi import APIRouter
-from typing import Dict, Any, List
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 
-router = APIRouter(prefix="/api/v1/metrics", tags=["metrics"])
+from .timeseries import RESOLUTIONS, sampler, timeseries_store
 
+router = APIRouter(prefix="/api/v1/metrics", tags=["metrics"])
 
-# ============ Metric Models ============
+# Longest range the coarsest ring holds
+MAX_HOURS = RESOLUTIONS[-1][0] * RESOLUTIONS[-1][1] // 3600
 
-class MetricDataPoint(BaseModel):
-    timestamp: str
-    value: float
 
+# ============ Metric Models ============
 
 class MetricSummary(BaseModel):
     metric: str
@@ -32,27 +33,62 @@ class DashboardWidget(BaseModel):
     type: str  # line, bar, gauge, number
     title: str
     metric: str
-    value: float
+    value: Optional[float]  # None until the metric has been sampled
     unit: str
     trend: str  # up, down, stable
-    status: str  # healthy, warning, critical
-
-
-# ============ Generate Mock Data ============
-
-def generate_timeseries(metric: str, hours: int = 24) -> List[MetricDataPoint]:
-    """Generate mock time series data"""
-    points = []
-    base_value = random.uniform(50, 100)
-    
-    for i in range(hours):
-        value = base_value + random.uniform(-10, 10)
-        points.append(MetricDataPoint(
-            timestamp=(datetime.now() - timedelta(hours=hours-i)).isoformat(),
-            value=round(value, 2)
-        ))
-    
-    return points
+    status: str  # healthy, warning, critical, unknown
+
+
+# ============ Metric Definitions ============
+
+# metric: (widget id, widget type, title, unit)
+METRICS = {
+    "requests_per_minute": ("requests", "number", "Requests/min", "req/min"),
+    "avg_latency_ms": ("latency", "gauge", "Avg Latency", "ms"),
+    "error_rate_percent": ("error_rate", "gauge", "Error Rate", "%"),
+    "cache_hit_rate": ("cache_hit", "gauge", "Cache Hit Rate", "%"),
+    "db_connections": ("db_connections", "gauge", "DB Connections", "conn"),
+    "memory_usage_mb": ("memory", "gauge", "Memory", "MB"),
+    "cpu_usage_percent": ("cpu", "gauge", "CPU", "%"),
+}
+
+# metric: (warning, critical); cache hit rate is bad when low
+THRESHOLDS = {
+    "avg_latency_ms": (200, 500),
+    "error_rate_percent": (1, 5),
+    "cache_hit_rate": (70, 50),
+    "cpu_usage_percent": (75, 90),
+}
+LOWER_IS_WORSE = {"cache_hit_rate"}
+
+
+def metric_status(metric: str, value: Optional[float]) -> str:
+    if value is None:
+        return "unknown"
+    if metric not in THRESHOLDS:
+        return "healthy"
+    warning, critical = THRESHOLDS[metric]
+    if metric in LOWER_IS_WORSE:
+        value, warning, critical = -value, -warning, -critical
+    if value >= critical:
+        return "critical"
+    if value >= warning:
+        return "warning"
+    return "healthy"
+
+
+def metric_trend(metric: str) -> str:
+    """Last minute against the ten minutes before it"""
+    recent = timeseries_store.window(metric, 60)
+    baseline = timeseries_store.window(metric, 600, end=60)
+    if not recent or not baseline or not baseline["avg"]:
+        return "stable"
+    change = (recent["avg"] - baseline["avg"]) / abs(baseline["avg"])
+    if change > 0.05:
+        return "up"
+    if change < -0.05:
+        return "down"
+    return "stable"
 
 
 # ============ Endpoints ============
@@ -60,78 +96,34 @@ def generate_timeseries(metric: str, hours: int = 24) -> List[MetricDataPoint]:
 @router.get("/dashboard")
 async def get_dashboard_widgets() -> List[DashboardWidget]:
     """Get all dashboard widgets"""
-    widgets = [
-        DashboardWidget(
-            id="requests",
-            type="number",
-            title="Requests/min",
-            metric="requests_per_minute",
-            value=random.randint(50, 200),
-            unit="req/min",
-            trend="up",
-            status="healthy"
-        ),
-        DashboardWidget(
-            id="latency",
-            type="gauge",
-            title="Avg Latency",
-            metric="avg_latency_ms",
-            value=random.uniform(50, 150),
-            unit="ms",
-            trend="stable",
-            status="healthy"
-        ),
-        DashboardWidget(
-            id="error_rate",
-            type="gauge",
-            title="Error Rate",
-            metric="error_rate_percent",
-            value=random.uniform(0.1, 2.0),
-            unit="%",
-            trend="down",
-            status="healthy"
-        ),
-        DashboardWidget(
-            id="cache_hit",
-            type="gauge",
-            title="Cache Hit Rate",
-            metric="cache_hit_rate",
-            value=random.uniform(75, 95),
-            unit="%",
-            trend="up",
-            status="healthy"
-        ),
-        DashboardWidget(
-            id="active_users",
-            type="number",
-            title="Active Users",
-            metric="active_users",
-            value=random.randint(10, 100),
-            unit="users",
-            trend="up",
-            status="healthy"
-        ),
-        DashboardWidget(
-            id="db_connections",
-            type="gauge",
-            title="DB Connections",
-            metric="db_connections",
-            value=random.uniform(5, 20),
-            unit="conn",
-            trend="stable",
-            status="healthy"
-        )
-    ]
+    sampler.sample_if_due()
+    widgets = []
+    for metric, (widget_id, widget_type, title, unit) in METRICS.items():
+        value = timeseries_store.latest(metric)
+        widgets.append(DashboardWidget(
+            id=widget_id,
+            type=widget_type,
+            title=title,
+            metric=metric,
+            value=round(value, 2) if value is not None else None,
+            unit=unit,
+            trend=metric_trend(metric),
+            status=metric_status(metric, value)
+        ))
     return widgets
 
 
 @router.get("/timeseries/{metric}")
-async def get_metric_timeseries(metric: str, hours: int = 24):
+async def get_metric_timeseries(metric: str, hours: int = Query(24, ge=1, le=MAX_HOURS)):
     """Get time series data for a metric"""
-    data = generate_timeseries(metric, hours)
+    if metric not in METRICS:
+        raise HTTPException(status_code=404, detail=f"Unknown metric: {metric}")
+    sampler.sample_if_due()
+    resolution, data = timeseries_store.query(metric, hours * 3600)
     return {
         "metric": metric,
         "hours": hours,
+        "resolution_seconds": resolution,
         "data": data,
         "generated_at": datetime.now().isoformat()
     }
@@ -139,31 +131,22 @@ async def get_metric_timeseries(metric: str, hours: int = 24):
 
 @router.get("/summary")
 async def get_metrics_summary() -> List[MetricSummary]:
-    """Get summary of all metrics"""
-    metrics = [
-        "requests_per_minute",
-        "avg_latency_ms",
-        "error_rate_percent",
-        "cache_hit_rate",
-        "active_users",
-        "db_connections",
-        "memory_usage_mb",
-        "cpu_usage_percent"
-    ]
-    
+    """Get summary of all metrics over the last 24 hours"""
+    sampler.sample_if_due()
     summaries = []
-    for metric in metrics:
-        values = [float(d.value) for d in generate_timeseries(metric, 24)]
-        
+    for metric in METRICS:
+        current = timeseries_store.latest(metric)
+        day = timeseries_store.window(metric, 24 * 3600)
+        if current is None or day is None:
+            continue
         summaries.append(MetricSummary(
             metric=metric,
-            current=values[-1],
-            min=min(values),
-            max=max(values),
-            avg=sum(values) / len(values),
-            change_percent=random.uniform(-5, 5)
+            current=round(current, 2),
+            min=round(day["min"], 2),
+            max=round(day["max"], 2),
+            avg=round(day["avg"], 2),
+            change_percent=round((current - day["avg"]) / abs(day["avg"]) * 100, 2) if day["avg"] else 0.0
         ))
-    
     return summaries
 
 
@@ -188,18 +171,10 @@ async def metrics_health():
 
 
 @router.get("/realtime")
-async def get_realtime_metrics():
+async def get_realtime_metrics() -> Dict[str, Any]:
     """Get real-time metrics snapshot"""
+    sampler.sample_if_due()
     return {
         "timestamp": datetime.now().isoformat(),
-        "metrics": {
-            "requests_per_minute": random.randint(50, 200),
-            "avg_latency_ms": random.uniform(50, 150),
-            "error_rate_percent": random.uniform(0.1, 2.0),
-            "cache_hit_rate": random.uniform(75, 95),
-            "active_users": random.randint(10, 100),
-            "db_connections": random.randint(5, 20),
-            "memory_usage_mb": random.uniform(100, 500),
-            "cpu_usage_percent": random.uniform(10, 50)
-        }
+        "metrics": {metric: timeseries_store.latest(metric) for metric in METRICS}
     }
@@ -0,0 +1,265 @@
+"""
+Metrics Time Series - fixed-size ring buffers behind the metrics dashboard
+
+Every metric keeps three rings: 10-second points for the last hour,
+1-minute points for the last day and 1-hour points for the last 30 days.
+A sample is folded into the current slot of each ring (sum, count, min,
+max), so coarser resolutions are downsampled as they are written and
+nothing is ever compacted or copied. Memory per metric is fixed.
+
+The sampler reads the producers every SAMPLE_INTERVAL seconds: request,
+error and latency counters from the performance middleware, cache hits
+and misses, DB pool connections (all through the /metrics collectors, so
+in multi-process mode they cover every worker) and this process's CPU
+and memory from psutil.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from middleware import openmetrics
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# ============ Configuration ============
+
+SAMPLE_INTERVAL = float(os.getenv("METRICS_SAMPLE_INTERVAL", "10"))
+
+# (slot seconds, slots): 1h of 10s points, 24h of 1m points, 30d of 1h points
+RESOLUTIONS = ((10, 360), (60, 1440), (3600, 720))
+
+# ============ Ring Buffers ============
+
+class RingSeries:
+    """Fixed-size ring of per-slot sum, count, min and max"""
+    
+    __slots__ = ("width", "size", "slots", "sums", "counts", "mins", "maxs")
+    
+    def __init__(self, width: int, size: int):
+        self.width = width
+        self.size = size
+        self.slots = array("q", [-1]) * size
+        self.sums = array("d", [0.0]) * size
+        self.counts = array("q", [0]) * size
+        self.mins = array("d", [0.0]) * size
+        self.maxs = array("d", [0.0]) * size
+    
+    @property
+    def span(self) -> int:
+        return self.width * self.size
+    
+    def add(self, value: float, now: float):
+        slot = int(now // self.width)
+        i = slot % self.size
+        if self.slots[i] != slot:
+            self.slots[i] = slot
+            self.sums[i] = value
+            self.counts[i] = 1
+            self.mins[i] = value
+            self.maxs[i] = value
+        else:
+            self.sums[i] += value
+            self.counts[i] += 1
+            if value < self.mins[i]:
+                self.mins[i] = value
+            if value > self.maxs[i]:
+                self.maxs[i] = value
+    
+    def filled(self, seconds: float, now: float) -> Iterator[int]:
+        """Indexes of filled slots in the last `seconds`, oldest first"""
+        last = int(now // self.width)
+        for slot in range(max(last - self.size + 1, int((now - seconds) // self.width) + 1), last + 1):
+            i = slot % self.size
+            if self.slots[i] == slot:
+                yield i
+    
+    def points(self, seconds: float, now: float) -> Iterator[Tuple[float, float, float, float]]:
+        """(slot start, avg, min, max) for the last `seconds`, oldest first"""
+        for i in self.filled(seconds, now):
+            yield self.slots[i] * self.width, self.sums[i] / self.counts[i], self.mins[i], self.maxs[i]
+
+
+class TimeSeriesStore:
+    """Ring buffers per metric at every resolution"""
+    
+    def __init__(self, resolutions: Tuple[Tuple[int, int], ...] = RESOLUTIONS):
+        self.resolutions = resolutions
+        self._series: Dict[str, Tuple[RingSeries, ...]] = {}
+        self._latest: Dict[str, Tuple[float, float]] = {}
+    
+    def record(self, metric: str, value: float, now: Optional[float] = None):
+        """Fold one sample into every resolution; O(resolutions)"""
+        now = time.time() if now is None else now
+        rings = self._series.get(metric)
+        if rings is None:
+            rings = self._series[metric] = tuple(RingSeries(width, size) for width, size in self.resolutions)
+        for ring in rings:
+            ring.add(value, now)
+        self._latest[metric] = (now, value)
+    
+    def metrics(self) -> List[str]:
+        return list(self._series)
+    
+    def latest(self, metric: str) -> Optional[float]:
+        """Most recent sample"""
+        latest = self._latest.get(metric)
+        return latest[1] if latest else None
+    
+    def ring_for(self, metric: str, seconds: float) -> Optional[RingSeries]:
+        """Finest ring covering `seconds`, else the coarsest"""
+        rings = self._series.get(metric)
+        if rings is None:
+            return None
+        return next((ring for ring in rings if ring.span >= seconds), rings[-1])
+    
+    def query(self, metric: str, seconds: float, now: Optional[float] = None) -> Tuple[int, List[dict]]:
+        """(resolution seconds, points) covering the last `seconds`; O(points)"""
+        now = time.time() if now is None else now
+        ring = self.ring_for(metric, seconds)
+        if ring is None:
+            return self.resolutions[0][0], []
+        return ring.width, [
+            {
+                "timestamp": datetime.fromtimestamp(start).isoformat(),
+                "value": round(avg, 3),
+                "min": round(low, 3),
+                "max": round(high, 3)
+            }
+            for start, avg, low, high in ring.points(seconds, now)
+        ]
+    
+    def window(
+        self, metric: str, seconds: float, now: Optional[float] = None, end: float = 0
+    ) -> Optional[Dict[str, float]]:
+        """Sample-weighted avg, min and max over `seconds` ending `end` seconds ago"""
+        now = time.time() if now is None else now
+        ring = self.ring_for(metric, seconds + end)
+        if ring is None:
+            return None
+        total, count, low, high = 0.0, 0, None, None
+        for i in ring.filled(seconds, now - end):
+            total += ring.sums[i]
+            count += ring.counts[i]
+            low = ring.mins[i] if low is None else min(low, ring.mins[i])
+            high = ring.maxs[i] if high is None else max(high, ring.maxs[i])
+        if not count:
+            return None
+        return {"avg": total / count, "min": low, "max": high}
+
+# ============ Sampler ============
+
+def _total(families: Dict[str, openmetrics.MetricFamily], name: str, suffix: str = "_total", **match) -> float:
+    """Sum of a family's samples with this suffix and these labels"""
+    family = families.get(name)
+    if family is None:
+        return 0.0
+    wanted = set(match.items())
+    return sum(
+        value for (sample_suffix, labels), value in family.samples.items()
+        if sample_suffix == suffix and wanted <= set(labels)
+    )
+
+
+class MetricsSampler:
+    """Turns producer counters into dashboard samples"""
+    
+    def __init__(self, store: TimeSeriesStore):
+        self.store = store
+        self.last_sample = 0.0
+        self._previous: Optional[Dict[str, float]] = None
+        self._process = psutil.Process() if psutil else None
+        if self._process is not None:
+            self._process.cpu_percent(None)  # primes the CPU delta
+    
+    def read_counters(self) -> Dict[str, float]:
+        families = openmetrics.gather()
+        return {
+            "requests": _total(families, "organic_http_requests"),
+            "errors": _total(families, "organic_http_errors"),
+            "latency_sum": _total(families, "organic_http_request_duration_seconds", "_sum"),
+            "latency_count": _total(families, "organic_http_request_duration_seconds", "_count"),
+            "cache_hits": _total(families, "organic_cache_hits"),
+            "cache_misses": _total(families, "organic_cache_misses"),
+            "db_connections": _total(families, "organic_db_pool_connections", "", state="in_use"),
+        }
+    
+    def sample(self, now: Optional[float] = None):
+        """Record one point per metric"""
+        now = time.time() if now is None else now
+        counters = self.read_counters()
+        record = self.store.record
+        
+        previous, self._previous = self._previous, counters
+        elapsed = now - self.last_sample
+        self.last_sample = now
+        
+        # Rates need a previous sample; a counter going backwards means a reset
+        if previous is not None and elapsed > 0:
+            delta = {key: counters[key] - previous[key] for key in counters}
+            if min(delta["requests"], delta["errors"], delta["latency_count"],
+                   delta["cache_hits"], delta["cache_misses"]) >= 0:
+                record("requests_per_minute", delta["requests"] / elapsed * 60, now)
+                if delta["latency_count"]:
+                    record("avg_latency_ms", delta["latency_sum"] / delta["latency_count"] * 1000, now)
+                if delta["requests"]:
+                    record("error_rate_percent", min(delta["errors"] / delta["requests"] * 100, 100.0), now)
+                lookups = delta["cache_hits"] + delta["cache_misses"]
+                if lookups:
+                    record("cache_hit_rate", delta["cache_hits"] / lookups * 100, now)
+        
+        record("db_connections", counters["db_connections"], now)
+        if self._process is not None:
+            record("memory_usage_mb", self._process.memory_info().rss / 1024 / 1024, now)
+            record("cpu_usage_percent", self._process.cpu_percent(None), now)
+    
+    def sample_if_due(self, now: Optional[float] = None):
+        """Sample unless the last sample is younger than SAMPLE_INTERVAL"""
+        now = time.time() if now is None else now
+        if now - self.last_sample >= SAMPLE_INTERVAL:
+            self.sample(now)
+
+
+timeseries_store = TimeSeriesStore()
+sampler = MetricsSampler(timeseries_store)
+
+# ============ Background Sampling ============
+
+_sample_task: Optional[asyncio.Task] = None
+
+
+async def _sample_loop():
+    while True:
+        try:
+            sampler.sample_if_due()
+        except Exception as e:
+            logger.warning(f"Metrics sampling failed: {e}")
+        await asyncio.sleep(SAMPLE_INTERVAL)
+
+
+async def start_metrics_sampler():
+    """Start sampling producers into the time series store"""
+    global _sample_task
+    if _sample_task is None:
+        _sample_task = asyncio.create_task(_sample_loop())
+
+
+async def stop_metrics_sampler():
+    """Stop the background sampler"""
+    global _sample_task
+    if _sample_task is not None:
+        _sample_task.cancel()
+        try:
+            await _sample_task
+        except asyncio.CancelledError:
+            pass
+        _sample_task = None
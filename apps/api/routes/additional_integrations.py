@@ -8,6 +8,10 @@ from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
 import httpx
 import asyncio
+from datetime import date
+
+from cache.redis_cache import cached
+from cache.optimization import TTL_CONFIG, register_warmer
 
 router = APIRouter(prefix="/api/v1/additional", tags=["additional-integrations"])
 
@@ -105,6 +109,7 @@ async def fetch_fact() -> FactResponse:
     return FactResponse(fact=random.choice(facts), category="general", source="fallback")
 
 
+@cached(ttl=60, stale_ttl=300)
 async def fetch_trivia() -> TriviaResponse:
     """Fetch trivia question from Open Trivia"""
     try:
@@ -153,8 +158,9 @@ async def fetch_definition(word: str) -> Optional[DefinitionResponse]:
     return None
 
 
-async def fetch_quote_of_day() -> QuoteResponse:
-    """Fetch quote of the day"""
+@cached(ttl=3600, stale_ttl=600, early_refresh=1.0)
+async def fetch_quote_of_day() -> Optional[QuoteResponse]:
+    """Fetch quote of the day (None when ZenQuotes is unavailable, so nothing is cached)"""
     try:
         async with httpx.AsyncClient(timeout=10.0) as client:
             resp = await client.get("https://zenquotes.io/api/today")
@@ -167,35 +173,39 @@ async def fetch_quote_of_day() -> QuoteResponse:
                 )
     except Exception:
         pass
-    
-    return await fetch_quote()
+    return None
 
 
-async def fetch_holiday() -> Optional[Dict[str, str]]:
-    """Fetch today's holiday from Nager.Date"""
-    from datetime import datetime
-    today = datetime.now()
+@cached(ttl=86400)
+async def fetch_holiday_on(day: str) -> Optional[Dict[str, str]]:
+    """Fetch the holiday on day (YYYY-MM-DD) from Nager.Date, {} if there is none
     
+    None (not cached) means the lookup failed.
+    """
+    year, month, _ = day.split("-")
     try:
         async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(
-                f"https://date.nager.at/api/v3/PublicHolidays/{today.year}/{today.strftime('%m')}"
-            )
+            resp = await client.get(f"https://date.nager.at/api/v3/PublicHolidays/{year}/{month}")
             if resp.status_code == 200:
-                holidays = resp.json()
-                for holiday in holidays:
-                    if holiday.get("date") == today.strftime("%Y-%m-%d"):
+                for holiday in resp.json():
+                    if holiday.get("date") == day:
                         return {
                             "name": holiday.get("name", ""),
                             "description": holiday.get("localName", ""),
                             "country": holiday.get("countryCode", ""),
                         }
+                return {}
     except Exception:
         pass
     
     return None
 
 
+async def fetch_holiday() -> Optional[Dict[str, str]]:
+    """Today's holiday; the date is part of the cache key, so it rolls over at midnight"""
+    return await fetch_holiday_on(date.today().isoformat())
+
+
 # ============ Routes ============
 
 @router.get("/quote", response_model=QuoteResponse)
@@ -207,7 +217,10 @@ async def get_random_quote():
 @router.get("/quote/daily", response_model=QuoteResponse)
 async def get_daily_quote():
     """Get quote of the day"""
-    return await fetch_quote_of_day()
+    quote = await fetch_quote_of_day()
+    if quote is not None:
+        return quote
+    return await fetch_quote()
 
 
 @router.get("/fact", response_model=FactResponse)
@@ -240,9 +253,9 @@ async def get_today_holiday():
     return {"message": "No holiday today"}
 
 
-@router.get("/wellness/tip")
-async def get_wellness_tip():
-    """Get a wellness tip"""
+@cached(ttl=TTL_CONFIG["wellness_tips"], key_prefix="wellness_tips:daily")
+async def fetch_wellness_tip() -> Dict[str, str]:
+    """Pick the wellness tip (cached, so one tip per day)"""
     tips = [
         {"category": "sleep", "tip": "Aim for 7-9 hours of sleep for optimal cognitive function."},
         {"category": "hydration", "tip": "Drink at least 8 glasses of water daily."},
@@ -262,9 +275,15 @@ async def get_wellness_tip():
     }
 
 
-@router.get("/productivity/technique")
-async def get_productivity_technique():
-    """Get a productivity technique"""
+@router.get("/wellness/tip")
+async def get_wellness_tip():
+    """Get a wellness tip"""
+    return await fetch_wellness_tip()
+
+
+@cached(ttl=3600)
+async def fetch_productivity_technique() -> Dict[str, str]:
+    """Pick the productivity technique (cached, so one per hour)"""
     techniques = [
         {"name": "Pomodoro", "description": "Work for 25 minutes, rest for 5. Repeat 4 times, then take a longer break."},
         {"name": "Eat the Frog", "description": "Do your most difficult task first thing in the morning."},
@@ -280,6 +299,12 @@ async def get_productivity_technique():
     return technique
 
 
+@router.get("/productivity/technique")
+async def get_productivity_technique():
+    """Get a productivity technique"""
+    return await fetch_productivity_technique()
+
+
 @router.get("/mindfulness/practice")
 async def get_mindfulness_practice():
     """Get a mindfulness practice suggestion"""
@@ -307,3 +332,10 @@ async def get_batch_data():
         "fact": fact.model_dump(),
         "trivia": trivia.model_dump(),
     }
+
+
+# ============ Cache Warming ============
+
+register_warmer("wellness_tip", fetch_wellness_tip)
+register_warmer("holiday", fetch_holiday)
+register_warmer("productivity_technique", fetch_productivity_technique)
@@ -14,6 +14,7 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 import jwt
 import hashlib
+import os
 import secrets
 import time
 
@@ -24,6 +25,10 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 TOKEN_ROTATION_ENABLED = True
+# User ids (token "sub"), comma-separated, allowed on admin-only endpoints
+ADMIN_USER_IDS = frozenset(
+    user_id.strip() for user_id in os.getenv("ADMIN_USER_IDS", "").split(",") if user_id.strip()
+)
 
 # ============ Token Storage ============
 
@@ -325,6 +330,15 @@ async def get_current_user(
     """Dependency to get current authenticated user"""
     return verify_token(credentials.credentials)
 
+async def require_admin(user: TokenPayload = Depends(get_current_user)) -> TokenPayload:
+    """Dependency for admin-only endpoints: a user listed in ADMIN_USER_IDS"""
+    if user.sub not in ADMIN_USER_IDS:
+        raise HTTPException(
+            status_code=403,
+            detail="Admin access required"
+        )
+    return user
+
 async def get_current_user_with_rotation(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> TokenPayload:
@@ -15,6 +15,8 @@ from enum import Enum
 import uuid
 import json
 
+from cache.response_cache import invalidate_responses
+
 router = APIRouter(prefix="/api/v1/content", tags=["Content Versioning"])
 
 # ============ Data Models ============
@@ -126,6 +128,9 @@ class ContentVersionStore:
             author=author
         )
         
+        # Cached HTTP responses built from this content are now stale
+        invalidate_responses(content_id)
+        
         return content_version
     
     def get_version(self, content_id: str, version: int) -> ContentVersion:
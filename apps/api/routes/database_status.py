@@ -3,20 +3,26 @@ Database Status and Performance Endpoints
 
 Monitor database health and query performance.
 """
-from fastapi import APIRouter, Depends
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, Any, Optional
 import os
 
+from routes.auth_security import require_admin
+
 router = APIRouter(prefix="/api/v1/database", tags=["Database"])
 
 # Try to import database optimization (optional)
 try:
     from database.optimized import (
         get_connection_info,
-        check_database_health,
+        check_database_health_async,
+        get_async_engine,
+        get_replica_set,
+        prepared_statement_stats,
         query_cache,
         query_metrics,
-        reset_connection_pool
+        reset_connection_pool,
+        reset_connection_pool_async
     )
     DB_AVAILABLE = True
 except ImportError:
@@ -42,7 +48,7 @@ async def get_database_status() -> Dict[str, Any]:
     return {
         "status": "configured",
         "connection": get_connection_info(),
-        "health": check_database_health()
+        "health": await check_database_health_async()
     }
 
 
@@ -62,8 +68,12 @@ async def get_cache_stats() -> Dict[str, Any]:
 
 
 @router.get("/metrics")
-async def get_database_metrics() -> Dict[str, Any]:
-    """Get database query metrics"""
+async def get_database_metrics(
+    top: int = Query(10, ge=1, le=100),
+    sort_by: str = Query("total_ms", pattern="^(total_ms|calls|rows|p95_ms)$"),
+    recent: int = Query(0, ge=0, le=1000)
+) -> Dict[str, Any]:
+    """Get database query metrics: totals, dominant statements, slow queries"""
     if not DB_AVAILABLE or query_metrics is None:
         return {
             "status": "unavailable",
@@ -73,16 +83,62 @@ async def get_database_metrics() -> Dict[str, Any]:
     return {
         "status": "active",
         "metrics": query_metrics.get_stats(),
-        "slow_queries": query_metrics.get_slow_queries(5)
+        "top_statements": query_metrics.get_top_statements(top, sort_by),
+        "slow_queries": query_metrics.get_slow_queries(10),
+        "prepared_statements": prepared_statement_stats.to_dict(),
+        "recent": query_metrics.get_recent(recent) if recent else []
     }
 
 
+@router.post("/metrics/explain/{fingerprint}", dependencies=[Depends(require_admin)])
+async def explain_slow_query(fingerprint: str, analyze: bool = False) -> Dict[str, Any]:
+    """EXPLAIN the latest captured slow execution of a statement fingerprint
+    
+    Admin only. Runs on a usable replica when there is one, in a read-only
+    transaction that is rolled back (see QueryMetrics.explain).
+    """
+    if not DB_AVAILABLE or query_metrics is None:
+        return {"status": "unavailable"}
+    
+    replica = get_replica_set().choose()
+    engine = replica.async_engine if replica is not None else get_async_engine()
+    try:
+        async with engine.connect() as connection:
+            return await connection.run_sync(
+                lambda sync_connection: query_metrics.explain(fingerprint, sync_connection, analyze)
+            )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/metrics/reset")
+async def reset_database_metrics() -> Dict[str, Any]:
+    """Clear collected query metrics"""
+    if not DB_AVAILABLE or query_metrics is None:
+        return {"status": "unavailable"}
+    
+    query_metrics.reset()
+    prepared_statement_stats.reset()
+    return {"status": "reset"}
+
+
 @router.post("/cache/clear")
-async def clear_cache() -> Dict[str, Any]:
+async def clear_cache(
+    table: Optional[str] = Query(None, description="Only drop results that read this table")
+) -> Dict[str, Any]:
     """Clear query cache"""
     if not DB_AVAILABLE or query_cache is None:
         return {"status": "no_cache_to_clear"}
     
+    if table:
+        dropped = query_cache.invalidate_tables([table.lower()])
+        return {
+            "status": "cleared",
+            "message": f"Dropped {dropped} cached results for {table}"
+        }
+    
     query_cache.invalidate()
     return {
         "status": "cleared",
@@ -97,6 +153,7 @@ async def reset_pool() -> Dict[str, Any]:
         return {"status": "not_available"}
     
     reset_connection_pool()
+    await reset_connection_pool_async()
     return {
         "status": "reset",
         "message": "Connection pool reset"
@@ -8,6 +8,9 @@ from typing import Optional, Dict, List
 import httpx
 import json
 
+from cache.redis_cache import cached
+from cache.optimization import register_warmer
+
 router = APIRouter(prefix="/api/v1/integrations", tags=["integrations"])
 
 # ============ Free API Registry ============
@@ -87,8 +90,15 @@ FREE_APIS = {
 
 # ============ API Functions ============
 
-async def get_daily_quote() -> Dict:
-    """Get daily inspiration quote"""
+DAILY_QUOTE_FALLBACK = {
+    "quote": "The only way to do great work is to love what you do.",
+    "author": "Steve Jobs",
+    "source": "Fallback"
+}
+
+@cached(ttl=3600, stale_ttl=600, early_refresh=1.0)
+async def fetch_daily_quote() -> Optional[Dict]:
+    """Fetch the ZenQuotes quote of the day (None, never cached, when unavailable)"""
     try:
         async with httpx.AsyncClient() as client:
             response = await client.get("https://zenquotes.io/api/today", timeout=10.0)
@@ -101,14 +111,15 @@ async def get_daily_quote() -> Dict:
                 }
     except Exception:
         pass
-    
-    # Fallback quotes
-    fallback = {
-        "quote": "The only way to do great work is to love what you do.",
-        "author": "Steve Jobs",
-        "source": "Fallback"
-    }
-    return fallback
+    return None
+
+async def get_daily_quote() -> Dict:
+    """Get daily inspiration quote"""
+    quote = await fetch_daily_quote()
+    if quote is not None:
+        return quote
+    # Fallback quote; the next request tries ZenQuotes again
+    return dict(DAILY_QUOTE_FALLBACK)
 
 async def get_random_fact() -> Dict:
     """Get random useless fact"""
@@ -296,3 +307,8 @@ async def integrations_status():
             "requires_key": api["requires_key"]
         }
     return {"status": status}
+
+
+# ============ Cache Warming ============
+
+register_warmer("daily_quote", fetch_daily_quote)
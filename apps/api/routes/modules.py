@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 
+from cache.response_cache import cache_response
+
 router = APIRouter()
 
 # Module-specific endpoints
@@ -132,6 +134,7 @@ async def get_emotion_info(emotion: str):
 # ====================
 
 @router.get("/wellness/goals")
+@cache_response(tags=("wellness",))
 async def get_default_goals():
     """
     Get suggested wellness goals based on common patterns.
@@ -216,6 +219,7 @@ async def assess_burnout(assessment: BurnoutAssessment):
 # ====================
 
 @router.get("/communication/goals")
+@cache_response(tags=("communication",))
 async def get_communication_goals():
     """
     Get suggested communication improvement goals.
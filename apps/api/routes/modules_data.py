@@ -5,9 +5,13 @@ API endpoints for accessing comprehensive module data.
 This provides content for all Organic OS modules without requiring database queries.
 """
 from fastapi import APIRouter, HTTPException
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 import json
 
+from cache.redis_cache import cached
+from cache.optimization import TTL_CONFIG, register_warmer
+from cache.response_cache import ALL_CONTENT, cache_response
+
 router = APIRouter(prefix="/api/v1/modules", tags=["modules"])
 
 # Import module data functions
@@ -383,61 +387,77 @@ def get_video_data():
 # ============ Routes ============
 
 @router.get("/identity")
+@cache_response(tags=("identity",))
 async def get_identity_module():
     """Get identity module data"""
     return get_identity_data()
 
 @router.get("/emotional")
+@cache_response(tags=("emotional",))
 async def get_emotional_module():
     """Get emotional intelligence module data"""
-    return get_emotional_data()
+    return await build_emotion_taxonomy()
 
 @router.get("/wellness")
+@cache_response(tags=("wellness",))
 async def get_wellness_module():
     """Get wellness module data"""
     return get_wellness_data()
 
 @router.get("/recovery")
+@cache_response(tags=("recovery",))
 async def get_recovery_module():
     """Get recovery module data"""
     return get_recovery_data()
 
 @router.get("/communication")
+@cache_response(tags=("communication",))
 async def get_communication_module():
     """Get communication module data"""
     return get_communication_data()
 
 @router.get("/sensory")
+@cache_response(tags=("sensory",))
 async def get_sensory_module():
     """Get sensory module data"""
     return get_sensory_data()
 
 @router.get("/sustainability")
+@cache_response(tags=("sustainability",))
 async def get_sustainability_module():
     """Get sustainability module data"""
     return get_sustainability_data()
 
 @router.get("/holistic-alchemy")
+@cache_response(tags=("holistic_alchemy",))
 async def get_holistic_alchemy_module():
     """Get holistic alchemy module data"""
     return get_holistic_alchemy_data()
 
 @router.get("/atom-economy")
+@cache_response(tags=("atom_economy",))
 async def get_atom_economy_module():
     """Get atom economy module data"""
     return get_atom_economy_data()
 
 @router.get("/video")
+@cache_response(tags=("video",))
 async def get_video_module():
     """Get video module data"""
     return get_video_data()
 
-@router.get("/all")
-async def get_all_modules():
-    """Get all module data in one response"""
+@cached(ttl=TTL_CONFIG["emotion_taxonomy"], key_prefix="emotion_taxonomy:emotional")
+async def build_emotion_taxonomy() -> Dict[str, Any]:
+    """Emotional module data (emotion taxonomy), cached"""
+    return get_emotional_data()
+
+
+@cached(ttl=TTL_CONFIG["module_data"], key_prefix="module_data:all")
+async def build_all_modules() -> Dict[str, Any]:
+    """Payload for /all, cached so it is built once per TTL rather than per request"""
     return {
         "identity": get_identity_data(),
-        "emotional": get_emotional_data(),
+        "emotional": await build_emotion_taxonomy(),
         "wellness": get_wellness_data(),
         "recovery": get_recovery_data(),
         "communication": get_communication_data(),
@@ -448,7 +468,15 @@ async def get_all_modules():
         "video": get_video_data()
     }
 
+
+@router.get("/all")
+@cache_response(tags=(ALL_CONTENT,))
+async def get_all_modules():
+    """Get all module data in one response"""
+    return await build_all_modules()
+
 @router.get("/prompts/{module_name}")
+@cache_response()
 async def get_module_prompts(module_name: str):
     """Get daily prompts for a specific module"""
     prompts_map = {
@@ -475,6 +503,7 @@ async def get_module_prompts(module_name: str):
     raise HTTPException(status_code=404, detail="Module not found")
 
 @router.get("/exercises/{module_name}")
+@cache_response()
 async def get_module_exercises(module_name: str):
     """Get exercises for a specific module"""
     exercises_map = {
@@ -487,3 +516,9 @@ async def get_module_exercises(module_name: str):
     if module_name in exercises_map:
         return {"module": module_name, "exercises": exercises_map[module_name]}
     raise HTTPException(status_code=404, detail="Module not found")
+
+
+# ============ Cache Warming ============
+
+register_warmer("all_modules", build_all_modules)
+register_warmer("emotion_taxonomy", build_emotion_taxonomy)
@@ -3,14 +3,37 @@ Wellness Routes - Enhanced with Streak Rewards
 
 This module provides wellness tracking with gamification elements.
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 from typing import Optional, List
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from contextlib import aclosing, contextmanager
+from uuid import UUID
 import random
 
+# Database access is optional: without it, or with the server unreachable,
+# the routes that store or aggregate entries return 503
+try:
+    from sqlalchemy.exc import IntegrityError, InterfaceError, OperationalError
+    from database.optimized import AsyncDatabaseManager, AsyncQueryBuilder, get_async_db, get_async_read_db
+    DB_AVAILABLE = True
+    # asyncpg raises OSError (e.g. connection refused) without wrapping it
+    DB_CONNECTION_ERRORS = (OSError, InterfaceError, OperationalError)
+    # Entries reference users.id; the (user_id, date) conflicts are upserted
+    DB_UNKNOWN_USER_ERRORS = (IntegrityError,)
+except ImportError:
+    DB_AVAILABLE = False
+    DB_CONNECTION_ERRORS = ()
+    DB_UNKNOWN_USER_ERRORS = ()
+
 router = APIRouter(prefix="/api/v1/wellness", tags=["wellness"])
 
+# Offline history a client may upload in one request
+MAX_SYNC_ENTRIES = 1000
+
+# Longest /stats window (served from weekly rollups, so cost barely grows with it)
+MAX_STATS_DAYS = 3650
+
 # ============ Models ============
 
 class WellnessEntry(BaseModel):
@@ -23,6 +46,9 @@ class WellnessEntry(BaseModel):
     energy_level: Optional[int] = None  # 1-10
     nutrition_notes: Optional[str] = None
 
+class WellnessSyncRequest(BaseModel):
+    entries: List[WellnessEntry]
+
 class WellnessResponse(BaseModel):
     id: str
     user_id: str
@@ -63,6 +89,72 @@ MOTIVATIONAL_QUOTES = [
     "Wellness is not a destination, it's a way of life.",
 ]
 
+# ============ Database ============
+
+def require_database():
+    if not DB_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Database not available")
+
+@contextmanager
+def database_errors_as_503():
+    """Connection failures surface from the route (sessions connect lazily)"""
+    try:
+        yield
+    except DB_CONNECTION_ERRORS as e:
+        raise HTTPException(status_code=503, detail="Database not available") from e
+
+@contextmanager
+def unknown_user_as_404():
+    try:
+        yield
+    except DB_UNKNOWN_USER_ERRORS:
+        raise HTTPException(status_code=404, detail="User not found")
+
+async def get_session():
+    """Async session, or 503 when the database is not installed or reachable"""
+    require_database()
+    with database_errors_as_503():
+        async for session in get_async_db():
+            yield session
+
+async def get_read_session():
+    """Interactive (short timeout) session that may be served by a read replica"""
+    require_database()
+    with database_errors_as_503():
+        async with aclosing(get_async_read_db()) as sessions:
+            async for session in sessions:
+                yield session
+
+async def get_batch_session():
+    """Session with the long batch timeout, for bulk writes"""
+    require_database()
+    with database_errors_as_503():
+        async with AsyncDatabaseManager(query_class="batch") as session:
+            yield session
+
+def streak_rewards(current_streak: int) -> list:
+    """Earned/progress state of every streak reward"""
+    rewards = []
+    for reward in STREAK_REWARDS:
+        if current_streak >= reward["streak"]:
+            rewards.append({
+                "earned": True,
+                **reward
+            })
+        else:
+            rewards.append({
+                "earned": False,
+                "progress": f"{current_streak}/{reward['streak']}",
+                **reward
+            })
+    return rewards
+
+def parse_entry_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Entry dates must be YYYY-MM-DD")
+
 # ============ Routes ============
 
 @router.get("/prompt")
@@ -112,50 +204,29 @@ async def get_daily_prompt(category: Optional[str] = None) -> dict:
 
 @router.get("/stats")
 async def get_wellness_stats(
-    user_id: str = "demo-user",
-    days: int = 30
+    user_id: UUID,
+    days: int = Query(30, ge=1, le=MAX_STATS_DAYS),
+    session=Depends(get_read_session)
 ) -> dict:
     """
     Get aggregated wellness statistics.
     """
-    # In production, fetch from database
-    return {
-        "avg_sleep": round(random.uniform(6.5, 8.5), 1),
-        "avg_mood": round(random.uniform(6.5, 8.5), 1),
-        "avg_energy": round(random.uniform(6.0, 8.0), 1),
-        "avg_water": round(random.uniform(2000, 3000)),
-        "avg_exercise": round(random.uniform(20, 45)),
-        "avg_meditation": round(random.uniform(5, 20)),
-        "entries_count": min(days, random.randint(14, days))
-    }
+    return await AsyncQueryBuilder(session).get_wellness_stats(str(user_id), days)
 
 @router.get("/streak")
-async def get_wellness_streak(user_id: str = "demo-user") -> dict:
+async def get_wellness_streak(
+    user_id: UUID,
+    session=Depends(get_read_session)
+) -> dict:
     """
     Get current wellness streak and rewards.
     """
-    current_streak = random.randint(0, 25)
-    
-    # Calculate rewards
-    rewards = []
-    for reward in STREAK_REWARDS:
-        if current_streak >= reward["streak"]:
-            rewards.append({
-                "earned": True,
-                **reward
-            })
-        else:
-            rewards.append({
-                "earned": False,
-                "progress": f"{current_streak}/{reward['streak']}",
-                **reward
-            })
+    streak = await AsyncQueryBuilder(session).get_wellness_streak(str(user_id))
+    current_streak = streak["current_streak"]
     
     return {
-        "current_streak": current_streak,
-        "longest_streak": random.randint(15, 100),
-        "total_entries": random.randint(30, 200),
-        "rewards": rewards,
+        **streak,
+        "rewards": streak_rewards(current_streak),
         "next_reward": next(
             (r for r in STREAK_REWARDS if r["streak"] > current_streak),
             None
@@ -190,10 +261,16 @@ async def get_wellness_goals() -> dict:
     }
 
 @router.post("/check-in")
-async def wellness_check_in(entry: WellnessEntry, user_id: str = "demo-user") -> dict:
+async def wellness_check_in(
+    entry: WellnessEntry,
+    user_id: UUID,
+    session=Depends(get_session)
+) -> dict:
     """
     Quick wellness check-in with instant feedback.
     """
+    entry_date = parse_entry_date(entry.date)
+    
     # Calculate wellness score
     score = 0
     feedback = []
@@ -242,10 +319,48 @@ async def wellness_check_in(entry: WellnessEntry, user_id: str = "demo-user") ->
             score += 5
             feedback.append("🤗 Tomorrow is a new opportunity")
     
+    builder = AsyncQueryBuilder(session)
+    with unknown_user_as_404():
+        await builder.bulk_upsert_wellness(
+            [{"user_id": str(user_id), "date": entry_date, **entry.model_dump(exclude={"date"})}]
+        )
+    streak = await builder.get_wellness_streak(str(user_id))
+    
     return {
         "status": "logged",
         "wellness_score": min(score, 100),
         "feedback": feedback,
         "encouragement": random.choice(MOTIVATIONAL_QUOTES),
-        "streak_tip": "Log 3 days in a row to start your streak! 🔥"
+        "current_streak": streak["current_streak"],
+        "streak_tip": (
+            f"🔥 {streak['current_streak']}-day streak - keep it going!"
+            if streak["current_streak"] >= 3
+            else "Log 3 days in a row to start your streak! 🔥"
+        )
+    }
+
+@router.post("/sync")
+async def sync_wellness_history(
+    request: WellnessSyncRequest,
+    user_id: UUID,
+    session=Depends(get_batch_session)
+) -> dict:
+    """
+    Upsert offline wellness history (one row per day, the upload wins).
+    """
+    if len(request.entries) > MAX_SYNC_ENTRIES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_SYNC_ENTRIES} entries per sync")
+    
+    rows = [
+        {"user_id": str(user_id), "date": parse_entry_date(entry.date), **entry.model_dump(exclude={"date"})}
+        for entry in request.entries
+    ]
+    
+    with unknown_user_as_404():
+        result = await AsyncQueryBuilder(session).bulk_upsert_wellness(rows)
+    return {
+        "status": "synced",
+        "entries": result["rows"],
+        "chunks": result["chunks"],
+        "method": result["method"]
     }
@@ -0,0 +1,97 @@
+"""
+Benchmark cache codecs on /api/v1/modules/all-sized payloads.
+
+Measures encode/decode time and stored size for every codec/compression
+combination that is installed, so CACHE_CODEC and CACHE_COMPRESSION can be
+chosen from numbers rather than guesses.
+
+Usage (from apps/api):
+    python scripts/benchmark_cache_codecs.py [--rounds 2000]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cache.serialization import (
+    Serializer,
+    ORJSON_AVAILABLE,
+    MSGPACK_AVAILABLE,
+    ZSTD_AVAILABLE,
+)
+from routes import modules_data
+
+
+def modules_all_payload() -> dict:
+    """Same dict the /modules/all route returns"""
+    return {
+        "identity": modules_data.get_identity_data(),
+        "emotional": modules_data.get_emotional_data(),
+        "wellness": modules_data.get_wellness_data(),
+        "recovery": modules_data.get_recovery_data(),
+        "communication": modules_data.get_communication_data(),
+        "sensory": modules_data.get_sensory_data(),
+        "sustainability": modules_data.get_sustainability_data(),
+        "holistic_alchemy": modules_data.get_holistic_alchemy_data(),
+        "atom_economy": modules_data.get_atom_economy_data(),
+        "video": modules_data.get_video_data(),
+    }
+
+
+def progress_payload(days: int = 90) -> list:
+    """Progress history with datetime values (stdlib json cannot encode these natively)"""
+    start = datetime(2026, 1, 1)
+    return [
+        {
+            "date": start + timedelta(days=i),
+            "module_name": "wellness",
+            "progress_percentage": i / days * 100,
+            "completed_topics": ["sleep", "nutrition", "movement"][: i % 3 + 1],
+        }
+        for i in range(days)
+    ]
+
+
+def bench(serializer: Serializer, payload, rounds: int) -> dict:
+    """Time dumps/loads for one serializer"""
+    encoded = serializer.dumps(payload)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        serializer.dumps(payload)
+    encode_us = (time.perf_counter() - start) / rounds * 1e6
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        serializer.loads(encoded)
+    decode_us = (time.perf_counter() - start) / rounds * 1e6
+
+    return {"encode_us": encode_us, "decode_us": decode_us, "bytes": len(encoded)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    codecs = ["json"] + (["orjson"] if ORJSON_AVAILABLE else []) + (["msgpack"] if MSGPACK_AVAILABLE else [])
+    compressions = ["none", "zlib"] + (["zstd"] if ZSTD_AVAILABLE else [])
+    payloads = {"modules_all": modules_all_payload(), "progress_90d": progress_payload()}
+
+    for name, payload in payloads.items():
+        print(f"\n{name}")
+        print(f"{'codec':<10}{'compression':<13}{'encode µs':>11}{'decode µs':>11}{'bytes':>9}")
+        for codec in codecs:
+            for compression in compressions:
+                result = bench(Serializer(codec, compression), payload, args.rounds)
+                print(
+                    f"{codec:<10}{compression:<13}"
+                    f"{result['encode_us']:>11.1f}{result['decode_us']:>11.1f}{result['bytes']:>9}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Benchmark the middleware stack: requests/s and latency percentiles.
+
+Drives main.app in-process through raw ASGI calls (no sockets or HTTP
+client, so the stack and the handler are all that is measured). Each
+request comes from a distinct client address so rate limiting never
+rejects it. Every path is measured twice:
+
+  throughput   --concurrency requests in flight, requests/s only
+  latency      one request at a time, p50/p99 of the service time
+
+Latency is not taken from the throughput run: with many requests in
+flight it is mostly time spent queued behind the others, and how much
+depends on how often a stack yields to the event loop (the pure-ASGI
+stack rarely does, so its requests queue before they start rather than
+while they run). Only the sequential run compares like with like.
+
+  --stack asgi        the stack as configured in main.py
+  --stack basehttp    the same stack with a pass-through BaseHTTPMiddleware
+                      next to each of the six layers that used to be
+                      BaseHTTPMiddleware (error handling, validation, rate
+                      limiting, security headers, audit, performance),
+                      i.e. the task/stream overhead the old stack paid
+  --stack both        (default) run both and print the difference
+
+For exact before/after numbers, run --stack asgi on this commit and on
+its parent (e.g. from a `git worktree`).
+
+The module data router is mounted with its prefix twice, so /modules/all
+is served at /api/v1/modules/api/v1/modules/all. Statuses are printed so
+a path that 404s is noticed.
+
+Usage (from apps/api):
+    python scripts/benchmark_middleware.py [--requests 5000] [--concurrency 50] \
+        [--paths /api/v1/health /api/v1/modules/api/v1/modules/all]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from main import app
+from middleware import rate_limiter
+from middleware.audit import AuditMiddleware
+from middleware.error_handler import ErrorHandlingMiddleware
+from middleware.performance_middleware import PerformanceMiddleware, reset_metrics
+from middleware.rate_limiter import RateLimitMiddleware
+from middleware.security import SecurityHeadersMiddleware
+from middleware.validation import ValidationMiddleware
+
+FORMERLY_BASE_HTTP = (
+    ErrorHandlingMiddleware,
+    ValidationMiddleware,
+    RateLimitMiddleware,
+    SecurityHeadersMiddleware,
+    AuditMiddleware,
+    PerformanceMiddleware,
+)
+
+
+async def passthrough(request, call_next):
+    return await call_next(request)
+
+
+def build_stack(kind: str):
+    """ASGI callable for main.app's middleware stack"""
+    if kind == "asgi":
+        return app.build_middleware_stack()
+    configured = app.user_middleware
+    app.user_middleware = []
+    for middleware in configured:
+        app.user_middleware.append(middleware)
+        if middleware.cls in FORMERLY_BASE_HTTP:
+            app.user_middleware.append(Middleware(BaseHTTPMiddleware, dispatch=passthrough))
+    try:
+        return app.build_middleware_stack()
+    finally:
+        app.user_middleware = configured
+
+
+def make_scope(path: str, client: int) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"accept", b"application/json"),
+            (b"accept-encoding", b"gzip"),
+            (b"user-agent", b"benchmark"),
+        ],
+        "client": (f"10.{client >> 16 & 255}.{client >> 8 & 255}.{client & 255}", 50000),
+        "server": ("testserver", 80),
+        "app": app,
+    }
+
+
+async def request(stack, path: str, client: int) -> int:
+    """One GET through the stack; returns the status"""
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await stack(make_scope(path, client), receive, send)
+    return status
+
+
+async def warm_up(stack, path: str, total: int):
+    """Imports, route compilation and caches, then fresh counters"""
+    for client in range(min(200, total)):
+        await request(stack, path, 1_000_000 + client)
+    rate_limiter.reset_rate_limits()
+    reset_metrics()
+
+
+async def throughput(stack, path: str, total: int, concurrency: int) -> dict:
+    """total requests with `concurrency` in flight"""
+    statuses = Counter()
+    next_client = iter(range(total))
+
+    async def worker():
+        for client in next_client:
+            statuses[await request(stack, path, client)] += 1
+
+    await warm_up(stack, path, total)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"rps": total / elapsed, "statuses": dict(statuses)}
+
+
+async def latency(stack, path: str, total: int) -> dict:
+    """total requests one at a time"""
+    latencies = []
+    await warm_up(stack, path, total)
+    for client in range(total):
+        start = time.perf_counter()
+        await request(stack, path, client)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    return {
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--stack", choices=["asgi", "basehttp", "both"], default="both")
+    parser.add_argument("--paths", nargs="+", default=["/api/v1/health", "/api/v1/modules/api/v1/modules/all"])
+    args = parser.parse_args()
+
+    kinds = ["basehttp", "asgi"] if args.stack == "both" else [args.stack]
+    stacks = {kind: build_stack(kind) for kind in kinds}
+
+    print(f"\n{args.requests} requests; req/s at {args.concurrency} in flight, latency at 1 in flight")
+    print(f"{'path':<40}{'stack':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}  statuses")
+    for path in args.paths:
+        results = {}
+        for kind, stack in stacks.items():
+            result = await throughput(stack, path, args.requests, args.concurrency)
+            result.update(await latency(stack, path, args.requests))
+            results[kind] = result
+            print(
+                f"{path:<40}{kind:<10}{result['rps']:>10.0f}{result['p50_ms']:>10.2f}"
+                f"{result['p99_ms']:>10.2f}  {result['statuses']}"
+            )
+        if len(results) == 2:
+            gain = results["asgi"]["rps"] / results["basehttp"]["rps"] - 1
+            p99 = results["asgi"]["p99_ms"] / results["basehttp"]["p99_ms"] - 1
+            print(f"{'':<40}{'':<10}{gain:>+10.0%}{'':>10}{p99:>+10.0%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
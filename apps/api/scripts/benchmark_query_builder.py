@@ -0,0 +1,152 @@
+"""
+Benchmark QueryBuilder loader strategies.
+
+Seeds an in-memory SQLite database (or DATABASE_URL with --url) and loads
+users with profile, goals, module progress and recent wellness three ways:
+lazy loading (N+1), joinedload on every collection (cartesian rows), and
+QueryBuilder (selectinload + windowed wellness query). Reports round trips
+and rows fetched per call, and time per call.
+
+Usage (from apps/api):
+    python scripts/benchmark_query_builder.py [--users 20] [--days 180] [--rounds 5]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.pool import StaticPool
+
+from database.models import Base, ModuleProgress, User, UserEntry, UserProfile, WellnessEntry, WellnessGoal
+from database.optimized import QueryBuilder
+
+MODULES = ["identity", "sensory", "emotional", "wellness", "recovery", "communication"]
+
+
+class RoundTrips:
+    """Count statements and the rows each SELECT returns"""
+
+    def __init__(self, engine):
+        self.statements = 0
+        self.rows = 0
+        self.count_rows = False
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        if self.count_rows and statement.lstrip().upper().startswith("SELECT"):
+            # Separate cursor so the ORM's own cursor is untouched
+            counter = conn.connection.dbapi_connection.cursor()
+            counter.execute(f"SELECT COUNT(*) FROM ({statement}) AS counted", parameters)
+            self.rows += counter.fetchone()[0]
+            counter.close()
+
+    def reset(self, count_rows: bool):
+        self.statements = 0
+        self.rows = 0
+        self.count_rows = count_rows
+
+
+def seed(engine, users: int, days: int):
+    """Users with a profile, 3 goals, 6 module progress rows and `days` of wellness"""
+    Base.metadata.create_all(engine)
+    start = date(2026, 1, 1)
+    with Session(engine) as session:
+        for u in range(users):
+            user = User(id=f"00000000-0000-0000-0000-{u:012d}", email=f"user{u}@example.com")
+            user.profile = UserProfile(bio="benchmark")
+            user.wellness_goals = [WellnessGoal(goal_type="sleep", specific_goal=f"goal {g}") for g in range(3)]
+            user.module_progress = [ModuleProgress(module_name=m, progress_percentage=50) for m in MODULES]
+            user.entries = [
+                UserEntry(module_name=m, topic_name="intro", entry_type="journal", content={"text": "..."})
+                for m in MODULES
+            ]
+            user.wellness_entries = [
+                WellnessEntry(date=start + timedelta(days=d), sleep_hours=7.5, mood_score=6, energy_level=6)
+                for d in range(days)
+            ]
+            session.add(user)
+        session.commit()
+
+
+def lazy(session: Session, user_ids: list, limit: int):
+    """Default lazy loading: one query per relationship per user"""
+    users = session.scalars(select(User).where(User.id.in_(user_ids))).all()
+    for user in users:
+        user.profile, user.wellness_goals, user.module_progress
+        user.wellness_entries[:limit]
+    return users
+
+
+def joined(session: Session, user_ids: list, limit: int):
+    """joinedload on every collection: one query, rows = product of collection sizes"""
+    users = session.scalars(
+        select(User).options(
+            joinedload(User.profile),
+            joinedload(User.wellness_goals),
+            joinedload(User.module_progress),
+            joinedload(User.wellness_entries)
+        ).where(User.id.in_(user_ids))
+    ).unique().all()
+    for user in users:
+        user.wellness_entries[:limit]
+    return users
+
+
+def query_builder(session: Session, user_ids: list, limit: int):
+    """QueryBuilder.get_users_with_relations"""
+    return QueryBuilder(session).get_users_with_relations(user_ids, limit)
+
+
+def run(engine, counter: RoundTrips, strategy, user_ids: list, limit: int, rounds: int) -> dict:
+    """Round trips and rows for one call, mean time over `rounds` calls"""
+    counter.reset(count_rows=True)
+    with Session(engine) as session:
+        strategy(session, user_ids, limit)
+    statements, rows = counter.statements, counter.rows
+
+    counter.reset(count_rows=False)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        with Session(engine) as session:
+            strategy(session, user_ids, limit)
+    elapsed_ms = (time.perf_counter() - start) / rounds * 1000
+
+    return {"round_trips": statements, "rows": rows, "ms": elapsed_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=None, help="Database URL (default: in-memory SQLite)")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--limit", type=int, default=30, help="Recent wellness entries per user")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.url:
+        engine = create_engine(args.url)
+    else:
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    seed(engine, args.users, args.days)
+    counter = RoundTrips(engine)
+
+    all_ids = [f"00000000-0000-0000-0000-{u:012d}" for u in range(args.users)]
+    cases = {"1 user": all_ids[:1], f"{args.users} users": all_ids}
+    strategies = {"lazy (N+1)": lazy, "joinedload": joined, "QueryBuilder": query_builder}
+
+    for case, user_ids in cases.items():
+        print(f"\n{case}, last {args.limit} of {args.days} wellness days")
+        print(f"{'strategy':<15}{'round trips':>13}{'rows':>10}{'ms/call':>10}")
+        for name, strategy in strategies.items():
+            result = run(engine, counter, strategy, user_ids, args.limit, args.rounds)
+            print(f"{name:<15}{result['round_trips']:>13}{result['rows']:>10}{result['ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark the rate limit store with many distinct clients.
+
+Compares the GCRA store in middleware/rate_limiter.py against the list of
+timestamps per key it replaced: time per check, memory held by the store
+and the time of one cleanup sweep over every key.
+
+Usage (from apps/api):
+    python scripts/benchmark_rate_limiter.py [--clients 100000] [--requests 10] [--limit 100]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from middleware.rate_limiter import RateLimitStore
+
+WINDOW = 60
+
+
+class SlidingLogStore:
+    """The previous store: every request timestamp in the window, per key"""
+
+    def __init__(self):
+        self._store = defaultdict(list)
+
+    def check_rate_limit(self, identifier: str, endpoint: str, max_requests: int, window_seconds: int) -> dict:
+        key = f"{identifier}:{endpoint}"
+        now = time.time()
+        window_start = now - window_seconds
+        recent_requests = [t for t in self._store[key] if t >= window_start]
+        if len(recent_requests) >= max_requests:
+            return {"allowed": False}
+        recent_requests.append(now)
+        self._store[key] = recent_requests
+        return {"allowed": True, "remaining": max_requests - len(recent_requests)}
+
+    def cleanup(self, now: float = None):
+        before_time = (time.time() if now is None else now) - WINDOW
+        for key in list(self._store.keys()):
+            self._store[key] = [t for t in self._store[key] if t >= before_time]
+            if not self._store[key]:
+                del self._store[key]
+
+
+def run(store, clients: list, requests: int, limit: int) -> float:
+    """Each client sends `requests` requests, round robin; returns seconds"""
+    start = time.perf_counter()
+    for _ in range(requests):
+        for client in clients:
+            store.check_rate_limit(client, "default", limit, WINDOW)
+    return time.perf_counter() - start
+
+
+def bench(factory, clients: list, requests: int, limit: int) -> dict:
+    elapsed = run(factory(), clients, requests, limit)
+
+    # Memory is measured on a second run; tracemalloc skews timings
+    tracemalloc.start()
+    store = factory()
+    run(store, clients, requests, limit)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Sweep as if every window had passed, so every key is visited and dropped
+    start = time.perf_counter()
+    store.cleanup(time.time() + 2 * WINDOW)
+    sweep = time.perf_counter() - start
+
+    return {
+        "check_us": elapsed / (requests * len(clients)) * 1e6,
+        "mb": memory / 1024 / 1024,
+        "sweep_ms": sweep * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=10, help="requests per client")
+    parser.add_argument("--limit", type=int, default=100, help="requests per minute")
+    args = parser.parse_args()
+
+    clients = [f"ip:10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}" for n in range(args.clients)]
+    stores = {"sliding log": SlidingLogStore, "gcra": lambda: RateLimitStore(cleanup_interval=float("inf"))}
+
+    print(f"{args.clients} clients x {args.requests} requests, limit {args.limit}/{WINDOW}s")
+    print(f"{'store':<14}{'check µs':>10}{'store MB':>10}{'sweep ms':>10}")
+    for name, factory in stores.items():
+        result = bench(factory, clients, args.requests, args.limit)
+        print(f"{name:<14}{result['check_us']:>10.2f}{result['mb']:>10.1f}{result['sweep_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
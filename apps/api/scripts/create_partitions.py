@@ -0,0 +1,55 @@
+"""
+Create upcoming monthly partitions for the time-partitioned tables.
+
+Calls create_monthly_partitions() (supabase/migrations/002) for every
+partitioned table so the next few months always exist before rows arrive;
+rows with no matching partition land in the <table>_default partition,
+which then blocks creating that month. Idempotent: run it daily from cron.
+
+Usage (from apps/api):
+    DATABASE_URL=postgresql://... python scripts/create_partitions.py [--months-ahead 3]
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, text
+
+from database.optimized import SYNC_DATABASE_URL
+
+PARTITIONED_TABLES = ["emotions_journal", "ai_messages"]
+
+
+def create_partitions(connection, months_ahead: int) -> dict:
+    """Partitions created per table, from this month through months_ahead"""
+    created = {}
+    for table in PARTITIONED_TABLES:
+        created[table] = connection.execute(
+            text("SELECT create_monthly_partitions(:parent, :first_month, :months)"),
+            {"parent": table, "first_month": date.today().replace(day=1), "months": months_ahead + 1}
+        ).scalar()
+
+        stray = connection.execute(text(f"SELECT count(*) FROM {table}_default")).scalar()
+        if stray:
+            print(f"⚠️ {table}_default holds {stray} rows outside the monthly partitions")
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=SYNC_DATABASE_URL)
+    parser.add_argument("--months-ahead", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    with engine.begin() as connection:
+        created = create_partitions(connection, args.months_ahead)
+    for table, count in created.items():
+        print(f"✅ {table}: {count} partition(s) created")
+
+
+if __name__ == "__main__":
+    main()
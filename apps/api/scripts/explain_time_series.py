@@ -0,0 +1,176 @@
+"""
+Capture before/after EXPLAIN ANALYZE plans for the time-series migration.
+
+On a scratch PostgreSQL database: applies 001_initial_schema.sql, seeds a
+synthetic dataset (10M rows by default, split across wellness_tracker,
+emotions_journal, stress_log and ai_messages, in time order like real
+appends), captures plans for the dashboard/summary queries, applies
+002_time_series_performance.sql and captures them again.
+
+--reset DROPS THE public SCHEMA. Only point this at a scratch database.
+
+Usage (from apps/api):
+    python scripts/explain_time_series.py --url postgresql://localhost/scratch --reset \
+        [--rows 10000000] [--users 10000] [--out ../../supabase/explain]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, text
+
+MIGRATIONS = Path(__file__).resolve().parents[3] / "supabase" / "migrations"
+
+# Share of --rows per table
+ROW_SHARES = {"wellness_tracker": 0.2, "emotions_journal": 0.3, "stress_log": 0.1, "ai_messages": 0.4}
+HISTORY_DAYS = 730
+
+# Supabase provides auth.uid(); a plain Postgres needs a stand-in for the RLS policies
+AUTH_STUB = """
+CREATE SCHEMA IF NOT EXISTS auth;
+CREATE OR REPLACE FUNCTION auth.uid() RETURNS UUID AS $$ SELECT NULL::uuid $$ LANGUAGE sql STABLE;
+"""
+
+SAMPLE_USER = "md5('42')::uuid"
+SAMPLE_CONVERSATION = "md5('c42')::uuid"
+
+QUERIES = {
+    "wellness_30_day_summary": f"""
+        SELECT avg(sleep_hours), avg(mood_score), avg(energy_level), sum(exercise_minutes), count(*)
+        FROM wellness_tracker
+        WHERE user_id = {SAMPLE_USER} AND date >= current_date - 30
+    """,
+    "wellness_streak_dates": f"""
+        SELECT date FROM wellness_tracker
+        WHERE user_id = {SAMPLE_USER}
+        ORDER BY date DESC LIMIT 100
+    """,
+    "recent_emotions": f"""
+        SELECT emotion_name, intensity, created_at FROM emotions_journal
+        WHERE user_id = {SAMPLE_USER} AND created_at >= now() - interval '30 days'
+        ORDER BY created_at DESC LIMIT 50
+    """,
+    "emotions_daily_counts_7_days": """
+        SELECT date_trunc('day', created_at) AS day, count(*) FROM emotions_journal
+        WHERE created_at >= now() - interval '7 days'
+        GROUP BY 1 ORDER BY 1
+    """,
+    "stress_high_intensity_90_days": f"""
+        SELECT created_at FROM stress_log
+        WHERE user_id = {SAMPLE_USER} AND intensity >= 7 AND created_at >= now() - interval '90 days'
+        ORDER BY created_at DESC
+    """,
+    "conversation_transcript": f"""
+        SELECT role, tokens_used, created_at FROM ai_messages
+        WHERE conversation_id = {SAMPLE_CONVERSATION}
+        ORDER BY created_at
+    """,
+    "tokens_last_month": """
+        SELECT sum(tokens_used) FROM ai_messages
+        WHERE created_at >= date_trunc('month', now()) - interval '1 month'
+          AND created_at < date_trunc('month', now())
+    """,
+}
+
+
+def seed_statements(rows: int, users: int) -> list:
+    """INSERT ... SELECT generate_series statements for the synthetic dataset"""
+    counts = {table: int(rows * share) for table, share in ROW_SHARES.items()}
+    days = max(1, min(HISTORY_DAYS, counts["wellness_tracker"] // users))
+    conversations = users * 5
+    # Row i of n gets a timestamp i/n of the way through the history window
+    spread = f"now() - interval '{HISTORY_DAYS} days' + (i::float8 / %d) * interval '{HISTORY_DAYS} days'"
+
+    return [
+        f"""INSERT INTO users (id, email)
+            SELECT md5(u::text)::uuid, 'user' || u || '@example.com' FROM generate_series(1, {users}) u""",
+        f"""INSERT INTO wellness_tracker
+                (user_id, date, sleep_hours, water_intake_ml, exercise_minutes, meditation_minutes,
+                 mood_score, energy_level, created_at)
+            SELECT md5(u::text)::uuid, current_date - d, 5 + random() * 4, (1000 + random() * 2500)::int,
+                   (random() * 90)::int, (random() * 30)::int, 1 + random() * 8.9, 1 + random() * 8.9,
+                   (current_date - d) + interval '20 hours'
+            FROM generate_series({days - 1}, 0, -1) d, generate_series(1, {users}) u""",
+        f"""INSERT INTO emotions_journal (user_id, emotion_name, intensity, created_at)
+            SELECT md5((1 + i % {users})::text)::uuid,
+                   (ARRAY['joy', 'calm', 'anxiety', 'anger', 'sadness'])[1 + i % 5],
+                   1 + random() * 8.9, {spread % counts['emotions_journal']}
+            FROM generate_series(1, {counts['emotions_journal']}) i""",
+        f"""INSERT INTO stress_log (user_id, stress_source, intensity, duration_minutes, effectiveness_rating, created_at)
+            SELECT md5((1 + i % {users})::text)::uuid, 'work', 1 + random() * 8.9, (random() * 120)::int,
+                   1 + random() * 8.9, {spread % counts['stress_log']}
+            FROM generate_series(1, {counts['stress_log']}) i""",
+        f"""INSERT INTO ai_conversations (id, user_id, module_name, message_count)
+            SELECT md5('c' || c)::uuid, md5((1 + c % {users})::text)::uuid, 'wellness', 0
+            FROM generate_series(1, {conversations}) c""",
+        f"""INSERT INTO ai_messages (conversation_id, role, content, tokens_used, created_at)
+            SELECT md5('c' || (1 + i % {conversations}))::uuid,
+                   CASE WHEN i % 2 = 0 THEN 'user' ELSE 'assistant' END,
+                   'message ' || i, (20 + random() * 400)::int, {spread % counts['ai_messages']}
+            FROM generate_series(1, {counts['ai_messages']}) i""",
+    ]
+
+
+def vacuum_analyze(engine):
+    """VACUUM ANALYZE (outside a transaction; sets the visibility map for index-only scans)"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("VACUUM ANALYZE")
+
+
+def capture(engine, label: str, out: Path):
+    """EXPLAIN (ANALYZE, BUFFERS) every query into out/<label>.txt"""
+    out.mkdir(parents=True, exist_ok=True)
+    sections = []
+    with engine.connect() as connection:
+        for name, sql in QUERIES.items():
+            connection.execute(text(sql)).all()  # warm the cache so both runs compare like with like
+            plan = connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")).scalars().all()
+            sections.append(f"-- {name}\n{' '.join(sql.split())}\n\n" + "\n".join(plan) + "\n")
+            print(f"  {name}: {plan[-1].strip()}")
+    path = out / f"{label}.txt"
+    path.write_text("\n".join(sections))
+    print(f"📄 {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", required=True, help="Scratch PostgreSQL database URL")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate the public schema first")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--out", type=Path, default=MIGRATIONS.parent / "explain")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    with engine.begin() as connection:
+        if args.reset:
+            connection.exec_driver_sql("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+        connection.exec_driver_sql(AUTH_STUB)
+        connection.exec_driver_sql((MIGRATIONS / "001_initial_schema.sql").read_text())
+
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        for statement in seed_statements(args.rows, args.users):
+            connection.exec_driver_sql(statement)
+    print(f"🌱 Seeded ~{args.rows:,} rows in {time.perf_counter() - start:.0f}s")
+    vacuum_analyze(engine)
+
+    print("Before:")
+    capture(engine, "before", args.out)
+
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        connection.exec_driver_sql((MIGRATIONS / "002_time_series_performance.sql").read_text())
+    print(f"🔧 Applied 002 in {time.perf_counter() - start:.0f}s")
+    vacuum_analyze(engine)
+
+    print("After:")
+    capture(engine, "after", args.out)
+
+
+if __name__ == "__main__":
+    main()
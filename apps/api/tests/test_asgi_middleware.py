@@ -0,0 +1,115 @@
+"""
+Tests for the pure-ASGI middleware stack (middleware/*)
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from apps.api.middleware import audit, performance_middleware, rate_limiter
+from apps.api.middleware.audit import AuditMiddleware
+from apps.api.middleware.error_handler import ErrorHandlingMiddleware
+from apps.api.middleware.performance_middleware import PerformanceMiddleware
+from apps.api.middleware.rate_limiter import RateLimitMiddleware
+from apps.api.middleware.security import SecurityHeadersMiddleware
+from apps.api.middleware.validation import ValidationMiddleware
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    # Same order as main.py: the last added runs first
+    app.add_middleware(ErrorHandlingMiddleware)
+    app.add_middleware(ValidationMiddleware)
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(AuditMiddleware)
+    app.add_middleware(PerformanceMiddleware)
+
+    @app.get("/api/v1/items")
+    async def items():
+        return {"items": []}
+
+    @app.get("/api/v1/stream")
+    async def stream():
+        return StreamingResponse(iter([b"a", b"b", b"c"]), media_type="text/plain")
+
+    @app.get("/api/v1/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    @app.post("/api/v1/progress")
+    async def progress():
+        return {"ok": True}
+
+    rate_limiter.reset_rate_limits()
+    performance_middleware.reset_metrics()
+    audit._audit_log.clear()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestHeaders:
+    """Test response headers set on the start message"""
+
+    def test_security_and_rate_limit_headers(self, client):
+        response = client.get("/api/v1/items")
+        assert response.status_code == 200
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert response.headers["x-ratelimit-limit"] == "100"
+        assert response.headers["x-ratelimit-remaining"] == "99"
+        assert "server" not in response.headers
+
+    def test_streaming_body_passes_through(self, client):
+        response = client.get("/api/v1/stream")
+        assert response.text == "abc"
+        assert response.headers["x-frame-options"]
+
+
+class TestShortCircuits:
+    """Test responses produced by the middleware itself"""
+
+    def test_rate_limit_rejects_with_headers(self, client, monkeypatch):
+        monkeypatch.setitem(rate_limiter._config.LIMITS, "default", {"requests": 2, "window": 60})
+        statuses = [client.get("/api/v1/items").status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        response = client.get("/api/v1/items")
+        assert response.headers["x-ratelimit-remaining"] == "0"
+        assert int(response.headers["retry-after"]) > 0
+
+    def test_blocked_pattern_is_a_400_with_security_headers(self, client):
+        response = client.get("/api/v1/items/1%27--")
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Invalid request pattern detected"}
+        assert response.headers["x-content-type-options"] == "nosniff"
+
+    @pytest.mark.parametrize("path", ["/api/v1/performance/metrics", "/api/v1/errors/recent", "/api/v1/sensory/colors"])
+    def test_paths_containing_or_are_allowed(self, path):
+        assert ValidationMiddleware().blocked.search(path) is None
+
+    @pytest.mark.parametrize("path", ["/api/v1/items/x'or", "/api/v1/items/x%27OR", "/api/v1/items/a%27%6Fr"])
+    def test_quote_then_or_is_blocked(self, path):
+        assert ValidationMiddleware().blocked.search(path) is not None
+
+    def test_unhandled_error_is_a_json_500(self, client):
+        response = client.get("/api/v1/boom")
+        assert response.status_code == 500
+        assert response.json()["error"]["code"] == "INTERNAL_ERROR"
+
+
+class TestRecording:
+    """Test status capture for audit and performance metrics"""
+
+    def test_audit_and_metrics_see_the_status(self, client):
+        client.post("/api/v1/progress")
+        client.get("/api/v1/boom")
+        events = audit._audit_log.get_events()
+        assert [e["outcome"] for e in events] == ["success"]
+
+        metrics = performance_middleware.get_metrics()
+        assert metrics["total_requests"] == 2
+        assert metrics["errors"] == {"/api/v1/boom": 1}
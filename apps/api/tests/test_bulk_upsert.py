@@ -0,0 +1,135 @@
+"""
+Tests for the bulk write path (database/optimized.py) and /wellness/sync
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from apps.api.database.models import Base, User, WellnessEntry
+from apps.api.database.optimized import AsyncQueryBuilder, bulk_upsert, copy_csv
+from apps.api.routes import wellness
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+START = date(2026, 3, 1)
+
+
+def days(count: int, mood: float = 5, offset: int = 0) -> list:
+    return [
+        {"user_id": USER_ID, "date": START + timedelta(days=offset + d), "mood_score": mood, "sleep_hours": 7.0}
+        for d in range(count)
+    ]
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert().values(id=USER_ID, email="sync@example.com"))
+    return engine
+
+
+def moods(conn) -> list:
+    return conn.execute(select(WellnessEntry.mood_score).order_by(WellnessEntry.date)).scalars().all()
+
+
+class TestBulkUpsert:
+    """Test chunked upserts on the executemany path"""
+
+    def test_chunks_report_progress(self, engine):
+        progress = []
+        with engine.begin() as conn:
+            result = bulk_upsert(
+                conn, WellnessEntry, days(25), conflict_columns=["user_id", "date"],
+                chunk_size=10, on_chunk=lambda done, total: progress.append((done, total))
+            )
+            assert len(moods(conn)) == 25
+        assert result["method"] == "executemany"
+        assert result["chunks"] == 3
+        assert progress == [(10, 25), (20, 25), (25, 25)]
+
+    def test_conflicts_update_in_place(self, engine):
+        with engine.begin() as conn:
+            bulk_upsert(conn, WellnessEntry, days(5, mood=3), conflict_columns=["user_id", "date"])
+            bulk_upsert(conn, WellnessEntry, days(5, mood=8, offset=3), conflict_columns=["user_id", "date"])
+            assert moods(conn) == [3, 3, 3, 8, 8, 8, 8, 8]
+
+    def test_do_nothing_and_duplicate_keys(self, engine):
+        with engine.begin() as conn:
+            bulk_upsert(conn, WellnessEntry, days(2, mood=1), conflict_columns=["user_id", "date"])
+            rows = days(3, mood=9) + days(1, mood=4, offset=2)
+            result = bulk_upsert(conn, WellnessEntry, rows, conflict_columns=["user_id", "date"], update_columns=[])
+            assert result["rows"] == 3
+            assert moods(conn) == [1, 1, 4]
+
+    def test_returning(self, engine):
+        with engine.begin() as conn:
+            result = bulk_upsert(
+                conn, WellnessEntry, days(4), conflict_columns=["user_id", "date"],
+                returning=["id", "date"], chunk_size=3
+            )
+        assert [row["date"] for row in result["returned"]] == [START + timedelta(days=d) for d in range(4)]
+        assert all(row["id"] for row in result["returned"])
+
+    def test_copy_requires_postgres(self, engine):
+        with engine.begin() as conn:
+            with pytest.raises(ValueError):
+                bulk_upsert(conn, WellnessEntry, days(1), method="copy")
+
+    def test_empty_input(self, engine):
+        with engine.begin() as conn:
+            assert bulk_upsert(conn, WellnessEntry, [])["rows"] == 0
+
+    def test_copy_csv_format(self):
+        rows = [{"a": None, "b": "", "c": 'say "hi", ok', "d": True, "e": 1.5, "f": date(2026, 1, 2), "g": {"k": 1}}]
+        assert copy_csv(rows, list("abcdefg")) == ',"","say ""hi"", ok",t,1.5,2026-01-02,"{""k"": 1}"\n'
+
+
+class TestWellnessSync:
+    """Test the offline history sync route"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'sync.db'}")
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def session():
+            async with sessions() as s:
+                yield s
+
+        app = FastAPI()
+        app.include_router(wellness.router)
+        app.dependency_overrides[wellness.get_batch_session] = session
+        with TestClient(app) as client:
+            client.portal.call(self._create_schema, engine)
+            yield client, engine
+
+    @staticmethod
+    async def _create_schema(engine):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    def test_sync_upserts_history(self, client):
+        client, engine = client
+        entries = [{"date": (START + timedelta(days=d)).isoformat(), "mood_score": 6} for d in range(40)]
+        response = client.post(f"/api/v1/wellness/sync?user_id={USER_ID}", json={"entries": entries})
+        assert response.status_code == 200
+        assert response.json()["entries"] == 40
+
+        entries[0]["mood_score"] = 9
+        assert client.post(f"/api/v1/wellness/sync?user_id={USER_ID}", json={"entries": entries[:1]}).status_code == 200
+
+        async def stored():
+            async with engine.connect() as conn:
+                return await conn.run_sync(moods)
+        values = client.portal.call(stored)
+        assert len(values) == 40 and values[0] == 9
+
+    def test_sync_rejects_bad_dates(self, client):
+        client, _ = client
+        response = client.post("/api/v1/wellness/sync", json={"entries": [{"date": "yesterday"}]})
+        assert response.status_code == 422
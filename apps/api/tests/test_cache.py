@@ -0,0 +1,674 @@
+"""
+Tests for the Redis cache layer and its in-memory fallback
+"""
+
+import pytest
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from apps.api.cache import redis_cache
+from apps.api.cache.redis_cache import (
+    AsyncRedisCache,
+    CacheManager,
+    MemoryCache,
+    cached,
+    cache_key_hash,
+    cache_tag,
+    _batches,
+)
+from apps.api.cache.serialization import Serializer, TAG_MARKER
+
+# Nothing listens on port 1, so Redis is always "down" in these tests
+UNREACHABLE_REDIS = "redis://127.0.0.1:1/0"
+
+
+@pytest.fixture
+def manager():
+    return CacheManager(url=UNREACHABLE_REDIS)
+
+
+class TestAsyncRedisCache:
+    """Test the asyncio Redis client when the server is unreachable"""
+
+    @pytest.mark.asyncio
+    async def test_connect_fails_gracefully(self):
+        client = AsyncRedisCache(url=UNREACHABLE_REDIS)
+        assert await client.connect() is False
+        assert client.is_connected() is False
+
+    @pytest.mark.asyncio
+    async def test_no_reconnect_before_retry_interval(self):
+        client = AsyncRedisCache(url=UNREACHABLE_REDIS)
+        await client.connect()
+        # Within the retry window operations short-circuit without a round trip
+        assert await client._ensure_connected() is False
+        assert await client.get("key") is None
+        assert await client.mget(["a", "b"]) == {}
+
+
+class TestCacheManagerFallback:
+    """Test CacheManager's awaitable API on the memory fallback"""
+
+    @pytest.mark.asyncio
+    async def test_set_and_get(self, manager):
+        assert await manager.set("user:1", {"name": "Ada"}, ttl=60)
+        assert await manager.get("user:1") == {"name": "Ada"}
+
+    @pytest.mark.asyncio
+    async def test_delete(self, manager):
+        await manager.set("user:1", "value", ttl=60)
+        await manager.delete("user:1")
+        assert await manager.get("user:1") is None
+
+    @pytest.mark.asyncio
+    async def test_mset_and_mget(self, manager):
+        await manager.mset({"a": 1, "b": 2}, ttl=60)
+        assert await manager.mget(["a", "b", "c"]) == {"a": 1, "b": 2}
+
+    @pytest.mark.asyncio
+    async def test_invalidate_prefix(self, manager):
+        await manager.mset({"module:1": 1, "module:2": 2, "quote:1": 3}, ttl=60)
+        assert await manager.invalidate_prefix("module:") == 2
+        assert await manager.get("quote:1") == 3
+
+    @pytest.mark.asyncio
+    async def test_stats(self, manager):
+        stats = await manager.stats()
+        assert stats["redis"]["connected"] is False
+        assert stats["memory"]["type"] == "memory"
+
+    def test_sync_shim_shares_memory_tier(self, manager):
+        manager.sync.set("shared", "value", ttl=60)
+        assert manager.memory.get("shared") == "value"
+        assert manager.sync.get("shared") == "value"
+
+
+class TestMemoryCache:
+    """Test the bounded LRU/TTL memory tier"""
+
+    def test_entry_expires_after_ttl(self, monkeypatch):
+        cache = MemoryCache()
+        now = time.monotonic()
+        cache.set("key", "value", ttl=10)
+        monkeypatch.setattr(time, "monotonic", lambda: now + 5)
+        assert cache.get("key") == "value"
+        monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+        assert cache.get("key") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_lru_eviction_by_entry_count(self):
+        cache = MemoryCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3, ttl=60)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_byte_budget(self):
+        cache = MemoryCache(max_bytes=100)
+        cache.set("a", "x" * 40, ttl=60)
+        cache.set("b", "y" * 40, ttl=60)
+        cache.set("c", "z" * 40, ttl=60)
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] <= 100
+
+    def test_oversized_value_is_rejected(self):
+        cache = MemoryCache(max_bytes=10)
+        assert cache.set("big", "x" * 100, ttl=60) is False
+        assert cache.stats()["keys"] == 0
+
+    def test_sweep_removes_only_expired(self, monkeypatch):
+        cache = MemoryCache()
+        now = time.monotonic()
+        cache.set("short", 1, ttl=5)
+        cache.set("long", 2, ttl=500)
+        cache.set("short", 1, ttl=50)  # overwrite leaves a stale heap record
+        monkeypatch.setattr(time, "monotonic", lambda: now + 60)
+        assert cache.sweep() == 1
+        assert cache.exists("long")
+        assert not cache.exists("short")
+
+    def test_hit_miss_counters(self):
+        cache = MemoryCache()
+        cache.set("a", 1, ttl=60)
+        cache.get("a")
+        cache.get("missing")
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 50.0
+
+
+class TestNearCache:
+    """Test the L1 near cache and cross-worker invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_near_cache_serves_hot_keys(self, manager):
+        manager._fill_near("module:all", {"modules": 9})
+        assert await manager.get("module:all") == {"modules": 9}
+        assert manager.near.stats()["hits"] == 1
+
+    def test_near_ttl_is_capped(self, manager, monkeypatch):
+        now = time.monotonic()
+        manager._fill_near("taxonomy", ["joy"], ttl=604800)
+        monkeypatch.setattr(time, "monotonic", lambda: now + 3600)
+        assert manager.near.get("taxonomy") is None
+
+    @pytest.mark.asyncio
+    async def test_near_copy_expires_with_the_redis_entry(self, manager, monkeypatch):
+        fakeredis = pytest.importorskip("fakeredis")
+        manager.redis._client = fakeredis.aioredis.FakeRedis()
+        manager.redis._connected = True
+        await manager.redis._client.set("quote:a", manager.serializer.dumps("a"), px=2000)
+        await manager.redis._client.set("quote:b", manager.serializer.dumps("b"), px=2000)
+        await manager.redis._client.set("quote:c", manager.serializer.dumps("c"))
+
+        assert await manager.get("quote:a") == "a"
+        assert await manager.mget(["quote:b", "quote:c"]) == {"quote:b": "b", "quote:c": "c"}
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 5)
+        assert manager.near.get("quote:a") is None
+        assert manager.near.get("quote:b") is None
+        assert manager.near.get("quote:c") == "c"  # no expiry in Redis: NEAR_CACHE_TTL
+
+    def test_invalidation_from_other_worker(self, manager):
+        manager._fill_near("module:1", 1)
+        manager._fill_near("module:2", 2)
+        manager._fill_near("quote", 3)
+        manager.apply_invalidation({"origin": "other", "op": "keys", "targets": ["module:1"]})
+        assert manager.near.get("module:1") is None
+        manager.apply_invalidation({"origin": "other", "op": "pattern", "targets": ["module:*"]})
+        assert manager.near.get("module:2") is None
+        assert manager.near.get("quote") == 3
+        manager.apply_invalidation({"origin": "other", "op": "clear", "targets": []})
+        assert manager.near.get("quote") is None
+
+    def test_own_invalidations_are_ignored(self, manager):
+        manager._fill_near("key", "value")
+        manager.apply_invalidation({"origin": manager.worker_id, "op": "clear", "targets": []})
+        assert manager.near.get("key") == "value"
+
+    @pytest.mark.asyncio
+    async def test_fallback_write_drops_stale_near_copy(self, manager):
+        manager._fill_near("key", "old")
+        await manager.set("key", "new", ttl=60)
+        assert await manager.get("key") == "new"
+
+    @pytest.mark.asyncio
+    async def test_lifecycle_without_redis(self, manager):
+        assert await manager.connect() is False
+        assert (await manager.stats())["near"]["subscribed"] is True
+        await manager.close()
+        assert manager._listener is None
+
+
+class TestKeyspaceHelpers:
+    """Test namespace tags and batching used by SCAN-based operations"""
+
+    def test_cache_tag_uses_namespace(self):
+        assert cache_tag("module:all") == "__tagidx__:module"
+        assert cache_tag("module:user:1") == "__tagidx__:module"
+        assert cache_tag("daily_quote") == "__tagidx__:daily_quote"
+
+    def test_batches(self):
+        assert list(_batches(range(5), size=2)) == [[0, 1], [2, 3], [4]]
+        assert list(_batches([], size=2)) == []
+
+    @pytest.mark.asyncio
+    async def test_index_holds_only_live_keys(self, monkeypatch):
+        fakeredis = pytest.importorskip("fakeredis")
+        client = AsyncRedisCache()
+        client._client = fakeredis.aioredis.FakeRedis()
+        client._connected = True
+        clock = time.time()
+        monkeypatch.setattr(redis_cache.time, "time", lambda: clock)
+
+        await client.set("module:all", 1, ttl=60)
+        await client.set("module:user:1", 2, ttl=600)
+        await client.set("module:user:2", 3, ttl=600)
+        await client.delete("module:user:2")
+        assert await client._client.zcard(cache_tag("module:all")) == 2
+
+        # Entries past their TTL are trimmed by the next write to the namespace
+        clock += 120
+        await client.set("module:user:3", 4, ttl=600)
+        members = await client._client.zrange(cache_tag("module:all"), 0, -1)
+        assert sorted(members) == [b"module:user:1", b"module:user:3"]
+
+        # A prefix without ":" goes through the namespaces that start with it
+        await client.set("modules_data:x", 5)
+        await client.set("quote:today", 6)
+        assert await client.delete_prefix("mod") == 3
+        assert await client.get("quote:today") == 6
+        assert await client._client.zcard(cache_tag("module:all")) == 0
+
+
+class TestSerializer:
+    """Test the tagged cache codec layer"""
+
+    def test_round_trip_with_datetimes(self):
+        serializer = Serializer()
+        value = {"at": datetime(2026, 1, 1, 9, 30), "scores": [1, 2.5]}
+        assert serializer.loads(serializer.dumps(value)) == {
+            "at": "2026-01-01T09:30:00",
+            "scores": [1, 2.5],
+        }
+
+    def test_large_payloads_are_compressed(self):
+        serializer = Serializer(compression="zlib", min_compress_bytes=100)
+        small = serializer.dumps({"a": 1})
+        large = serializer.dumps({"text": "wellness " * 500})
+        assert small[0] == serializer._plain_tag[0]
+        assert large[0] == serializer._compressed_tag[0]
+        assert len(large) < 4500
+        assert serializer.loads(large) == {"text": "wellness " * 500}
+
+    def test_reads_any_tagged_format(self):
+        writer = Serializer(codec="json", compression="zlib", min_compress_bytes=0)
+        reader = Serializer()
+        assert reader.loads(writer.dumps({"x": [1, 2, 3]})) == {"x": [1, 2, 3]}
+
+    def test_reads_legacy_untagged_json(self):
+        assert Serializer().loads(b'{"legacy": true}') == {"legacy": True}
+        assert b'{'[0] < TAG_MARKER
+
+    def test_unknown_codec_rejected(self):
+        with pytest.raises(ValueError):
+            Serializer(codec="pickle")
+
+
+class Quote(BaseModel):
+    text: str
+
+
+class TestCachedDecorator:
+    """Test the @cached decorator"""
+
+    @pytest.fixture(autouse=True)
+    def isolated_manager(self, manager, monkeypatch):
+        monkeypatch.setattr(redis_cache, "cache_manager", manager)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_call(self):
+        calls = 0
+
+        @cached(ttl=60)
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"quote": "hi"}
+
+        results = await asyncio.gather(*[fetch() for _ in range(20)])
+        assert calls == 1
+        assert all(r == {"quote": "hi"} for r in results)
+        assert await fetch() == {"quote": "hi"}
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_waiters(self):
+        calls = 0
+        started = asyncio.Event()
+
+        @cached(ttl=60)
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            started.set()
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(fetch())
+        await started.wait()
+        waiter = asyncio.create_task(fetch())
+        await asyncio.sleep(0.005)
+        first.cancel()
+        assert await waiter == "done"
+        assert first.cancelled()
+        assert calls == 1
+        assert await fetch() == "done"
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_revalidating(self, monkeypatch):
+        calls = 0
+
+        @cached(ttl=10, stale_ttl=60)
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await fetch() == 1
+        real_time = time.time
+        monkeypatch.setattr(time, "time", lambda: real_time() + 15)
+        assert await fetch() == 1  # stale, refresh scheduled
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert calls == 2
+        assert await fetch() == 2
+
+    @pytest.mark.asyncio
+    async def test_pydantic_results_are_revived(self):
+        @cached(ttl=60)
+        async def fetch() -> Quote:
+            return Quote(text="hi")
+
+        await fetch()
+        again = await fetch()
+        assert isinstance(again, Quote)
+        assert again.text == "hi"
+
+    @pytest.mark.asyncio
+    async def test_optional_model_results(self):
+        results = [None, Quote(text="hi")]
+
+        @cached(ttl=60)
+        async def fetch() -> Optional[Quote]:
+            return results.pop(0)
+
+        assert await fetch() is None  # not cached: the next call recomputes
+        assert await fetch() == Quote(text="hi")
+        assert await fetch() == Quote(text="hi")
+        assert results == []
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_are_not_cached(self):
+        calls = 0
+
+        @cached(ttl=60)
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("upstream down")
+
+        with pytest.raises(RuntimeError):
+            await fetch()
+        with pytest.raises(RuntimeError):
+            await fetch()
+        assert calls == 2
+
+    def test_sync_functions_still_cached(self):
+        calls = 0
+
+        @cached(ttl=60)
+        def compute(x):
+            nonlocal calls
+            calls += 1
+            return x * 2
+
+        assert compute(2) == 4
+        assert compute(2) == 4
+        assert compute(3) == 6
+        assert calls == 2
+
+    def test_key_hash_handles_arbitrary_objects(self):
+        assert cache_key_hash({"args": (object,), "kwargs": {}}) == cache_key_hash({"args": (object,), "kwargs": {}})
+
+
+class TestCacheWarming:
+    """Test the WARMING_SCHEDULE engine"""
+
+    @pytest.fixture(autouse=True)
+    def isolated(self, manager, monkeypatch):
+        from apps.api.cache import optimization
+        monkeypatch.setattr(redis_cache, "cache_manager", manager)
+        monkeypatch.setattr(optimization, "WARMERS", {})
+        monkeypatch.setattr(optimization, "_warm_results", {})
+        monkeypatch.setattr(optimization, "_warm_semaphore", None)
+        self.optimization = optimization
+        self.manager = manager
+
+    @pytest.mark.asyncio
+    async def test_warm_populates_cached_producer(self):
+        calls = 0
+
+        @cached(ttl=60)
+        async def build_modules():
+            nonlocal calls
+            calls += 1
+            return {"modules": 9}
+
+        self.optimization.register_warmer("all_modules", build_modules)
+        result = await self.optimization.warm_cache("all_modules", 86400)
+        assert result["warmed"] is True
+        assert 86400 <= result["ttl"] <= 86400 * (1 + self.optimization.WARM_JITTER)
+        assert result["latency_ms"] >= 0
+        # The request path now hits the warmed entry
+        assert await build_modules() == {"modules": 9}
+        assert calls == 1
+
+    def test_warmed_taxonomy_is_served_without_rebuilding(self, monkeypatch):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from apps.api.routes import modules_data
+        from cache import optimization, redis_cache as route_cache
+
+        # The routes import the top-level cache package
+        monkeypatch.setattr(route_cache, "cache_manager", CacheManager(url=UNREACHABLE_REDIS))
+        calls = 0
+        original = modules_data.get_emotional_data
+
+        def counted():
+            nonlocal calls
+            calls += 1
+            return original()
+
+        monkeypatch.setattr(modules_data, "get_emotional_data", counted)
+        app = FastAPI()
+        app.include_router(modules_data.router)
+        client = TestClient(app)
+
+        # Warm on the client's event loop, then read through the route
+        with client:
+            result = client.portal.call(optimization.warm_cache, "emotion_taxonomy", 3600)
+            assert result["warmed"] is True and calls == 1
+            assert client.get("/api/v1/modules/emotional").json() == original()
+            assert client.get("/api/v1/modules/all").json()["emotional"] == original()
+        assert calls == 1
+
+    def test_every_scheduled_key_has_a_producer(self):
+        from apps.api.routes import additional_integrations, integrations, modules_data  # noqa: F401
+        from cache import optimization
+
+        scheduled = {key for entries in optimization.WARMING_SCHEDULE.values() for key, _ in entries}
+        assert scheduled <= set(optimization.WARMERS)
+
+    @pytest.mark.asyncio
+    async def test_unregistered_key_is_reported(self):
+        result = await self.optimization.warm_cache("unknown", 3600)
+        assert result["warmed"] is False
+        assert result["error"] == "no producer registered"
+
+    @pytest.mark.asyncio
+    async def test_slow_startup_warming_finishes_in_background(self, monkeypatch):
+        async def slow():
+            await asyncio.sleep(0.05)
+
+        monkeypatch.setattr(self.optimization, "WARMING_SCHEDULE", {"on_startup": [("slow", 60)]})
+        monkeypatch.setattr(self.optimization, "SCHEDULE_INTERVALS", {})
+        monkeypatch.setattr(self.optimization, "WARM_STARTUP_TIMEOUT", 0.01)
+        monkeypatch.setattr(self.optimization, "_scheduler_tasks", [])
+        self.optimization.register_warmer("slow", slow)
+
+        await self.optimization.start_warming()
+        assert "slow" not in self.optimization._warm_results
+        await asyncio.sleep(0.1)
+        assert self.optimization._warm_results["slow"]["warmed"] is True
+        await self.optimization.stop_warming()
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted(self):
+        async def broken():
+            raise RuntimeError("upstream down")
+
+        self.optimization.register_warmer("daily_quote", broken)
+        await self.optimization.warm_cache("daily_quote", 60)
+        await self.optimization.warm_cache("daily_quote", 60)
+        status = self.optimization._warm_results["daily_quote"]
+        assert status["runs"] == 2
+        assert status["failures"] == 2
+        assert "upstream down" in status["error"]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(self.optimization, "WARM_CONCURRENCY", 2)
+        running = peak = 0
+
+        async def producer():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        schedule = {"hourly": [(f"key{i}", 60) for i in range(6)]}
+        monkeypatch.setattr(self.optimization, "WARMING_SCHEDULE", schedule)
+        for key, _ in schedule["hourly"]:
+            self.optimization.register_warmer(key, producer)
+        result = await self.optimization.warm_group("hourly")
+        assert result["warmed"] == 6
+        assert peak == 2
+
+
+class TestCacheTelemetry:
+    """Test per-namespace counters and the stats/keys endpoints built on them"""
+
+    @pytest.fixture(autouse=True)
+    def isolated(self, manager, monkeypatch):
+        from apps.api.cache import optimization
+        monkeypatch.setattr(optimization, "cache_manager", manager)
+        self.optimization = optimization
+        self.manager = manager
+
+    @pytest.mark.asyncio
+    async def test_hits_and_misses_per_namespace(self):
+        await self.manager.set("quote:today", {"text": "hi"}, ttl=60)
+        await self.manager.get("quote:today")
+        await self.manager.get("quote:tomorrow")
+        await self.manager.mget(["modules:all", "quote:today"])
+
+        namespaces = self.manager.telemetry.snapshot()
+        assert namespaces["quote"]["hits"] == 2
+        assert namespaces["quote"]["misses"] == 1
+        assert namespaces["quote"]["sets"] == 1
+        assert namespaces["quote"]["avg_ttl_seconds"] == 60
+        assert namespaces["quote"]["bytes_written"] > 0
+        assert namespaces["modules"]["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_evictions_and_invalidations_are_counted(self):
+        self.manager.memory.max_entries = 2
+        for i in range(4):
+            await self.manager.set(f"trivia:{i}", i)
+        await self.manager.invalidate_prefix("trivia:")
+
+        trivia = self.manager.telemetry.snapshot()["trivia"]
+        assert trivia["evictions"] == 2
+        assert trivia["invalidations"] == 1
+
+    def test_namespace_cardinality_is_capped(self):
+        telemetry = redis_cache.CacheTelemetry(max_namespaces=2)
+        for name in ("a", "b", "c", "d"):
+            telemetry.miss(f"{name}:key")
+        snapshot = telemetry.snapshot()
+        assert set(snapshot) == {"a", "b", redis_cache.OTHER_NAMESPACE}
+        assert snapshot[redis_cache.OTHER_NAMESPACE]["misses"] == 2
+        assert telemetry.totals()["misses"] == 4
+
+    @pytest.mark.asyncio
+    async def test_stats_endpoint_reports_live_counters(self):
+        await self.manager.set("quote:today", "hi", ttl=120)
+        await self.manager.get("quote:today")
+        await self.manager.get("quote:missing")
+
+        stats = await self.optimization.get_cache_stats()
+        assert stats.backend == "memory"
+        assert (stats.hits, stats.misses) == (1, 1)
+        assert stats.hit_rate == 50.0
+        assert stats.keys_count == 1
+        assert stats.avg_ttl_seconds == 120
+        assert "quote" in stats.namespaces
+
+    @pytest.mark.asyncio
+    async def test_key_sample_has_real_sizes(self):
+        await self.manager.set("quote:today", "x" * 500, ttl=300)
+        keys = await self.optimization.get_cache_keys(limit=10)
+        assert [k.key for k in keys] == ["quote:today"]
+        assert keys[0].pattern == "quote"
+        assert keys[0].size_bytes >= 500
+        assert 0 < keys[0].ttl_seconds <= 300
+
+
+class TestAdaptiveTTL:
+    """Test the adaptive TTL tuner"""
+
+    @pytest.fixture(autouse=True)
+    def isolated(self, manager, monkeypatch):
+        from apps.api.cache import optimization
+        monkeypatch.setattr(redis_cache, "cache_manager", manager)
+        monkeypatch.setattr(redis_cache, "ttl_overrides", {})
+        monkeypatch.setattr(optimization, "ttl_overrides", redis_cache.ttl_overrides)
+        self.tuner = optimization.TTLTuner(
+            config={"module_data": 3600},
+            bounds={"module_data": (600, 14400)},
+            min_reads=10
+        )
+        self.telemetry = manager.telemetry
+
+    def record(self, hits=0, misses=0, sets=0, invalidations=0, compute_ms=0.0, size=1024):
+        for _ in range(hits):
+            self.telemetry.hit("module_data:all")
+        for _ in range(misses):
+            self.telemetry.miss("module_data:all")
+            self.telemetry.computed("module_data:all", compute_ms / 1000)
+        for _ in range(sets):
+            self.telemetry.written("module_data:all", size, 3600)
+        for _ in range(invalidations):
+            self.telemetry.invalidated("module_data:all")
+
+    def test_expensive_misses_lengthen_ttl(self):
+        self.record(hits=30, misses=20, sets=20, compute_ms=50)
+        decisions = self.tuner.tune(self.telemetry)
+        assert [d["new_ttl"] for d in decisions] == [7200]
+        assert redis_cache.ttl_overrides["module_data"] == 7200
+
+    def test_cheap_misses_leave_ttl_alone(self):
+        self.record(hits=30, misses=20, sets=20, compute_ms=0.01, size=100_000)
+        assert self.tuner.tune(self.telemetry) == []
+        assert self.tuner.live["module_data"] == 3600
+
+    def test_unread_entries_shorten_ttl(self):
+        self.record(hits=1, misses=20, sets=20, compute_ms=50)
+        self.tuner.tune(self.telemetry)
+        assert self.tuner.live["module_data"] == 1800
+
+    def test_frequent_invalidation_shortens_ttl_within_bounds(self):
+        self.record(invalidations=1000)
+        self.tuner.tune(self.telemetry)
+        self.tuner.tune(self.telemetry)  # no new invalidations: nothing to learn
+        assert self.tuner.live["module_data"] == 1800
+        assert len(self.tuner.decisions) == 1
+        assert self.tuner.decisions[0]["reason"].startswith("invalidated every")
+
+    def test_ttl_is_clamped_to_bounds(self):
+        for _ in range(4):
+            self.record(hits=30, misses=20, sets=20, compute_ms=50)
+            self.tuner.tune(self.telemetry)
+        assert self.tuner.live["module_data"] == 14400
+
+    @pytest.mark.asyncio
+    async def test_cached_uses_live_ttl(self):
+        @cached(ttl=3600, key_prefix="module_data:all")
+        async def build():
+            return {"modules": 9}
+
+        redis_cache.ttl_overrides["module_data"] = 120
+        await build()
+        entry = await redis_cache.cache_manager.get("module_data:all:" + cache_key_hash({"args": (), "kwargs": {}}))
+        assert entry["exp"] - time.time() <= 120
+        assert build.namespace == "module_data"
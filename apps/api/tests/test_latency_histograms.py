@@ -0,0 +1,94 @@
+"""
+Tests for streaming latency histograms (middleware/performance_middleware.py)
+"""
+
+import math
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from apps.api.middleware import performance_middleware
+from apps.api.middleware.performance_middleware import (
+    OTHER_ROUTE,
+    UNMATCHED_ROUTE,
+    LatencyHistogram,
+    PerformanceMiddleware,
+    get_metrics,
+)
+
+
+class TestLatencyHistogram:
+    """Test percentile accuracy and sliding windows"""
+
+    def test_percentiles_within_bucket_error(self):
+        rng = random.Random(7)
+        samples = [math.exp(rng.uniform(math.log(1e-4), math.log(5.0))) for _ in range(20000)]
+        histogram = LatencyHistogram()
+        for sample in samples:
+            histogram.record(sample, now=0)
+
+        samples.sort()
+        summary = histogram.snapshot()
+        for name, q in performance_middleware.QUANTILES.items():
+            exact = samples[math.ceil(q * len(samples)) - 1]
+            assert summary[name] == pytest.approx(exact, rel=0.02), name
+        assert summary["max"] == samples[-1]
+        assert summary["count"] == len(samples)
+
+    def test_sliding_windows(self):
+        histogram = LatencyHistogram()
+        histogram.record(2.0, now=0)         # an hour-old slow request
+        for second in range(3000, 3600):
+            histogram.record(0.010, now=second)
+
+        assert histogram.snapshot("1m", now=3600)["count"] == 50
+        assert histogram.snapshot("5m", now=3600)["max"] == 0.010
+        assert histogram.snapshot("1h", now=3599)["count"] == 601
+        assert histogram.snapshot("1h", now=3660)["count"] == 600
+        assert histogram.snapshot()["p99"] == pytest.approx(0.010, rel=0.02)
+        assert histogram.snapshot()["max"] == 2.0
+        assert histogram.snapshot("1m", now=10_000) == {"count": 0}
+
+    def test_cumulative_never_counts_above_the_bound(self):
+        histogram = LatencyHistogram()
+        lower, upper = performance_middleware.bucket_bounds(performance_middleware.bucket_index(0.01))
+        assert lower < 0.01 < upper
+        for sample in (0.009, 0.01 + (upper - 0.01) / 2, 0.02, 30.0):
+            histogram.record(sample, now=0)
+        # The sample just above 0.01 shares its bucket, so it waits for the next bound
+        assert histogram.cumulative([0.005, 0.01, 0.025, 10.0]) == [0, 1, 3, 3]
+
+
+class TestRouteTemplates:
+    """Test bounded label cardinality"""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(PerformanceMiddleware)
+
+        @app.get("/api/v1/items/{item_id}")
+        async def item(item_id: str):
+            return {"id": item_id}
+
+        performance_middleware.reset_metrics()
+        return TestClient(app)
+
+    def test_ids_collapse_into_the_template(self, client):
+        for n in range(50):
+            client.get(f"/api/v1/items/{n}")
+        client.get("/api/v1/nope/1")
+        client.get("/api/v1/nope/2")
+
+        metrics = get_metrics()
+        assert metrics["by_endpoint"] == {"/api/v1/items/{item_id}": 50, UNMATCHED_ROUTE: 2}
+        assert metrics["response_times"]["/api/v1/items/{item_id}"]["windows"]["1m"]["count"] == 50
+        assert metrics["errors"] == {UNMATCHED_ROUTE: 2}
+        assert metrics["error_rate"] == pytest.approx(2 / 52)
+
+    def test_route_cap(self, client, monkeypatch):
+        monkeypatch.setattr(performance_middleware, "MAX_ROUTES", 1)
+        client.get("/api/v1/items/1")
+        client.get("/api/v1/nope")
+        assert set(get_metrics()["by_endpoint"]) == {"/api/v1/items/{item_id}", OTHER_ROUTE}
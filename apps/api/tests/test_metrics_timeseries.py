@@ -0,0 +1,131 @@
+"""
+Tests for the metrics time series store and dashboard (performance/timeseries.py, performance/metrics_dashboard.py)
+"""
+
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from middleware import performance_middleware
+from performance import metrics_dashboard
+from performance.timeseries import MetricsSampler, RingSeries, TimeSeriesStore
+
+T0 = 1_800_000_000  # aligned to the hour
+
+
+class TestRingBuffers:
+    """Test downsampling and fixed size"""
+
+    def test_resolutions_downsample_as_written(self):
+        store = TimeSeriesStore()
+        for n in range(30):  # five minutes of 10s samples: 0, 1, ..., 29
+            store.record("latency", n, now=T0 + n * 10)
+
+        resolution, fine = store.query("latency", 3600, now=T0 + 299)
+        assert resolution == 10 and [p["value"] for p in fine] == list(range(30))
+
+        resolution, minutes = store.query("latency", 24 * 3600, now=T0 + 299)
+        assert resolution == 60
+        assert [(p["value"], p["min"], p["max"]) for p in minutes] == [
+            (2.5, 0, 5), (8.5, 6, 11), (14.5, 12, 17), (20.5, 18, 23), (26.5, 24, 29)
+        ]
+
+        resolution, hours = store.query("latency", 48 * 3600, now=T0 + 299)
+        assert resolution == 3600 and hours[0]["value"] == 14.5
+
+    def test_ring_wraps_without_growing(self):
+        ring = RingSeries(10, 6)
+        for n in range(100):
+            ring.add(n, T0 + n * 10)
+        assert len(ring.sums) == 6
+        assert [avg for _, avg, _, _ in ring.points(3600, T0 + 990)] == [94, 95, 96, 97, 98, 99]
+        assert [start for start, _, _, _ in ring.points(30, T0 + 990)] == [T0 + 970, T0 + 980, T0 + 990]
+
+    def test_window(self):
+        store = TimeSeriesStore()
+        store.record("cpu", 10, now=T0)
+        store.record("cpu", 30, now=T0 + 50)
+        assert store.window("cpu", 60, now=T0 + 55) == {"avg": 20, "min": 10, "max": 30}
+        assert store.window("cpu", 60, now=T0 + 3600) is None
+        assert store.window("missing", 60) is None
+        # A window can end in the past; recent slots are left out
+        assert store.window("cpu", 50, now=T0 + 55, end=10) == {"avg": 10, "min": 10, "max": 10}
+
+
+class TestSampler:
+    """Test rates derived from producer counters"""
+
+    def test_rates_from_counters(self):
+        performance_middleware.reset_metrics()
+        sampler = MetricsSampler(TimeSeriesStore())
+        sampler.sample(now=T0)
+        assert sampler.store.latest("requests_per_minute") is None
+
+        histogram = performance_middleware.histogram_for("/api/v1/items/{item_id}")
+        for duration in (0.010, 0.020, 0.030, 0.040, 0.050, 0.060):
+            histogram.record(duration)
+            performance_middleware.metrics["requests_by_method"]["GET"] += 1
+        performance_middleware.metrics["errors"]["/api/v1/items/{item_id}"] += 3
+        sampler.sample(now=T0 + 30)
+
+        store = sampler.store
+        assert store.latest("requests_per_minute") == 12
+        assert store.latest("avg_latency_ms") == pytest.approx(35)
+        assert store.latest("error_rate_percent") == 50
+        assert store.latest("db_connections") is not None
+
+        # A reset is not a negative rate
+        performance_middleware.reset_metrics()
+        sampler.sample(now=T0 + 40)
+        assert store.window("requests_per_minute", 3600, now=T0 + 40)["min"] == 12
+
+
+class TestDashboard:
+    """Test endpoints serve recorded data"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        store = TimeSeriesStore()
+        sampler = MetricsSampler(store)
+        sampler.last_sample = time.time()  # no sampling during the test
+        monkeypatch.setattr(metrics_dashboard, "timeseries_store", store)
+        monkeypatch.setattr(metrics_dashboard, "sampler", sampler)
+
+        app = FastAPI()
+        app.include_router(metrics_dashboard.router)
+        return TestClient(app), store
+
+    def test_widgets_and_timeseries(self, client):
+        client, store = client
+        now = time.time()
+        store.record("avg_latency_ms", 120, now=now - 600)
+        store.record("avg_latency_ms", 650, now=now)
+        store.record("cache_hit_rate", 40, now=now)
+
+        widgets = {w["metric"]: w for w in client.get("/api/v1/metrics/dashboard").json()}
+        assert widgets["avg_latency_ms"]["value"] == 650
+        assert widgets["avg_latency_ms"]["status"] == "critical"
+        assert widgets["avg_latency_ms"]["trend"] == "up"
+        assert widgets["cache_hit_rate"]["status"] == "critical"
+        assert widgets["requests_per_minute"]["status"] == "unknown"
+
+        series = client.get("/api/v1/metrics/timeseries/avg_latency_ms?hours=1").json()
+        assert series["resolution_seconds"] == 10
+        assert [p["value"] for p in series["data"]] == [120, 650]
+
+        summary = {s["metric"]: s for s in client.get("/api/v1/metrics/summary").json()}
+        assert summary["avg_latency_ms"]["max"] == 650 and summary["avg_latency_ms"]["avg"] == 385
+
+    def test_trend_baseline_excludes_last_minute(self, client):
+        _, store = client
+        now = time.time()
+        store.record("cpu_usage_percent", 100, now=now - 300)
+        store.record("cpu_usage_percent", 110, now=now)
+        # Averaging the last minute into the baseline would damp +10% to under 5%
+        assert metrics_dashboard.metric_trend("cpu_usage_percent") == "up"
+
+    def test_unknown_metric(self, client):
+        client, _ = client
+        assert client.get("/api/v1/metrics/timeseries/nope").status_code == 404
+        assert client.get("/api/v1/metrics/timeseries/avg_latency_ms?hours=0").status_code == 422
@@ -0,0 +1,126 @@
+"""
+Tests for the OpenMetrics exposition and multi-process store (middleware/openmetrics.py)
+"""
+
+import multiprocessing
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+from middleware import openmetrics, performance_middleware, rate_limiter
+from middleware.openmetrics import MetricFamily, MultiProcessStore
+from middleware.performance_middleware import PerformanceMiddleware
+from middleware.rate_limiter import RateLimitMiddleware
+
+ROUTE = "/api/v1/items/{item_id}"
+
+
+def samples(text: str) -> dict:
+    """{"name{labels}": value} for every sample line"""
+    lines = [line.rsplit(" ", 1) for line in text.splitlines() if line and not line.startswith("#")]
+    return {name: float(value) for name, value in lines}
+
+
+def record_in_child(count: int):
+    performance_middleware.reset_metrics()
+    for _ in range(count):
+        performance_middleware.histogram_for(ROUTE).record(0.02)
+    openmetrics.flush()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(PerformanceMiddleware)
+
+    @app.get("/api/v1/items/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    @app.get("/metrics")
+    async def metrics(request: Request):
+        openmetrics_format = openmetrics.wants_openmetrics(request.headers.get("accept"))
+        return Response(openmetrics.render_metrics(openmetrics=openmetrics_format))
+
+    performance_middleware.reset_metrics()
+    rate_limiter.reset_rate_limits()
+    return TestClient(app)
+
+
+class TestExposition:
+    """Test the text formats"""
+
+    def test_requests_and_rejections(self, client, monkeypatch):
+        monkeypatch.setitem(rate_limiter._config.LIMITS, "default", {"requests": 3, "window": 60})
+        for n in range(4):
+            client.get(f"/api/v1/items/{n}")
+
+        text = client.get("/metrics").text
+        values = samples(text)
+        assert "# TYPE organic_http_requests_total counter" in text
+        assert values['organic_http_requests_total{method="GET"}'] == 4
+        assert values[f'organic_http_request_duration_seconds_count{{route="{ROUTE}"}}'] == 4
+        assert values[f'organic_http_request_duration_seconds_bucket{{route="{ROUTE}",le="+Inf"}}'] == 4
+        assert values[f'organic_http_errors_total{{route="{ROUTE}"}}'] == 1
+        assert values['organic_rate_limit_rejections_total{endpoint="default"}'] == 1
+        assert values['organic_circuit_breaker_state{name="database",state="closed"}'] == 1
+        assert "/metrics" not in text  # scrapes are not measured
+
+    def test_openmetrics_format(self, client):
+        client.get("/api/v1/items/1")
+        text = client.get("/metrics", headers={"Accept": "application/openmetrics-text"}).text
+        assert "# TYPE organic_http_requests counter" in text
+        assert 'organic_http_requests_total{method="GET"} 1' in text
+        assert text.endswith("# EOF\n")
+
+    def test_label_values_are_escaped(self):
+        family = MetricFamily("organic_test", "gauge", "test")
+        family.add(1, route='a"b\\c')
+        openmetrics.register_collector(lambda: [family])
+        try:
+            assert 'organic_test{route="a\\"b\\\\c"} 1' in openmetrics.render_metrics()
+        finally:
+            openmetrics._collectors.pop()
+
+
+class TestMultiProcessStore:
+    """Test aggregation across worker files"""
+
+    def test_counters_sum_and_dead_gauges_drop(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(openmetrics, "store", MultiProcessStore(str(tmp_path)))
+        worker = multiprocessing.get_context("fork").Process(target=record_in_child, args=(3,))
+        worker.start()
+        worker.join()
+        assert worker.exitcode == 0
+
+        performance_middleware.reset_metrics()
+        performance_middleware.histogram_for(ROUTE).record(0.02)
+        performance_middleware.histogram_for(ROUTE).record(2.0)
+
+        values = samples(openmetrics.render_metrics())
+        assert len(list(tmp_path.iterdir())) == 2
+        assert values[f'organic_http_request_duration_seconds_count{{route="{ROUTE}"}}'] == 5
+        assert values[f'organic_http_request_duration_seconds_bucket{{route="{ROUTE}",le="0.025"}}'] == 4
+        # The exited worker's gauges are gone; only this process reports breaker states
+        assert values['organic_circuit_breaker_state{name="database",state="closed"}'] == 1
+
+    def test_torn_snapshot_is_skipped(self, tmp_path):
+        store = MultiProcessStore(str(tmp_path))
+        store.write([MetricFamily("organic_test", "gauge", "test")])
+        path = store.path(store._pid)
+        assert len(store.read_all()) == 1
+
+        # A writer caught mid-update leaves an odd sequence number
+        MultiProcessStore.HEADER.pack_into(store._map, 0, 3, 10)
+        assert store._read(path, attempts=2) is None
+
+    def test_snapshot_grows_past_initial_size(self, tmp_path):
+        store = MultiProcessStore(str(tmp_path))
+        family = MetricFamily("organic_test", "gauge", "test")
+        for n in range(5000):
+            family.add(n, name=f"series-{n}")
+        store.write([family])
+        ((_, [restored]),) = store.read_all()
+        assert restored.samples == family.samples
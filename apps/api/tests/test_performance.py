@@ -136,6 +136,48 @@ class TestAdditionalIntegrations:
         assert "category" in tip
 
 
+    @pytest.mark.asyncio
+    async def test_holiday_is_cached_per_day(self, monkeypatch):
+        """Test the holiday lookup rolls over with the date"""
+        from datetime import date
+        from apps.api.routes import additional_integrations
+        
+        days = []
+        
+        async def lookup(day):
+            days.append(day)
+            return {}
+        
+        class Tomorrow(date):
+            @classmethod
+            def today(cls):
+                return date(2026, 12, 25)
+        
+        monkeypatch.setattr(additional_integrations, "fetch_holiday_on", lookup)
+        await additional_integrations.fetch_holiday()
+        monkeypatch.setattr(additional_integrations, "date", Tomorrow)
+        await additional_integrations.fetch_holiday()
+        assert days == [date.today().isoformat(), "2026-12-25"]
+    
+    @pytest.mark.asyncio
+    async def test_daily_quote_fallback_is_not_cached(self, monkeypatch):
+        """Test an upstream failure is retried on the next request"""
+        from apps.api.routes import integrations
+        
+        calls = 0
+        
+        class Down:
+            def __init__(self, *args, **kwargs):
+                nonlocal calls
+                calls += 1
+                raise OSError("offline")
+        
+        monkeypatch.setattr(integrations.httpx, "AsyncClient", Down)
+        await integrations.fetch_daily_quote.refresh()
+        assert await integrations.get_daily_quote() == integrations.DAILY_QUOTE_FALLBACK
+        assert calls == 2
+
+
 class TestAPIDocumentation:
     """Test API documentation endpoints"""
     
@@ -0,0 +1,86 @@
+"""
+Tests for QueryBuilder loader strategies (database/optimized.py)
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+from apps.api.database.models import Base, ModuleProgress, User, UserEntry, UserProfile, WellnessEntry, WellnessGoal
+from apps.api.database.optimized import QueryBuilder, recent_wellness_query
+
+USER_IDS = [f"00000000-0000-0000-0000-00000000000{u}" for u in range(3)]
+START = date(2026, 1, 1)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        for u, user_id in enumerate(USER_IDS):
+            user = User(id=user_id, email=f"user{u}@example.com")
+            user.profile = UserProfile(bio=f"bio {u}")
+            user.wellness_goals = [WellnessGoal(goal_type="sleep", specific_goal="8h")]
+            user.module_progress = [ModuleProgress(module_name=m) for m in ("identity", "wellness")]
+            user.entries = [UserEntry(module_name="wellness", topic_name="sleep", entry_type="journal", content={})]
+            user.wellness_entries = [WellnessEntry(date=START + timedelta(days=d), mood_score=d % 10) for d in range(10 + u)]
+            session.add(user)
+        session.commit()
+    return engine
+
+
+@pytest.fixture
+def statements(engine):
+    seen = []
+    event.listen(engine, "after_cursor_execute", lambda conn, cursor, statement, *args: seen.append(statement))
+    return seen
+
+
+class TestQueryBuilder:
+    """Test eager loading, N+1 guards and the bounded wellness query"""
+
+    def test_users_load_in_fixed_round_trips(self, engine, statements):
+        with Session(engine) as session:
+            users = QueryBuilder(session).get_users_with_relations(USER_IDS, wellness_limit=5)
+            assert len(statements) == 4
+
+            for user in users:
+                assert user.profile.bio.startswith("bio")
+                assert len(user.wellness_goals) == 1
+                assert {p.module_name for p in user.module_progress} == {"identity", "wellness"}
+                assert len(user.wellness_entries) == 5
+            assert len(statements) == 4
+
+    def test_recent_wellness_is_newest_first_per_user(self, engine):
+        with Session(engine) as session:
+            user = QueryBuilder(session).get_user_with_relations(USER_IDS[2], wellness_limit=3)
+            assert [e.date for e in user.wellness_entries] == [START + timedelta(days=d) for d in (11, 10, 9)]
+            assert user not in session.dirty
+
+    def test_window_query_bounds_rows(self, engine):
+        with Session(engine) as session:
+            rows = session.scalars(recent_wellness_query(USER_IDS, 4)).all()
+        assert len(rows) == 12
+        assert [r.user_id for r in rows[:4]] == [USER_IDS[0]] * 4
+
+    def test_unloaded_relationships_raise(self, engine):
+        with Session(engine) as session:
+            user = QueryBuilder(session).get_user_with_relations(USER_IDS[0])
+            with pytest.raises(InvalidRequestError):
+                user.entries
+            with pytest.raises(InvalidRequestError):
+                user.wellness_goals[0].user
+
+    def test_module_entries_use_selectinload(self, engine, statements):
+        with Session(engine) as session:
+            progress = QueryBuilder(session).get_all_modules_with_relations(USER_IDS[1])
+            assert [p.module_name for p in progress] == ["identity", "wellness"]
+            assert [len(p.entries) for p in progress] == [0, 1]
+            assert len(statements) == 2
+
+    def test_missing_user(self, engine):
+        with Session(engine) as session:
+            assert QueryBuilder(session).get_user_with_relations("00000000-0000-0000-0000-000000000099") is None
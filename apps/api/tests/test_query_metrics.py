@@ -0,0 +1,151 @@
+"""
+Tests for engine-event query instrumentation (database/optimized.py)
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from apps.api.database.optimized import (
+    LatencyHistogram,
+    QueryMetrics,
+    fingerprint_id,
+    fingerprint_statement,
+    instrument_engine,
+)
+
+
+@pytest.fixture
+def metrics():
+    return QueryMetrics(slow_threshold_ms=0, buffer_size=5)
+
+
+@pytest.fixture
+def engine(metrics):
+    engine = instrument_engine(create_engine("sqlite://"), metrics)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE wellness (user_id TEXT, mood REAL)"))
+        conn.execute(text("INSERT INTO wellness VALUES ('u1', 7), ('u2', 5), ('u1', 8)"))
+    metrics.reset()
+    return engine
+
+
+class TestFingerprints:
+    """Test statement normalization"""
+
+    def test_literals_and_binds_are_normalized(self):
+        assert fingerprint_statement("SELECT * FROM t WHERE id = 5 AND name = 'o''brien'") == \
+            "SELECT * FROM t WHERE id = ? AND name = ?"
+        assert fingerprint_statement("SELECT * FROM t WHERE id = %(id_1)s") == \
+            fingerprint_statement("SELECT  *\n FROM t WHERE id = $1")
+
+    def test_in_lists_collapse(self):
+        assert fingerprint_statement("SELECT 1 FROM t WHERE id IN (1, 2, 3)") == \
+            fingerprint_statement("SELECT 1 FROM t WHERE id IN (4)")
+
+
+class TestLatencyHistogram:
+    """Test streaming quantiles"""
+
+    def test_quantiles_without_samples(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.observe(ms)
+        assert histogram.count == 100
+        assert 40 <= histogram.quantile(0.5) <= 60
+        assert 90 <= histogram.quantile(0.95) <= 100
+        assert histogram.quantile(1.0) == 100
+
+    def test_empty_histogram(self):
+        assert LatencyHistogram().quantile(0.95) == 0.0
+
+
+class TestEngineInstrumentation:
+    """Test that engine events feed QueryMetrics"""
+
+    def test_executions_group_by_fingerprint(self, engine, metrics):
+        with engine.connect() as conn:
+            for user in ("u1", "u2", "u3"):
+                conn.execute(text("SELECT mood FROM wellness WHERE user_id = :u"), {"u": user})
+            conn.execute(text("SELECT COUNT(*) FROM wellness"))
+
+        top = metrics.get_top_statements(sort_by="calls")
+        assert top[0]["calls"] == 3
+        assert top[0]["statement"] == "SELECT mood FROM wellness WHERE user_id = ?"
+        assert metrics.get_stats()["total"] == 4
+
+    def test_ring_buffer_is_bounded(self, engine, metrics):
+        with engine.connect() as conn:
+            for _ in range(8):
+                conn.execute(text("SELECT 1"))
+        assert len(metrics.get_recent(100)) == 5
+        assert metrics.get_stats()["total"] == 8
+
+    def test_rowcounts_recorded(self, engine, metrics):
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE wellness SET mood = mood + 1 WHERE user_id = 'u1'"))
+        assert metrics.get_top_statements()[0]["rows"] == 2
+
+    def test_slow_queries_can_be_explained(self, engine, metrics):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT mood FROM wellness WHERE user_id = :u"), {"u": "u1"})
+        slow = metrics.get_slow_queries()
+        assert "params" not in slow[0]
+
+        with engine.connect() as conn:
+            plan = metrics.explain(slow[0]["fingerprint"], conn)
+        assert plan["plan"]
+        assert "wellness" in str(plan["plan"]).lower()
+
+    def test_explain_analyze_refuses_writes(self, engine, metrics):
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM wellness WHERE user_id = 'nobody'"))
+        fid = metrics.get_slow_queries()[0]["fingerprint"]
+        with engine.connect() as conn, pytest.raises(ValueError):
+            metrics.explain(fid, conn, analyze=True)
+
+    @pytest.mark.parametrize("query", [
+        "WITH gone AS (DELETE FROM wellness RETURNING *) SELECT * FROM gone",
+        "SELECT mood FROM wellness WHERE user_id = 'u1' FOR UPDATE",
+    ])
+    def test_explain_analyze_refuses_hidden_writes(self, engine, metrics, query):
+        fid = fingerprint_id(query)
+        metrics.slow_queries.append(
+            {"fingerprint": fid, "dialect": None, "query": query, "params": None, "duration_ms": 1.0}
+        )
+        with engine.connect() as conn, pytest.raises(ValueError):
+            metrics.explain(fid, conn, analyze=True)
+
+    def test_unknown_fingerprint(self, engine, metrics):
+        with engine.connect() as conn, pytest.raises(KeyError):
+            metrics.explain(fingerprint_id("SELECT ?"), conn)
+
+
+class TestExplainEndpoint:
+    """Test the explain route is admin only"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from apps.api.routes import database_status
+        from routes import auth_security
+
+        monkeypatch.setattr(auth_security, "ADMIN_USER_IDS", frozenset({"admin-1"}))
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        monkeypatch.setattr(database_status, "query_metrics", QueryMetrics())
+        monkeypatch.setattr(database_status, "get_async_engine", lambda: create_async_engine("sqlite+aiosqlite://"))
+        app = FastAPI()
+        app.include_router(database_status.router)
+        return TestClient(app)
+
+    def headers(self, user_id):
+        from routes.auth_security import create_access_token
+        token, _ = create_access_token(user_id, f"{user_id}@example.com")
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_requires_an_admin(self, client):
+        url = "/api/v1/database/metrics/explain/abc"
+        assert client.get(url).status_code == 405
+        assert client.post(url).status_code in (401, 403)
+        assert client.post(url, headers=self.headers("user-1")).status_code == 403
+        assert client.post(url, headers=self.headers("admin-1")).status_code == 404
@@ -0,0 +1,109 @@
+"""
+Tests for the GCRA rate limit store (middleware/rate_limiter.py)
+"""
+
+import asyncio
+
+import pytest
+from middleware import rate_limiter
+from middleware.rate_limiter import RateLimitStore
+
+T0 = 1_800_000_000.0
+
+
+class Clock:
+    """Stands in for the time module"""
+
+    def __init__(self, now: float = T0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def check(store: RateLimitStore, client: str = "ip:1", limit: int = 10, window: int = 60) -> dict:
+    return store.check_rate_limit(client, "default", limit, window)
+
+
+class TestGCRA:
+    """Test burst, refill and headers"""
+
+    def test_burst_then_one_per_interval(self, clock):
+        store = RateLimitStore()
+        results = [check(store) for _ in range(11)]
+        assert [r["remaining"] for r in results[:10]] == list(range(9, -1, -1))
+        assert not results[10]["allowed"]
+        assert results[10]["retry_after"] == 6  # one emission interval: 60s / 10
+        assert results[10]["reset"] == T0 + 60
+
+        clock.now += 5.9
+        assert not check(store)["allowed"]
+        clock.now += 0.1
+        allowed = check(store)
+        assert allowed["allowed"] and allowed["remaining"] == 0
+
+        # A full window later the whole burst is available again
+        clock.now += 60
+        assert check(store)["remaining"] == 9
+
+    def test_remaining_with_inexact_interval(self, clock):
+        store = RateLimitStore()
+        assert check(store, limit=100)["remaining"] == 99
+        assert check(store, "ip:2", limit=3, window=1)["remaining"] == 2
+
+    def test_keys_are_independent(self, clock):
+        store = RateLimitStore()
+        for _ in range(10):
+            check(store, "ip:1")
+        assert not check(store, "ip:1")["allowed"]
+        assert check(store, "ip:2")["allowed"]
+
+
+class TestCleanup:
+    """Test replenished keys are dropped"""
+
+    def test_cleanup_drops_only_replenished_keys(self, clock):
+        store = RateLimitStore()
+        check(store, "ip:1")
+        for _ in range(5):
+            check(store, "ip:2")
+        clock.now += 10
+        assert store.cleanup() == 1
+        assert len(store) == 1
+        # A dropped key starts from a full burst, as if it had been kept
+        assert check(store, "ip:1")["remaining"] == 9
+
+    def test_inline_cleanup_without_background_task(self, clock):
+        store = RateLimitStore(cleanup_interval=30)
+        check(store, "ip:1")
+        clock.now += 31
+        check(store, "ip:2")
+        assert len(store) == 1
+
+    def test_background_task_replaces_inline_cleanup(self, clock, monkeypatch):
+        monkeypatch.setattr(rate_limiter, "RATE_LIMIT_CLEANUP_INTERVAL", 0.01)
+        monkeypatch.setattr(rate_limiter, "_rate_limit_store", RateLimitStore(cleanup_interval=30))
+        store = rate_limiter._rate_limit_store
+
+        async def scenario():
+            await rate_limiter.start_rate_limit_cleanup()
+            try:
+                check(store, "ip:1")
+                clock.now += 31
+                check(store, "ip:2")
+                assert len(store) == 2  # nothing swept on the request path
+                clock.now += 31
+                await asyncio.sleep(0.05)
+                assert len(store) == 0
+            finally:
+                await rate_limiter.stop_rate_limit_cleanup()
+
+        asyncio.run(scenario())
+        assert rate_limiter._cleanup_task is None
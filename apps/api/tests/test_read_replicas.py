@@ -0,0 +1,141 @@
+"""
+Tests for read-replica routing (database/optimized.py)
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+from sqlalchemy import select, text, update
+from apps.api.database import optimized
+from apps.api.database.optimized import (
+    AsyncDatabaseManager,
+    ReplicaSet,
+    ResultCache,
+    execute_cached_async,
+    is_read_only,
+)
+from apps.api.database.models import WellnessEntry
+
+
+def make_db(path, label):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE wellness_tracker (id TEXT PRIMARY KEY, user_id TEXT, date TEXT, mood_score REAL)")
+    conn.execute("CREATE TABLE source (label TEXT)")
+    conn.execute("INSERT INTO source VALUES (?)", (label,))
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+async def databases(tmp_path, monkeypatch):
+    make_db(tmp_path / "primary.db", "primary")
+    make_db(tmp_path / "replica.db", "replica")
+    engine = optimized.create_async_engine_optimized(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replicas = ReplicaSet([f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"], max_lag=5, check_interval=60)
+    monkeypatch.setattr(optimized, "_async_engine", engine)
+    monkeypatch.setattr(optimized, "_async_session_factory", None)
+    monkeypatch.setattr(optimized, "_async_read_session_factory", None)
+    monkeypatch.setattr(optimized, "_replica_set", replicas)
+    await replicas.refresh()  # what the replica monitor does at startup
+    yield replicas
+    await optimized.reset_connection_pool_async()
+
+
+async def source(session) -> str:
+    return (await session.execute(text("SELECT label FROM source"))).scalar()
+
+
+class TestStatementClassification:
+    """Test which statements a replica may serve"""
+
+    def test_constructs(self):
+        query = select(WellnessEntry)
+        assert is_read_only(query)
+        assert not is_read_only(query.with_for_update())
+        assert not is_read_only(update(WellnessEntry).values(mood_score=1))
+        assert not is_read_only(None)
+
+    def test_text(self):
+        assert is_read_only(text("SELECT 1"))
+        assert is_read_only(text("WITH recent AS (SELECT * FROM t) SELECT * FROM recent"))
+        assert not is_read_only(text("WITH gone AS (DELETE FROM t RETURNING *) SELECT * FROM gone"))
+        assert not is_read_only(text("SELECT * FROM t FOR UPDATE"))
+        assert not is_read_only(text("CALL refresh_rollups()"))
+
+
+class TestRoutingSession:
+    """Test replica routing, stickiness and lag fallback"""
+
+    @pytest.mark.asyncio
+    async def test_reads_go_to_replica_until_first_write(self, databases):
+        async with AsyncDatabaseManager(read_only=True) as session:
+            assert await source(session) == "replica"
+            await session.execute(text("INSERT INTO source VALUES ('written')"))
+            assert await source(session) == "primary"
+            await session.commit()
+            assert await source(session) == "primary"
+        assert databases.replicas[0].sessions == 1
+
+    @pytest.mark.asyncio
+    async def test_default_sessions_stay_on_primary(self, databases):
+        async with AsyncDatabaseManager() as session:
+            assert await source(session) == "primary"
+
+    @pytest.mark.asyncio
+    async def test_lagging_replica_falls_back_to_primary(self, databases, monkeypatch):
+        monkeypatch.setitem(optimized.REPLICA_LAG_QUERIES, "sqlite", "SELECT 30")
+        await databases.refresh(force=True)
+        async with AsyncDatabaseManager(read_only=True) as session:
+            assert await source(session) == "primary"
+        status = databases.status()
+        assert status["usable"] == 0
+        assert status["primary_fallbacks"] == 1
+        assert status["replicas"][0]["lag_seconds"] == 30
+
+    @pytest.mark.asyncio
+    async def test_unreachable_replica_is_skipped(self, databases):
+        unreachable = ReplicaSet(["sqlite+aiosqlite:////nonexistent/dir/replica.db"])
+        await unreachable.refresh()
+        assert unreachable.choose() is None
+        assert unreachable.status()["replicas"][0]["error"]
+
+    @pytest.mark.asyncio
+    async def test_lag_checks_are_rate_limited(self, databases):
+        await databases.refresh()
+        checked = databases.last_refresh
+        await databases.refresh()
+        assert databases.last_refresh == checked
+        await databases.refresh(force=True)
+        assert databases.last_refresh > checked
+
+    @pytest.mark.asyncio
+    async def test_lag_is_measured_in_the_background(self, databases, monkeypatch):
+        checked = databases.last_refresh
+        monkeypatch.setattr(databases, "check_interval", 0.01)
+        async with AsyncDatabaseManager(read_only=True) as session:
+            assert await source(session) == "replica"
+        assert databases.last_refresh == checked  # sessions never wait on a lag check
+
+        await optimized.start_replica_monitor()
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            await optimized.stop_replica_monitor()
+        assert databases.last_refresh > checked
+        assert optimized._replica_monitor is None
+
+    @pytest.mark.asyncio
+    async def test_replica_reads_are_not_result_cached(self, databases):
+        cache = ResultCache()
+        async with AsyncDatabaseManager(read_only=True) as session:
+            assert await execute_cached_async(session, "SELECT label FROM source", cache=cache) == [{"label": "replica"}]
+        async with AsyncDatabaseManager() as session:
+            assert await execute_cached_async(session, "SELECT label FROM source", cache=cache) == [{"label": "primary"}]
+        assert cache.get_stats()["size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_health_reports_replicas(self, databases):
+        health = await optimized.check_database_health_async()
+        assert health["replicas"]["configured"] == 1
+        assert health["replicas"]["usable"] == 1
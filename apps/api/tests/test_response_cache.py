@@ -0,0 +1,111 @@
+"""
+Tests for the HTTP response cache middleware
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from apps.api.cache.response_cache import (
+    ALL_CONTENT,
+    ResponseCache,
+    ResponseCacheMiddleware,
+    cache_response,
+)
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(gzip_min_bytes=100)
+
+
+@pytest.fixture
+def calls():
+    return {"module": 0, "all": 0, "live": 0}
+
+
+@pytest.fixture
+def client(cache, calls):
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, cache=cache)
+
+    @app.get("/modules/{name}")
+    @cache_response(max_age=60)
+    async def module(name: str):
+        calls["module"] += 1
+        return {"module": name, "text": "breathe " * 50}
+
+    @app.get("/all")
+    @cache_response(tags=(ALL_CONTENT,))
+    async def all_modules():
+        calls["all"] += 1
+        return {"modules": ["identity", "wellness"]}
+
+    @app.get("/live")
+    async def live():
+        calls["live"] += 1
+        return {"n": calls["live"]}
+
+    return TestClient(app)
+
+
+class TestResponseCache:
+    """Test stored responses, ETags and invalidation"""
+
+    def test_second_request_is_served_from_cache(self, client, calls, cache):
+        first = client.get("/modules/wellness")
+        second = client.get("/modules/wellness")
+        assert first.json() == second.json()
+        assert calls["module"] == 1
+        assert second.headers["cache-control"] == "public, max-age=60"
+        assert second.headers["etag"] == first.headers["etag"]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_query_order_does_not_matter(self, client, calls):
+        client.get("/modules/wellness?a=1&b=2")
+        client.get("/modules/wellness?b=2&a=1")
+        assert calls["module"] == 1
+
+    def test_if_none_match_returns_304(self, client):
+        etag = client.get("/modules/wellness").headers["etag"]
+        response = client.get("/modules/wellness", headers={"If-None-Match": f"W/{etag}"})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_gzip_is_precomputed(self, client):
+        gzipped = client.get("/modules/wellness", headers={"Accept-Encoding": "gzip"})
+        plain = client.get("/modules/wellness", headers={"Accept-Encoding": "identity"})
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert "content-encoding" not in plain.headers
+        assert gzipped.json() == plain.json()
+        assert int(gzipped.headers["content-length"]) < int(plain.headers["content-length"])
+
+    def test_unmarked_routes_pass_through(self, client, calls, cache):
+        assert client.get("/live").json() == {"n": 1}
+        assert client.get("/live").json() == {"n": 2}
+        assert "etag" not in client.get("/live").headers
+        assert cache.stats()["entries"] == 0
+
+    def test_invalidation_by_content_tag(self, client, calls, cache):
+        client.get("/modules/wellness")
+        client.get("/modules/identity")
+        client.get("/all")
+        assert cache.invalidate("wellness") == 2  # /modules/wellness and /all
+        client.get("/modules/wellness")
+        client.get("/modules/identity")
+        client.get("/all")
+        assert calls == {"module": 3, "all": 2, "live": 0}
+
+    def test_content_versioning_invalidates(self, monkeypatch, cache):
+        from apps.api.cache import response_cache as module
+        from apps.api.routes import content_versioning
+        monkeypatch.setattr(content_versioning, "invalidate_responses", cache.invalidate)
+        cache.store("/modules/all", [], b"{}", module.ResponsePolicy(60, 60, (ALL_CONTENT,)), {})
+        cache.store("/modules/video", [], b"{}", module.ResponsePolicy(60, 60, ("video",)), {})
+
+        content_versioning.content_store.add_version(
+            "wellness", content_versioning.ContentType.MODULE, {"id": "wellness"},
+            content_versioning.ChangeType.UPDATED, "admin", comment="edit"
+        )
+        assert cache.get("/modules/all") is None
+        assert cache.get("/modules/video") is not None
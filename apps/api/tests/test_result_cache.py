@@ -0,0 +1,137 @@
+"""
+Tests for the query result cache (database/optimized.py)
+"""
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select, text, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from apps.api.database.optimized import (
+    ResultCache,
+    attach_result_cache,
+    execute_cached,
+    execute_cached_async,
+    read_tables,
+    written_tables,
+)
+
+metadata = MetaData()
+users = Table("users", metadata, Column("id", Integer, primary_key=True), Column("name", String))
+goals = Table("goals", metadata, Column("id", Integer, primary_key=True), Column("user_id", Integer))
+
+
+@pytest.fixture
+def cache():
+    return ResultCache(ttl=60, max_entries=100, max_bytes=1024 * 1024)
+
+
+@pytest.fixture
+def engine(cache):
+    engine = attach_result_cache(create_engine("sqlite://"), cache)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(users), [{"id": 1, "name": "ada"}, {"id": 2, "name": "bo"}])
+        conn.execute(insert(goals), [{"id": 1, "user_id": 1}])
+    return engine
+
+
+class TestTableExtraction:
+    """Test read/write table detection"""
+
+    def test_constructs(self):
+        joined = select(users.c.name).join(goals, goals.c.user_id == users.c.id)
+        assert read_tables(joined) == {"users", "goals"}
+        assert written_tables(update(users).values(name="x")) == {"users"}
+        assert written_tables(select(users)) == frozenset()
+
+    def test_text(self):
+        assert read_tables("SELECT * FROM public.users u JOIN \"goals\" g ON g.user_id = u.id") == {"users", "goals"}
+        assert written_tables("INSERT INTO users (id) VALUES (3)") == {"users"}
+        assert written_tables("delete from Goals where id = 1") == {"goals"}
+        assert written_tables("SELECT * FROM users") == frozenset()
+        assert written_tables("ALTER TABLE users ADD COLUMN x int") is None
+
+
+class TestResultCache:
+    """Test caching and invalidation"""
+
+    def test_repeat_read_is_a_hit(self, engine, cache):
+        with engine.connect() as conn:
+            first = execute_cached(conn, select(users).where(users.c.id == 1), cache=cache)
+            second = execute_cached(conn, select(users).where(users.c.id == 1), cache=cache)
+            other = execute_cached(conn, select(users).where(users.c.id == 2), cache=cache)
+
+        assert first == second == [{"id": 1, "name": "ada"}]
+        assert other == [{"id": 2, "name": "bo"}]
+        assert cache.hits == 1
+        assert cache.misses == 2
+        assert cache.get_stats()["hit_ratio"] == pytest.approx(1 / 3, abs=1e-3)
+
+    def test_write_drops_only_dependent_entries(self, engine, cache):
+        with engine.connect() as conn:
+            execute_cached(conn, "SELECT name FROM users WHERE id = :id", {"id": 1}, cache=cache)
+            execute_cached(conn, select(goals), cache=cache)
+        assert cache.get_stats()["entries_by_table"] == {"users": 1, "goals": 1}
+
+        with engine.begin() as conn:
+            conn.execute(update(users).where(users.c.id == 1).values(name="ada2"))
+
+        assert cache.get_stats()["entries_by_table"] == {"goals": 1}
+        with engine.connect() as conn:
+            assert execute_cached(conn, "SELECT name FROM users WHERE id = :id", {"id": 1}, cache=cache) == [{"name": "ada2"}]
+
+    def test_driver_sql_and_ddl_invalidate(self, engine, cache):
+        with engine.connect() as conn:
+            execute_cached(conn, select(users), cache=cache)
+            execute_cached(conn, select(goals), cache=cache)
+
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DELETE FROM goals")
+        assert cache.get_stats()["entries_by_table"] == {"users": 1}
+
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE extra (id INTEGER)"))
+        assert cache.get_stats()["size"] == 0
+
+    def test_reads_after_uncommitted_writes_are_not_cached(self, engine, cache):
+        with engine.connect() as conn:
+            conn.execute(text("UPDATE users SET name = 'tmp' WHERE id = 2"))
+            assert execute_cached(conn, select(users.c.name).where(users.c.id == 2), cache=cache) == [{"name": "tmp"}]
+            assert cache.get_stats()["size"] == 0
+            conn.rollback()
+
+            assert execute_cached(conn, select(users.c.name).where(users.c.id == 2), cache=cache) == [{"name": "bo"}]
+            assert cache.get_stats()["size"] == 1
+
+    def test_lru_and_byte_limits(self):
+        cache = ResultCache(ttl=60, max_entries=2, max_bytes=10_000)
+        for i in range(3):
+            cache.set(f"k{i}", [{"i": i}], frozenset({"t"}))
+        assert cache.get("k0") is None
+        assert cache.get("k2") == [{"i": 2}]
+        assert cache.evictions == 1
+
+        cache.set("big", [{"blob": "x" * 20_000}], frozenset({"t"}))
+        assert cache.get("big") is None
+        assert cache.bytes_used <= cache.max_bytes
+
+    def test_ttl_expiry(self, cache):
+        cache.set("k", [{"a": 1}], frozenset({"t"}), ttl=-1)
+        assert cache.get("k") is None
+        assert cache.get_stats()["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_async_helper(self, cache):
+        engine = attach_result_cache(create_async_engine("sqlite+aiosqlite://"), cache)
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            await conn.execute(insert(users).values(id=1, name="ada"))
+
+        async with engine.connect() as conn:
+            assert await execute_cached_async(conn, select(users.c.name), cache=cache) == [{"name": "ada"}]
+            assert await execute_cached_async(conn, select(users.c.name), cache=cache) == [{"name": "ada"}]
+        assert cache.hits == 1
+
+        async with engine.begin() as conn:
+            await conn.execute(insert(users).values(id=2, name="bo"))
+        assert cache.get_stats()["size"] == 0
+        await engine.dispose()
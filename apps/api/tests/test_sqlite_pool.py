@@ -0,0 +1,90 @@
+"""
+Tests for the pooled aiosqlite backend (database/sqlite.py)
+"""
+
+import asyncio
+
+import pytest
+from apps.api.database import sqlite
+from apps.api.database.sqlite import SQLitePool
+
+
+@pytest.fixture
+async def pool(tmp_path):
+    async with SQLitePool(tmp_path / "edge.db", readers=2) as pool:
+        async with pool.writer() as conn:
+            await conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+        yield pool
+
+
+class TestSQLitePool:
+    """Test reader/writer pooling"""
+
+    @pytest.mark.asyncio
+    async def test_pragmas_applied_once_per_connection(self, pool):
+        async with pool.reader() as conn:
+            assert (await (await conn.execute("PRAGMA journal_mode")).fetchone())[0] == "wal"
+            assert (await (await conn.execute("PRAGMA temp_store")).fetchone())[0] == 2  # MEMORY
+            assert (await (await conn.execute("PRAGMA cache_size")).fetchone())[0] == sqlite.SQLITE_CACHE_SIZE
+            assert (await (await conn.execute("PRAGMA query_only")).fetchone())[0] == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_commit_and_readers_see_them(self, pool):
+        assert await pool.execute_many("INSERT INTO notes (body) VALUES (?)", [("a",), ("b",)]) == 2
+        rows = await pool.fetch_all("SELECT body FROM notes ORDER BY id")
+        assert [row["body"] for row in rows] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_writer_rolls_back_on_error(self, pool):
+        with pytest.raises(RuntimeError):
+            async with pool.writer() as conn:
+                await conn.execute("INSERT INTO notes (body) VALUES ('draft')")
+                raise RuntimeError("handler failed")
+        assert (await pool.fetch_one("SELECT COUNT(*) AS n FROM notes"))["n"] == 0
+        assert pool.stats()["write_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_readers_reject_writes(self, pool):
+        async with pool.reader() as conn:
+            with pytest.raises(Exception):
+                await conn.execute("INSERT INTO notes (body) VALUES ('x')")
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, pool):
+        seen = set()
+        for _ in range(5):
+            async with pool.reader() as conn:
+                seen.add(id(conn))
+        assert len(seen) <= 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_readers_and_writer_stats(self, pool):
+        async def read():
+            async with pool.reader():
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(read() for _ in range(6)), pool.execute("INSERT INTO notes (body) VALUES ('x')"))
+        stats = pool.stats()
+        assert stats["reads"] == 6
+        assert stats["writes"] == 2  # fixture + this one
+        assert stats["readers_idle"] == 2
+        assert stats["max_read_wait_ms"] > 0
+
+    @pytest.mark.asyncio
+    async def test_closed_pool_refuses_work(self, tmp_path):
+        pool = await SQLitePool(tmp_path / "closed.db", readers=1).open()
+        await pool.close()
+        with pytest.raises(RuntimeError):
+            await pool.fetch_one("SELECT 1")
+
+    @pytest.mark.asyncio
+    async def test_health_uses_shared_pool(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(sqlite, "SQLITE_DB_PATH", tmp_path / "health.db")
+        monkeypatch.setattr(sqlite, "_pool", None)
+        try:
+            first = await sqlite.check_sqlite_health()
+            second = await sqlite.check_sqlite_health()
+            assert first["status"] == second["status"] == "healthy"
+            assert second["pool"]["reads"] == 2
+        finally:
+            await sqlite.close_sqlite_pool()
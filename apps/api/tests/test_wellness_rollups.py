@@ -0,0 +1,215 @@
+"""
+Tests for wellness rollups (database/optimized.py) and /wellness/stats, /wellness/streak
+"""
+
+import threading
+from datetime import date, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from apps.api.database import optimized
+from apps.api.database.models import Base, User, WellnessEntry, WellnessStreakRun, WellnessWeeklyRollup
+from apps.api.database.optimized import QueryBuilder, merge_streak_runs
+from apps.api.routes import wellness
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+TODAY = date(2026, 3, 18)  # a Wednesday
+
+
+def entry(day: date, mood: float = 5, sleep: float = None) -> dict:
+    return {"user_id": USER_ID, "date": day, "mood_score": mood, "sleep_hours": sleep}
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id=USER_ID, email="rollup@example.com"))
+        session.commit()
+        yield session
+
+
+def brute_force_stats(session, days: int) -> dict:
+    entries = session.scalars(
+        select(WellnessEntry).where(WellnessEntry.date.between(TODAY - timedelta(days=days - 1), TODAY))
+    ).all()
+    moods = [e.mood_score for e in entries if e.mood_score is not None]
+    sleeps = [e.sleep_hours for e in entries if e.sleep_hours is not None]
+    return {
+        "avg_mood": round(sum(moods) / len(moods), 1) if moods else None,
+        "avg_sleep": round(sum(sleeps) / len(sleeps), 1) if sleeps else None,
+        "entries_count": len(entries),
+    }
+
+
+class TestStreakRuns:
+    """Test run merging"""
+
+    def test_merge(self):
+        d = lambda n: TODAY + timedelta(days=n)
+        assert merge_streak_runs([], [d(0), d(1), d(3)]) == [(d(0), d(1)), (d(3), d(3))]
+        assert merge_streak_runs([(d(0), d(1)), (d(3), d(5))], [d(2)]) == [(d(0), d(5))]
+        assert merge_streak_runs([(d(0), d(4))], [d(2)]) == [(d(0), d(4))]
+
+
+class TestWellnessRollups:
+    """Test incremental maintenance against raw aggregation"""
+
+    def test_stats_match_raw_history(self, session):
+        builder = QueryBuilder(session)
+        rows = [entry(TODAY - timedelta(days=d), mood=1 + d % 9, sleep=None if d % 4 else 7 + d % 3) for d in range(120) if d % 5]
+        builder.bulk_upsert_wellness(rows[:50])
+        builder.bulk_upsert_wellness(rows[50:])
+        builder.bulk_upsert_wellness([entry(TODAY - timedelta(days=2), mood=9.5, sleep=6)])
+
+        for days in (1, 3, 7, 10, 14, 30, 45, 90, 200):
+            stats = builder.get_wellness_stats(USER_ID, days, today=TODAY)
+            assert {k: stats[k] for k in ("avg_mood", "avg_sleep", "entries_count")} == brute_force_stats(session, days), days
+
+    def test_stats_read_whole_weeks_from_rollups(self, session):
+        builder = QueryBuilder(session)
+        builder.bulk_upsert_wellness([entry(TODAY - timedelta(days=d)) for d in range(365)])
+        # Raw rows outside the partial edge weeks are never read
+        session.execute(delete(WellnessEntry).where(WellnessEntry.date.between(TODAY - timedelta(days=300), TODAY - timedelta(days=10))))
+        seen = []
+        event.listen(session.get_bind(), "after_cursor_execute", lambda *args: seen.append(args[2]))
+        assert builder.get_wellness_stats(USER_ID, 365, today=TODAY)["entries_count"] == 365
+        assert len(seen) == 2
+
+    def test_empty_history(self, session):
+        builder = QueryBuilder(session)
+        stats = builder.get_wellness_stats(USER_ID, 30, today=TODAY)
+        assert stats["entries_count"] == 0 and stats["avg_mood"] is None
+        assert builder.get_wellness_streak(USER_ID, today=TODAY)["current_streak"] == 0
+
+    def test_streaks_grow_join_and_expire(self, session):
+        builder = QueryBuilder(session)
+        builder.bulk_upsert_wellness([entry(TODAY - timedelta(days=d)) for d in (1, 2, 3, 5, 6)])
+        streak = builder.get_wellness_streak(USER_ID, today=TODAY)
+        assert (streak["current_streak"], streak["longest_streak"], streak["total_entries"]) == (3, 3, 5)
+
+        # Backfilling the gap joins both runs; re-logging a day changes nothing
+        builder.bulk_upsert_wellness([entry(TODAY - timedelta(days=4)), entry(TODAY - timedelta(days=1), mood=8)])
+        streak = builder.get_wellness_streak(USER_ID, today=TODAY)
+        assert (streak["current_streak"], streak["longest_streak"], streak["total_entries"]) == (6, 6, 6)
+        assert len(session.scalars(select(WellnessStreakRun)).all()) == 1
+
+        assert builder.get_wellness_streak(USER_ID, today=TODAY + timedelta(days=3))["current_streak"] == 0
+
+    def test_concurrent_writers_for_one_user(self, tmp_path, monkeypatch):
+        engine = create_engine(f"sqlite:///{tmp_path / 'concurrent.db'}")
+        locked = []
+
+        @event.listens_for(engine, "connect")
+        def register_lock(dbapi_connection, _):
+            dbapi_connection.create_function("user_lock", 1, lambda user_id: locked.append(user_id))
+
+        Base.metadata.create_all(engine)
+        monkeypatch.setitem(optimized.USER_LOCK_QUERIES, "sqlite", "SELECT user_lock(:user_id)")
+        with Session(engine) as session:
+            session.add(User(id=USER_ID, email="concurrent@example.com"))
+            session.commit()
+
+        # Adjacent days in one week, written at the same time
+        start = threading.Barrier(2)
+
+        def write(day: date):
+            with Session(engine) as session:
+                start.wait()
+                QueryBuilder(session).bulk_upsert_wellness([entry(day)])
+
+        writers = [threading.Thread(target=write, args=(TODAY - timedelta(days=d),)) for d in (0, 1)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+
+        assert len(locked) == 2
+        with Session(engine) as session:
+            assert session.scalars(select(WellnessWeeklyRollup.entries)).all() == [2]
+            assert session.execute(select(WellnessStreakRun.start_date, WellnessStreakRun.days)).all() == [
+                (TODAY - timedelta(days=1), 2)
+            ]
+
+
+class TestWellnessRoutes:
+    """Test the rollup-backed routes end to end"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'rollups.db'}")
+        event.listen(engine.sync_engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"))
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def session():
+            async with sessions() as s:
+                yield s
+
+        app = FastAPI()
+        app.include_router(wellness.router)
+        app.dependency_overrides[wellness.get_session] = session
+        app.dependency_overrides[wellness.get_read_session] = session
+        app.dependency_overrides[wellness.get_batch_session] = session
+        with TestClient(app) as client:
+            client.portal.call(self._create_schema, engine)
+            yield client
+
+    @staticmethod
+    async def _create_schema(engine):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(User.__table__.insert().values(id=USER_ID, email="routes@example.com"))
+
+    def test_check_ins_feed_stats_and_streak(self, client):
+        today = date.today()
+        for d in (2, 1, 0):
+            response = client.post(
+                f"/api/v1/wellness/check-in?user_id={USER_ID}",
+                json={"date": (today - timedelta(days=d)).isoformat(), "mood_score": 6 + d, "sleep_hours": 8}
+            )
+            assert response.status_code == 200
+        assert response.json()["current_streak"] == 3
+
+        stats = client.get(f"/api/v1/wellness/stats?user_id={USER_ID}&days=7").json()
+        assert stats["avg_mood"] == 7.0 and stats["avg_sleep"] == 8.0 and stats["entries_count"] == 3
+
+        streak = client.get(f"/api/v1/wellness/streak?user_id={USER_ID}").json()
+        assert streak["current_streak"] == 3
+        assert streak["rewards"][0]["earned"] is True
+        assert streak["next_reward"]["streak"] == 7
+
+    def test_stats_window_is_bounded(self, client):
+        assert client.get(f"/api/v1/wellness/stats?user_id={USER_ID}&days=0").status_code == 422
+
+    def test_user_must_be_a_known_uuid(self, client):
+        assert client.get("/api/v1/wellness/stats").status_code == 422
+        assert client.get("/api/v1/wellness/streak?user_id=demo-user").status_code == 422
+        unknown = "00000000-0000-0000-0000-0000000000ff"
+        check_in = client.post(f"/api/v1/wellness/check-in?user_id={unknown}", json={"date": TODAY.isoformat()})
+        assert check_in.status_code == 404
+        sync = client.post(f"/api/v1/wellness/sync?user_id={unknown}", json={"entries": [{"date": TODAY.isoformat()}]})
+        assert sync.status_code == 404
+
+    def test_unreachable_database_is_503(self, tmp_path, monkeypatch):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'wellness.db'}")
+        sessions = async_sessionmaker(engine)
+
+        async def session():
+            async with sessions() as s:
+                yield s
+
+        monkeypatch.setattr(wellness, "get_async_db", session)
+        monkeypatch.setattr(wellness, "get_async_read_db", session)
+        app = FastAPI()
+        app.include_router(wellness.router)
+        client = TestClient(app)
+
+        check_in = client.post(f"/api/v1/wellness/check-in?user_id={USER_ID}", json={"date": TODAY.isoformat()})
+        assert check_in.status_code == 503
+        assert client.get(f"/api/v1/wellness/stats?user_id={USER_ID}").status_code == 503
+        assert client.get(f"/api/v1/wellness/streak?user_id={USER_ID}").status_code == 503
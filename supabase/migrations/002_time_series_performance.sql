@@ -0,0 +1,183 @@
+-- Organic OS: time-series indexes and partitioning
+--
+-- Covering indexes for the dashboard/summary queries, partial indexes for
+-- the hot subsets, BRIN indexes on append-only timestamps, and monthly
+-- range partitioning for emotions_journal and ai_messages.
+--
+-- Future partitions are created by apps/api/scripts/create_partitions.py
+-- (run it daily; it is idempotent). Before/after plans:
+-- apps/api/scripts/explain_time_series.py.
+--
+-- Plain CREATE INDEX takes a write lock on wellness_tracker, stress_log,
+-- user_entries, wellness_goals and ai_conversations for the duration of
+-- the build. On a large live database, build those with CREATE INDEX
+-- CONCURRENTLY outside a transaction first; IF NOT EXISTS then skips them.
+
+-- ============================================
+-- PARTITION MAINTENANCE
+-- ============================================
+
+-- Create `months` monthly partitions of `parent` starting at the month of
+-- `first_month` (UTC month boundaries). Existing partitions are skipped.
+CREATE OR REPLACE FUNCTION create_monthly_partitions(parent TEXT, first_month DATE, months INT)
+RETURNS INT AS $$
+DECLARE
+    month_start DATE;
+    partition_name TEXT;
+    created INT := 0;
+BEGIN
+    FOR i IN 0..months - 1 LOOP
+        month_start := (date_trunc('month', first_month::timestamp) + make_interval(months => i))::date;
+        partition_name := format('%s_%s', parent, to_char(month_start, 'YYYY_MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                parent,
+                month_start::timestamp AT TIME ZONE 'UTC',
+                (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- EMOTIONS JOURNAL (partitioned by month)
+-- ============================================
+
+ALTER TABLE emotions_journal RENAME TO emotions_journal_legacy;
+ALTER INDEX idx_emotions_journal_user_date RENAME TO idx_emotions_journal_legacy_user_date;
+
+-- The partition key must be part of the primary key, and NOT NULL
+CREATE TABLE emotions_journal (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    emotion_name TEXT NOT NULL,
+    intensity DECIMAL(3,2),  -- 1-10
+    triggers TEXT,
+    bodily_sensations TEXT,
+    thoughts TEXT,
+    behaviors TEXT,
+    regulation_strategy_used TEXT,
+    ai_suggestions JSONB,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows outside the created months so inserts never fail
+CREATE TABLE emotions_journal_default PARTITION OF emotions_journal DEFAULT;
+
+-- Every month with history, through three months ahead
+SELECT create_monthly_partitions(
+    'emotions_journal',
+    first_month::date,
+    ((EXTRACT(YEAR FROM NOW()) - EXTRACT(YEAR FROM first_month)) * 12
+        + EXTRACT(MONTH FROM NOW()) - EXTRACT(MONTH FROM first_month))::int + 4
+)
+FROM (SELECT COALESCE(min(created_at), NOW()) AS first_month FROM emotions_journal_legacy) AS history;
+
+INSERT INTO emotions_journal
+SELECT id, user_id, emotion_name, intensity, triggers, bodily_sensations, thoughts, behaviors,
+       regulation_strategy_used, ai_suggestions, COALESCE(created_at, NOW())
+FROM emotions_journal_legacy;
+
+DROP TABLE emotions_journal_legacy;
+
+-- Recent-emotions list and per-user summaries, served from the index alone
+CREATE INDEX idx_emotions_journal_user_date ON emotions_journal (user_id, created_at DESC)
+    INCLUDE (emotion_name, intensity);
+-- Time-window scans across users (analytics, retention jobs)
+CREATE INDEX idx_emotions_journal_created_brin ON emotions_journal USING brin (created_at)
+    WITH (pages_per_range = 32);
+
+ALTER TABLE emotions_journal ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Users can access own emotions" ON emotions_journal FOR ALL USING (auth.uid() = user_id);
+
+-- ============================================
+-- AI MESSAGES (partitioned by month)
+-- ============================================
+
+ALTER TABLE ai_messages RENAME TO ai_messages_legacy;
+
+CREATE TABLE ai_messages (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    conversation_id UUID REFERENCES ai_conversations(id) ON DELETE CASCADE,
+    role TEXT NOT NULL,  -- user, assistant
+    content TEXT NOT NULL,
+    tokens_used INT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE ai_messages_default PARTITION OF ai_messages DEFAULT;
+
+-- Every month with history, through three months ahead
+SELECT create_monthly_partitions(
+    'ai_messages',
+    first_month::date,
+    ((EXTRACT(YEAR FROM NOW()) - EXTRACT(YEAR FROM first_month)) * 12
+        + EXTRACT(MONTH FROM NOW()) - EXTRACT(MONTH FROM first_month))::int + 4
+)
+FROM (SELECT COALESCE(min(created_at), NOW()) AS first_month FROM ai_messages_legacy) AS history;
+
+INSERT INTO ai_messages
+SELECT id, conversation_id, role, content, tokens_used, COALESCE(created_at, NOW())
+FROM ai_messages_legacy;
+
+DROP TABLE ai_messages_legacy;
+
+-- Conversation transcript in order, plus token totals without heap reads
+CREATE INDEX idx_ai_messages_conversation_date ON ai_messages (conversation_id, created_at)
+    INCLUDE (role, tokens_used);
+CREATE INDEX idx_ai_messages_created_brin ON ai_messages USING brin (created_at)
+    WITH (pages_per_range = 32);
+
+-- ============================================
+-- WELLNESS TRACKER
+-- ============================================
+
+-- update_wellness_updated_at (001) sets NEW.updated_at, but the column was
+-- missing, so every UPDATE and ON CONFLICT DO UPDATE failed
+ALTER TABLE wellness_tracker ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+-- UNIQUE(user_id, date) already provides this index
+DROP INDEX IF EXISTS idx_wellness_tracker_user_date;
+
+-- Stats/streak/rollup queries read only these columns: index-only scans
+CREATE INDEX IF NOT EXISTS idx_wellness_tracker_user_date_cover ON wellness_tracker (user_id, date DESC)
+    INCLUDE (sleep_hours, water_intake_ml, exercise_minutes, meditation_minutes, mood_score, energy_level);
+CREATE INDEX IF NOT EXISTS idx_wellness_tracker_created_brin ON wellness_tracker USING brin (created_at)
+    WITH (pages_per_range = 32);
+
+-- ============================================
+-- STRESS LOG
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_stress_log_user_date ON stress_log (user_id, created_at DESC)
+    INCLUDE (intensity, duration_minutes, effectiveness_rating);
+-- Burnout early-warning reads only the high-intensity entries
+CREATE INDEX IF NOT EXISTS idx_stress_log_user_high_intensity ON stress_log (user_id, created_at DESC)
+    WHERE intensity >= 7;
+CREATE INDEX IF NOT EXISTS idx_stress_log_created_brin ON stress_log USING brin (created_at)
+    WITH (pages_per_range = 32);
+
+-- ============================================
+-- SUPPORTING TABLES
+-- ============================================
+
+-- Conversation list, most recently active first
+CREATE INDEX IF NOT EXISTS idx_ai_conversations_user_updated ON ai_conversations (user_id, updated_at DESC)
+    INCLUDE (module_name, topic, message_count);
+DROP INDEX IF EXISTS idx_ai_conversations_user;
+
+-- Favourites view
+CREATE INDEX IF NOT EXISTS idx_user_entries_user_favorites ON user_entries (user_id, created_at DESC)
+    WHERE is_favorite;
+
+-- Active goals on the dashboard
+CREATE INDEX IF NOT EXISTS idx_wellness_goals_user_active ON wellness_goals (user_id)
+    INCLUDE (goal_type, progress_percentage)
+    WHERE NOT is_completed;
@@ -0,0 +1,85 @@
+-- Organic OS: wellness rollups
+--
+-- Per-user weekly aggregates and streak runs behind /wellness/stats and
+-- /wellness/streak. The API keeps them current in the transaction that
+-- writes wellness_tracker (refresh_wellness_rollups in
+-- apps/api/database/optimized.py), recomputing only the touched weeks;
+-- this migration backfills them from existing history.
+
+-- ============================================
+-- WEEKLY ROLLUPS
+-- ============================================
+
+-- Sums and non-null counts per Monday-based week; average = sum / count
+CREATE TABLE wellness_weekly_rollups (
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    week_start DATE NOT NULL,
+    entries INT NOT NULL DEFAULT 0,
+    sleep_hours_sum DECIMAL(12,2) NOT NULL DEFAULT 0,
+    sleep_hours_count INT NOT NULL DEFAULT 0,
+    water_intake_ml_sum DECIMAL(12,2) NOT NULL DEFAULT 0,
+    water_intake_ml_count INT NOT NULL DEFAULT 0,
+    exercise_minutes_sum DECIMAL(12,2) NOT NULL DEFAULT 0,
+    exercise_minutes_count INT NOT NULL DEFAULT 0,
+    meditation_minutes_sum DECIMAL(12,2) NOT NULL DEFAULT 0,
+    meditation_minutes_count INT NOT NULL DEFAULT 0,
+    mood_score_sum DECIMAL(12,2) NOT NULL DEFAULT 0,
+    mood_score_count INT NOT NULL DEFAULT 0,
+    energy_level_sum DECIMAL(12,2) NOT NULL DEFAULT 0,
+    energy_level_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (user_id, week_start)
+);
+
+INSERT INTO wellness_weekly_rollups
+SELECT
+    user_id,
+    date_trunc('week', date)::date,
+    count(*),
+    COALESCE(sum(sleep_hours), 0), count(sleep_hours),
+    COALESCE(sum(water_intake_ml), 0), count(water_intake_ml),
+    COALESCE(sum(exercise_minutes), 0), count(exercise_minutes),
+    COALESCE(sum(meditation_minutes), 0), count(meditation_minutes),
+    COALESCE(sum(mood_score), 0), count(mood_score),
+    COALESCE(sum(energy_level), 0), count(energy_level),
+    NOW()
+FROM wellness_tracker
+WHERE user_id IS NOT NULL
+GROUP BY user_id, date_trunc('week', date);
+
+-- ============================================
+-- STREAK RUNS
+-- ============================================
+
+-- One row per maximal run of consecutive check-in days
+CREATE TABLE wellness_streak_runs (
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    days INT NOT NULL,
+    PRIMARY KEY (user_id, start_date)
+);
+
+-- Latest run first; days rides along for the longest-streak max
+CREATE INDEX idx_wellness_streak_runs_user_end ON wellness_streak_runs (user_id, end_date DESC) INCLUDE (days);
+
+-- Gaps and islands: consecutive dates share date - row_number()
+INSERT INTO wellness_streak_runs
+SELECT user_id, min(date), max(date), count(*)
+FROM (
+    SELECT user_id, date, date - (row_number() OVER (PARTITION BY user_id ORDER BY date))::int AS island
+    FROM wellness_tracker
+    WHERE user_id IS NOT NULL
+) AS days
+GROUP BY user_id, island;
+
+-- ============================================
+-- ROW LEVEL SECURITY
+-- ============================================
+
+ALTER TABLE wellness_weekly_rollups ENABLE ROW LEVEL SECURITY;
+ALTER TABLE wellness_streak_runs ENABLE ROW LEVEL SECURITY;
+
+-- Written by the API only; users may read their own
+CREATE POLICY "Users can read own wellness rollups" ON wellness_weekly_rollups FOR SELECT USING (auth.uid() = user_id);
+CREATE POLICY "Users can read own streak runs" ON wellness_streak_runs FOR SELECT USING (auth.uid() = user_id);